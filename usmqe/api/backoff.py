@@ -0,0 +1,25 @@
+"""
+Delays for repeated polling and retrying of REST API calls.
+"""
+
+import random
+
+
+def backoff_delays(initial=1, maximum=10, factor=1.5, jitter=0):
+    """ Generate endless sequence of delays (in seconds) which starts with
+    ``initial`` delay and grows by ``factor`` up to ``maximum`` delay.
+
+    Args:
+        initial (float): first delay
+        maximum (float): maximal delay
+        factor (float): multiplier of delay for next iteration
+        jitter (float): relative random deviation of each delay,
+            e.g. 0.1 means +/- 10 %
+    """
+    delay = min(initial, maximum)
+    while True:
+        if jitter:
+            yield delay * random.uniform(1 - jitter, 1 + jitter)
+        else:
+            yield delay
+        delay = min(delay * factor, maximum)
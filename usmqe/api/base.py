@@ -3,10 +3,175 @@
 Basic REST API.
 """
 
-import json
+import fnmatch
+import logging
+from urllib.parse import urlparse
+
 import pytest
+from usmqe.api import cassette
+from usmqe.api.latency import LATENCY
+from usmqe.api.redaction import redact_body, secret_header
+from usmqe.api.schema import SchemaValidator
+from usmqe.api.transport import TRANSPORT
+from usmqe.usmqeconfig import UsmConfig
 
 LOGGER = pytest.get_logger("api_base", module=True)
+CONF = UsmConfig()
+
+
+class LazyFormat(object):
+    """ Object which calls given function only when it is converted to string,
+    so the formatting is done only for log records which are really emitted.
+    """
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return str(self.func(*self.args))
+
+
+class RequestTracer(object):
+    """ Debug trace of requests and responses with size limit of logged
+    bodies, redaction of secrets and per endpoint sampling.
+    """
+
+    def __init__(self, enabled=True, max_body=4096, sample=None):
+        """
+        Args:
+            enabled (bool): turns tracing on/off
+            max_body (int): maximal number of logged characters of body
+            sample (dict): sampling rate (number from 0 to 1) for url path
+                patterns (in fnmatch format), e.g. ``{"*/jobs/*": 0.1}``
+                traces every 10th request, rate 0 disables tracing
+        """
+        self.enabled = enabled
+        self.max_body = max_body
+        self.sample = sample or {}
+        self._counters = {}
+
+    def sampled(self, path):
+        """ Decide if request to given url path should be traced.
+
+        Args:
+            path (str): path part of request url
+        """
+        for pattern, rate in self.sample.items():
+            if fnmatch.fnmatch(path, pattern):
+                if rate <= 0:
+                    return False
+                if rate >= 1:
+                    return True
+                count = self._counters.get(pattern, 0)
+                self._counters[pattern] = count + 1
+                return count % round(1 / rate) == 0
+        return True
+
+    def format_headers(self, headers):
+        """ Return headers as string with hidden values of secret headers.
+        """
+        return str({
+            key: "***" if secret_header(key) else value
+            for key, value in headers.items()})
+
+    def format_body(self, body):
+        """ Return body as string with hidden secrets and limited length.
+        """
+        if body is None:
+            return ""
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+        body = redact_body(body)
+        if len(body) > self.max_body:
+            body = "{}... ({} characters)".format(
+                body[:self.max_body], len(body))
+        return body
+
+    def trace(self, resp):
+        """ Log debug information about request and its response.
+
+        Args:
+            resp: response
+        """
+        if not self.enabled or not LOGGER.isEnabledFor(logging.DEBUG):
+            return
+        if not self.sampled(urlparse(resp.request.url).path):
+            return
+        LOGGER.debug(
+            "request: %s %s -> %s %s (%.3fs)",
+            resp.request.method, resp.request.url, resp.status_code,
+            resp.reason, resp.elapsed.total_seconds())
+        LOGGER.debug(
+            "request.headers:  %s",
+            LazyFormat(self.format_headers, resp.request.headers))
+        LOGGER.debug(
+            "request.body:     %s",
+            LazyFormat(self.format_body, resp.request.body))
+        LOGGER.debug(
+            "response.headers: %s",
+            LazyFormat(self.format_headers, resp.headers))
+        if resp._content is False:
+            # streamed body is not downloaded yet, it is not consumed here
+            LOGGER.debug("response.content: <streamed>")
+        else:
+            LOGGER.debug(
+                "response.content: %s",
+                LazyFormat(self.format_body, resp.content))
+
+
+class ApiResponse(object):
+    """ Response of REST API call, which decodes json body only once.
+
+    All other attributes (``ok``, ``status_code``, ``reason``, ``elapsed``,
+    ``headers``, ``request``, ...) are taken from wrapped
+    :class:`requests.Response` object.
+    """
+
+    def __init__(self, response):
+        """
+        Args:
+            response: :class:`requests.Response` object
+        """
+        self.response = response
+        self._decoded = False
+        self._json = None
+        self._json_error = None
+
+    def __getattr__(self, name):
+        return getattr(self.response, name)
+
+    def __repr__(self):
+        return repr(self.response)
+
+    def __bool__(self):
+        return bool(self.response)
+
+    def json(self, **kwargs):
+        """ Return decoded json body of the response. Body is decoded during
+        the first call, then the decoded object is returned.
+
+        Raises:
+            ValueError: when body is not valid json
+        """
+        if not self._decoded:
+            try:
+                self._json = self.response.json(**kwargs)
+            except ValueError as err:
+                self._json_error = err
+            self._decoded = True
+        if self._json_error is not None:
+            raise self._json_error
+        return self._json
+
+    @property
+    def status(self):
+        """ HTTP status code of the response.
+        """
+        return self.response.status_code
+
+
+TRACER = RequestTracer(**CONF.config["usmqe"].get("api_trace", {}))
 
 
 class ApiBase(object):
@@ -20,51 +185,72 @@ class ApiBase(object):
         "status": 200,
     }
 
+    def request(self, method, url, **kwargs):
+        """ Send request according to transport policy (timeouts, retries,
+        circuit breaker, see :mod:`usmqe.api.transport`) and return its
+        response.
+
+        Args:
+            method (str): HTTP method, e.g. ``GET``
+            url (str): url of the request
+            kwargs: other arguments of :func:`requests.request` and
+                ``retry`` option of :meth:`TransportPolicy.send`
+
+        Returns:
+            ApiResponse: response of the request
+        """
+        active = cassette.LIBRARY.active()
+        if active is not None and active.mode == "replay":
+            return ApiResponse(active.play(method, url, **kwargs))
+        response = TRANSPORT.send(method, url, **kwargs)
+        if active is not None and active.mode == "record":
+            active.record(response)
+        return ApiResponse(response)
+
     @staticmethod
     def print_req_info(resp):
         """ Print debug information.
 
+        Formatting is done by :data:`TRACER` only when the message is really
+        emitted by some log handler.
+
         Args:
             resp: response
         """
-        LOGGER.debug("request.url:  {}".format(resp.request.url))
-        LOGGER.debug("request.method:  {}".format(resp.request.method))
-        LOGGER.debug("request.body:  {}".format(resp.request.body))
-        LOGGER.debug("request.headers:  {}".format(resp.request.headers))
-        LOGGER.debug("response.cookies: {}".format(resp.cookies))
-        LOGGER.debug("response.content: {}".format(resp.content))
-        LOGGER.debug("response.headers: {}".format(resp.headers))
-        # try:
-        #     LOGGER.debug(
-        #         "response.json:    {}".format(resp.json(encoding='unicode')))
-        # except ValueError:
-        #     LOGGER.debug("response.json:    ")
-        LOGGER.debug("response.ok:      {}".format(resp.ok))
-        LOGGER.debug("response.reason:  {}".format(resp.reason))
-        LOGGER.debug("response.status:  {}".format(resp.status_code))
-        LOGGER.debug("response.text:    {}".format(resp.text))
+        TRACER.trace(resp)
 
     @staticmethod
-    def check_response(resp, asserts_in=None, issue=None):
+    def check_response(
+            resp, asserts_in=None, issue=None, check_json=True,
+            max_latency=None, latency_issue=None):
         """ Check default asserts.
 
-        It checks: *ok*, *status*, *reason*.
+        It checks: *ok*, *status*, *reason* and response time, when there is
+        a latency budget for the endpoint (see :mod:`usmqe.api.latency`).
         Args:
             resp: response to check
             asserts_in: asserts that are compared with response
             issue: known issue, log WAIVE
+            check_json: check that body of the response is valid json,
+                disable it only when the caller decodes the body by itself
+            max_latency: budget of response time in seconds, overrides
+                budget from ``api_latency`` config option
+            latency_issue: known issue of response time, log WAIVE
         """
 
+        if not isinstance(resp, ApiResponse):
+            resp = ApiResponse(resp)
         asserts = ApiBase.default_asserts.copy()
         if asserts_in:
             asserts.update(asserts_in)
-        try:
-            json.dumps(resp.json(encoding='unicode'))
-        except ValueError as err:
-            pytest.check(
-                False,
-                "Bad response '{}' json format: '{}'".format(resp, err)
-                )
+        if check_json:
+            try:
+                resp.json()
+            except ValueError as err:
+                pytest.check(
+                    False,
+                    "Bad response '{}' json format: '{}'".format(resp, err)
+                    )
         pytest.check(
             resp.ok == asserts["ok"],
             "There should be ok == {}".format(str(asserts["ok"])),
@@ -75,6 +261,7 @@ class ApiBase(object):
         pytest.check(resp.reason == asserts["reason"],
                      "Reason should equal to {}".format(asserts["reason"]),
                      issue=issue)
+        LATENCY.check(resp, max_latency=max_latency, issue=latency_issue)
 
     @staticmethod
     def check_dict(data, schema, issue=None):
@@ -104,3 +291,32 @@ class ApiBase(object):
                     "{} should be instance of {}".format(data[key],
                                                          schema[key]),
                     issue=issue)
+
+    @staticmethod
+    def check_dicts(records, schema, issue=None, id_key=None, max_listed=20):
+        """Check schema (keys, value types) of all dictionaries in a list.
+
+        Unlike :meth:`check_dict`, whole list is validated in one pass and
+        only one check with list of all violations is logged.
+
+        Args:
+            records: list of dictionaries to check
+            schema: dictionary with keys and value types, e.g.:
+                  {'name': str, 'size': int, 'tasks': dict},
+                  or :class:`usmqe.api.schema.SchemaValidator` object
+            issue: known issue, log WAIVE
+            id_key: key used to identify a record in messages about violations
+            max_listed: maximal number of violations listed in the message
+        """
+        if not isinstance(schema, SchemaValidator):
+            schema = SchemaValidator(schema, id_key=id_key)
+        violations = schema(records)
+        msg = "All {} records should match schema {}".format(
+            len(records), schema.schema)
+        if violations:
+            msg += ", {} violations found:\n\t{}".format(
+                len(violations), "\n\t".join(violations[:max_listed]))
+            if len(violations) > max_listed:
+                msg += "\n\t..."
+        pytest.check(not violations, msg, issue=issue)
+        return violations
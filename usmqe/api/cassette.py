@@ -0,0 +1,269 @@
+"""
+Record and replay of REST API requests.
+
+In ``record`` mode, all requests sent via :meth:`ApiBase.request` are
+stored with their responses (and timing) into cassette file of the test
+case. In ``replay`` mode, responses are served from the cassette file
+without any network communication, so the test case could be evaluated
+again offline. Mode and directory of cassette files are configured in
+``api_cassette`` config option.
+
+Requests which are sent outside of a test case (e.g. by session scoped
+fixtures) are stored in session cassette. Secrets (passwords, tokens and
+cookies, see :mod:`usmqe.api.redaction`) are not stored in cassettes,
+requests which differ only by secrets are replayed in recorded order.
+"""
+
+import base64
+import contextlib
+import datetime
+import gzip
+import json
+import os
+import re
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import pytest
+from usmqe.api.redaction import redact_body, secret_header
+from usmqe.usmqeconfig import UsmConfig
+
+LOGGER = pytest.get_logger("api_cassette", module=True)
+CONF = UsmConfig()
+
+BASE_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+
+# response headers which are not valid for content stored in cassette
+DROPPED_HEADERS = ("Content-Encoding", "Transfer-Encoding", "Content-Length")
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+class CassetteError(requests.exceptions.ConnectionError):
+    """ Request can't be replayed, it was not recorded.
+    """
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.strftime(DATETIME_FORMAT)}
+    raise TypeError("{!r} can't be stored in cassette".format(value))
+
+
+def _decode_value(value):
+    if "__datetime__" in value:
+        return datetime.datetime.strptime(
+            value["__datetime__"], DATETIME_FORMAT)
+    return value
+
+
+class Cassette(object):
+    """ Recorded requests, responses and other values of one test case.
+    """
+
+    def __init__(self, path, mode):
+        """
+        Args:
+            path (str): path of cassette file
+            mode (str): ``record`` or ``replay``
+        """
+        self.path = path
+        self.mode = mode
+        self.interactions = []
+        self.values = {}
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self.load()
+
+    @staticmethod
+    def _key(method, url, body):
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+        return "{} {} {}".format(method.upper(), url, redact_body(body or ""))
+
+    def record(self, response):
+        """ Store request and response into the cassette.
+
+        Args:
+            response: :class:`requests.Response` object
+        """
+        content = response.content
+        try:
+            text = redact_body(content.decode("utf-8"))
+            binary = False
+        except UnicodeDecodeError:
+            text = base64.b64encode(content).decode("ascii")
+            binary = True
+        interaction = {
+            "key": self._key(
+                response.request.method, response.request.url,
+                response.request.body),
+            "status": response.status_code,
+            "reason": response.reason,
+            "url": response.url,
+            "headers": {
+                key: value for key, value in response.headers.items()
+                if key not in DROPPED_HEADERS and not secret_header(key)},
+            "content": text,
+            "binary": binary,
+            "elapsed": response.elapsed.total_seconds()}
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def play(self, method, url, **kwargs):
+        """ Return recorded response for the request. When the same request
+        was recorded more times, responses are returned in recorded order,
+        the last one is repeated.
+
+        Args:
+            method (str): HTTP method, e.g. ``GET``
+            url (str): url of the request
+            kwargs: other arguments of :func:`requests.request`
+        """
+        prepared = requests.Request(method, url, **{
+            key: kwargs[key] for key in ("params", "data", "json")
+            if key in kwargs}).prepare()
+        key = self._key(prepared.method, prepared.url, prepared.body)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                raise CassetteError(
+                    "Request '{}' is not recorded in cassette {}".format(
+                        key, self.path))
+            interaction = queue.pop(0) if len(queue) > 1 else queue[0]
+        response = requests.models.Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction["reason"]
+        response.url = interaction["url"]
+        response.headers = CaseInsensitiveDict(interaction["headers"])
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers)
+        if interaction["binary"]:
+            response._content = base64.b64decode(interaction["content"])
+        else:
+            response._content = interaction["content"].encode("utf-8")
+        response._content_consumed = True
+        response.elapsed = datetime.timedelta(seconds=interaction["elapsed"])
+        response.request = prepared
+        return response
+
+    def record_value(self, key, value):
+        """ Store other value (json serializable, datetime objects are
+        allowed) into the cassette.
+
+        Raises:
+            TypeError: when the value can't be stored in cassette file
+        """
+        try:
+            json.dumps(value, default=_encode_value)
+        except (TypeError, ValueError) as err:
+            raise TypeError("Value '{}' can't be recorded in cassette {}: {}".format(
+                key, self.path, err))
+        with self._lock:
+            self.values.setdefault(key, []).append(value)
+
+    def value(self, key):
+        """ Return next recorded value for given key.
+        """
+        with self._lock:
+            values = self._values_queue.get(key)
+            if not values:
+                raise CassetteError(
+                    "Value '{}' is not recorded in cassette {}".format(
+                        key, self.path))
+            return values.pop(0)
+
+    def load(self):
+        """ Load content of cassette file.
+        """
+        with gzip.open(self.path, "rt", encoding="utf-8") as cassette_file:
+            data = json.load(cassette_file, object_hook=_decode_value)
+        self.interactions = data["interactions"]
+        self.values = data["values"]
+        self._queues = {}
+        for interaction in self.interactions:
+            self._queues.setdefault(interaction["key"], []).append(interaction)
+        self._values_queue = {
+            key: list(values) for key, values in self.values.items()}
+
+    def save(self):
+        """ Store recorded data into cassette file.
+        """
+        if not self.interactions and not self.values:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as cassette_file:
+            json.dump(
+                {"interactions": self.interactions, "values": self.values},
+                cassette_file,
+                separators=(",", ":"),
+                default=_encode_value)
+        LOGGER.debug("{} requests stored in cassette {}".format(
+            len(self.interactions), self.path))
+
+
+class CassetteLibrary(object):
+    """ Cassettes of test cases and session cassette.
+    """
+
+    def __init__(self, mode="disabled", directory="cassettes"):
+        """
+        Args:
+            mode (str): ``disabled``, ``record`` or ``replay``
+            directory (str): directory of cassette files, relative path is
+                relative to root directory of usmqe-tests
+        """
+        if mode not in ("disabled", "record", "replay"):
+            raise ValueError("Unknown cassette mode '{}'".format(mode))
+        self.mode = mode
+        self.directory = os.path.join(BASE_PATH, directory)
+        self.session = None
+        self.current = None
+
+    def active(self):
+        """ Return cassette of current test case, session cassette or None.
+        """
+        return self.current or self.session
+
+    def replaying(self):
+        """ Return True when requests are replayed from a cassette.
+        """
+        active = self.active()
+        return active is not None and active.mode == "replay"
+
+    def path(self, name):
+        """ Return path of cassette file for given name (e.g. test node id).
+        """
+        return os.path.join(
+            self.directory, re.sub(r"[^\w.-]+", "_", name) + ".json.gz")
+
+    @contextlib.contextmanager
+    def use(self, name, session=False):
+        """ Use cassette with given name while the context is active.
+
+        Args:
+            name (str): name of the cassette, e.g. test node id
+            session (bool): use cassette as session cassette
+        """
+        if self.mode == "disabled":
+            yield None
+            return
+        cassette = Cassette(self.path(name), self.mode)
+        if session:
+            self.session = cassette
+        else:
+            self.current = cassette
+        try:
+            yield cassette
+        finally:
+            if session:
+                self.session = None
+            else:
+                self.current = None
+            if self.mode == "record":
+                cassette.save()
+
+
+LIBRARY = CassetteLibrary(**CONF.config["usmqe"].get("api_cassette", {}))
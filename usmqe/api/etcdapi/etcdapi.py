@@ -5,7 +5,6 @@ etcd REST API.
 
 import json
 import time
-import requests
 import pytest
 from usmqe.api.base import ApiBase
 from usmqe.usmqeconfig import UsmConfig
@@ -50,7 +49,6 @@ class EtcdApi(ApiBase):
         """
         pattern = "queue/{}".format(job_id)
         response = self.get_key_value(pattern)
-        self.print_req_info(response)
         return json.loads(response["node"]["value"])[attribute]
 
     def get_key_value(self, key):
@@ -62,14 +60,16 @@ class EtcdApi(ApiBase):
 
         pattern = "keys/{}".format(key)
         if CONF.config["usmqe"]["etcd_api_url"].startswith("https"):
-            response = requests.get(
+            response = self.request(
+                "GET",
                 CONF.config["usmqe"]["etcd_api_url"] + pattern,
                 cert=(
                     '/etc/pki/tls/certs/qeserver.crt',
                     '/etc/pki/tls/private/qeserver.key'),
                 verify='/etc/pki/tls/certs/ca-usmqe.crt')
         else:
-            response = requests.get(CONF.config["usmqe"]["etcd_api_url"] + pattern)
+            response = self.request(
+                "GET", CONF.config["usmqe"]["etcd_api_url"] + pattern)
         self.print_req_info(response)
         self.check_response(response)
         return response.json()
@@ -4,10 +4,10 @@ Grafana REST API.
 """
 
 import json
-import requests
 import pytest
 from difflib import Differ
 from usmqe.api.base import ApiBase
+from usmqe.api.graphiteapi.metrics import graphite_name
 from usmqe.usmqeconfig import UsmConfig
 
 LOGGER = pytest.get_logger("grafanaapi", module=True)
@@ -24,7 +24,8 @@ class GrafanaApi(ApiBase):
         ``http://docs.grafana.org/http_api/dashboard/#get-dashboard-by-slug``
         """
         pattern = "search"
-        response = requests.get(
+        response = self.request(
+            "GET",
             CONF.config["usmqe"]["grafana_api_url"] + pattern)
         self.check_response(response)
         return [
@@ -42,7 +43,8 @@ class GrafanaApi(ApiBase):
                   of the dashboard title.
         """
         pattern = "dashboards/db/{}".format(slug)
-        response = requests.get(
+        response = self.request(
+            "GET",
             CONF.config["usmqe"]["grafana_api_url"] + pattern)
         self.check_response(response)
         return response.json()
@@ -87,7 +89,8 @@ class GrafanaApi(ApiBase):
             self,
             panel,
             cluster_identifier="",
-            volume_name=""):
+            volume_name="",
+            host_name=None):
         """
         Get all targets from panel. Returns list of lists for each visible line
         in chart.
@@ -97,6 +100,8 @@ class GrafanaApi(ApiBase):
             cluster_identifier (str): identifier of cluster to use within
                 targets
             volume_name (str): name of volume to use within targets
+            host_name (str): name of host (as used in Graphite) to use
+                within targets, None for ``cluster_member`` from config
         """
         targets = []
         for target in panel["targets"]:
@@ -122,8 +127,10 @@ class GrafanaApi(ApiBase):
                                 target))
                 target = target.replace("$volume_name", volume_name)
             if "$host_name" in target:
-                target = target.replace("$host_name", CONF.config["usmqe"][
-                    "cluster_member"].replace(".", "_"))
+                if host_name is None:
+                    host_name = graphite_name(
+                        CONF.config["usmqe"]["cluster_member"])
+                target = target.replace("$host_name", host_name)
             targets_split = target.split(", ")
 
             target_output = []
@@ -0,0 +1,265 @@
+"""
+Assertions of Graphite data.
+
+Each assertion evaluates all given series (dictionary of
+:class:`usmqe.api.graphiteapi.series.Series` objects, as returned by
+:meth:`GraphiteApi.get_series_many`) with vectorized NumPy operations and
+logs one check with list of all targets which don't pass. Computed values
+are returned, so they could be used in further checks.
+
+Example::
+
+    series = graphite.get_series_many(targets, from_date, until_date)
+    assertions.check_samples(series, expected=10, max_gap=60)
+    assertions.check_band(series, lower=45, upper=75, max_outliers=1)
+    assertions.check_step(series, expected_time=workload_start, tolerance=120)
+"""
+
+import numpy as np
+
+import pytest
+
+LOGGER = pytest.get_logger("graphiteapi.assertions", module=True)
+
+
+def _check(series, compute, failure, msg, issue=None):
+    """ Compute value of each series and log one check with failures.
+
+    Args:
+        series (dict): Series objects
+        compute (function): function which returns computed value of Series
+        failure (function): function which returns description of failure
+            for computed value or None when the value passes
+        msg (str): message of the check
+        issue: known issue, log WAIVE
+    """
+    results = {}
+    failures = []
+    for target, item in series.items():
+        results[target] = compute(item)
+        description = failure(results[target])
+        if description is not None:
+            failures.append("{}: {}".format(target, description))
+    LOGGER.debug("{}: {}".format(msg, results))
+    if failures:
+        msg += ", {} of {} targets failed:\n\t{}".format(
+            len(failures), len(series), "\n\t".join(failures))
+    pytest.check(not failures, msg, issue=issue)
+    return results
+
+
+def _outside(value, expected, divergence):
+    if np.isnan(value) or abs(value - expected) > divergence:
+        return "{:.4g} is not within {} +/- {}".format(value, expected, divergence)
+    return None
+
+
+def check_samples(
+        series, expected, tolerance=1, max_gap=None, issue=None):
+    """ Check number of datapoints with value and length of gaps.
+
+    Args:
+        series (dict): Series objects
+        expected (int): expected number of datapoints with value
+        tolerance (int): allowed number of missing datapoints
+        max_gap (float): maximal allowed length of gap in seconds (time
+            between last datapoint before the gap and first datapoint after
+            it minus step), None for no limit
+
+    Returns:
+        dict: tuples ``(count, longest_gap)`` of targets
+    """
+    def compute(item):
+        step = item.step() or 0
+        gaps = [end - start + step for start, end in item.gaps()]
+        return item.count(), max(gaps, default=0)
+
+    def failure(value):
+        count, longest_gap = value
+        if not expected - tolerance <= count <= expected:
+            return "{} samples, expected {} (-{})".format(
+                count, expected, tolerance)
+        if max_gap is not None and longest_gap > max_gap:
+            return "gap of {}s, max {}s".format(longest_gap, max_gap)
+        return None
+
+    return _check(
+        series, compute, failure,
+        "Number of samples should be {} (-{}){}".format(
+            expected, tolerance,
+            "" if max_gap is None else ", gaps at most {}s".format(max_gap)),
+        issue)
+
+
+def check_band(series, lower=-np.inf, upper=np.inf, max_outliers=0, issue=None):
+    """ Check that values are within tolerance band.
+
+    Args:
+        series (dict): Series objects
+        lower: lower bound, number or array with bound of each datapoint
+        upper: upper bound, number or array with bound of each datapoint
+        max_outliers (int): allowed number of values out of the band
+
+    Returns:
+        dict: lists of timestamps of outliers of targets
+    """
+    def compute(item):
+        values = item.values
+        with np.errstate(invalid="ignore"):
+            outliers = (values < lower) | (values > upper)
+        return item.timestamps[outliers].tolist()
+
+    def failure(outliers):
+        if len(outliers) > max_outliers:
+            return "{} values out of band at {}".format(len(outliers), outliers)
+        return None
+
+    return _check(
+        series, compute, failure,
+        "Values should be within <{}, {}>".format(
+            _bound(lower), _bound(upper)),
+        issue)
+
+
+def _bound(bound):
+    if np.ndim(bound):
+        return "{:.4g}..{:.4g}".format(np.min(bound), np.max(bound))
+    return bound
+
+
+def check_mean(series, expected, divergence, issue=None):
+    """ Check mean of values (missing values are ignored).
+
+    Returns:
+        dict: means of targets
+    """
+    return _check(
+        series, lambda item: item.mean(),
+        lambda value: _outside(value, expected, divergence),
+        "Mean should be {} +/- {}".format(expected, divergence), issue)
+
+
+def check_percentile(series, percent, expected, divergence, issue=None):
+    """ Check percentile of values (missing values are ignored).
+
+    Returns:
+        dict: percentiles of targets
+    """
+    def compute(item):
+        values = item.values[item.valid()]
+        return float(np.percentile(values, percent)) if len(values) else np.nan
+
+    return _check(
+        series, compute,
+        lambda value: _outside(value, expected, divergence),
+        "{}th percentile should be {} +/- {}".format(
+            percent, expected, divergence),
+        issue)
+
+
+def slope(item):
+    """ Return slope of least squares line fitted to values of the series
+    (change of value per second), NaN for less than two values.
+    """
+    valid = item.valid()
+    if np.count_nonzero(valid) < 2:
+        return np.nan
+    timestamps = item.timestamps[valid].astype(np.float64)
+    return float(np.polyfit(timestamps - timestamps[0], item.values[valid], 1)[0])
+
+
+def check_slope(series, expected, divergence, issue=None):
+    """ Check trend of values, slope is change of value per second.
+
+    Returns:
+        dict: slopes of targets
+    """
+    return _check(
+        series, slope,
+        lambda value: _outside(value, expected, divergence),
+        "Slope should be {} +/- {} per second".format(expected, divergence),
+        issue)
+
+
+def find_step(item):
+    """ Return tuple ``(timestamp, change)`` of the biggest change of value
+    between consecutive values of the series (missing values are skipped),
+    ``(None, 0.0)`` for less than two values.
+    """
+    valid = item.valid()
+    if np.count_nonzero(valid) < 2:
+        return None, 0.0
+    changes = np.diff(item.values[valid])
+    index = int(np.argmax(np.abs(changes)))
+    return int(item.timestamps[valid][index + 1]), float(changes[index])
+
+
+def check_step(series, expected_time, tolerance, min_change=0, issue=None):
+    """ Check that the biggest step change of values happened at expected
+    time.
+
+    Args:
+        series (dict): Series objects
+        expected_time (int): expected timestamp of the change
+        tolerance (float): allowed difference of time in seconds
+        min_change (float): minimal absolute size of the change
+
+    Returns:
+        dict: tuples ``(timestamp, change)`` of targets
+    """
+    def failure(value):
+        timestamp, change = value
+        if timestamp is None or abs(change) < min_change:
+            return "no change of at least {} found".format(min_change)
+        if abs(timestamp - expected_time) > tolerance:
+            return "change {:.4g} at {}".format(change, timestamp)
+        return None
+
+    return _check(
+        series, find_step, failure,
+        "Change of at least {} should happen at {} +/- {}s".format(
+            min_change, expected_time, tolerance),
+        issue)
+
+
+def rate(item):
+    """ Return mean rate of change of values per second (only consecutive
+    values are used), NaN for less than two consecutive values.
+    """
+    rates = np.diff(item.values) / np.diff(item.timestamps)
+    rates = rates[~np.isnan(rates)]
+    return float(np.mean(rates)) if len(rates) else np.nan
+
+
+def check_rate(series, expected, divergence, issue=None):
+    """ Check mean rate of change of values (per second), e.g. of counters.
+
+    Returns:
+        dict: rates of targets
+    """
+    return _check(
+        series, rate,
+        lambda value: _outside(value, expected, divergence),
+        "Rate should be {} +/- {} per second".format(expected, divergence),
+        issue)
+
+
+def integral(item):
+    """ Return integral of values over time (trapezoidal rule, intervals
+    with missing value are skipped).
+    """
+    areas = (item.values[1:] + item.values[:-1]) / 2 * np.diff(item.timestamps)
+    return float(np.nansum(areas))
+
+
+def check_integral(series, expected, divergence, issue=None):
+    """ Check integral of values over time (e.g. transferred bytes from
+    throughput in bytes per second).
+
+    Returns:
+        dict: integrals of targets
+    """
+    return _check(
+        series, integral,
+        lambda value: _outside(value, expected, divergence),
+        "Integral should be {} +/- {}".format(expected, divergence), issue)
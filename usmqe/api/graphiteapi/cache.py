@@ -0,0 +1,180 @@
+"""
+Cache of Graphite datapoints.
+
+For each target, the cache stores fetched time intervals and their
+datapoints. Any sub-range of stored intervals is served from memory, only
+missing edges of requested range are fetched from Graphite. Only settled
+data (older than ``settle`` seconds) are stored, because the newest
+datapoints may still change. Targets which were not used for the longest
+time are evicted when number of stored datapoints exceeds ``max_points``.
+
+Intervals follow Graphite ``from``/``until`` semantics, interval
+``(from, until)`` contains datapoints with ``from < timestamp <= until``.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import pytest
+from usmqe.api.graphiteapi.series import Series
+
+LOGGER = pytest.get_logger("graphiteapi.cache", module=True)
+
+
+def merge_intervals(intervals):
+    """ Return sorted list of intervals with overlapping and adjacent
+    intervals merged.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def merge_series(target, parts, from_ts, until_ts):
+    """ Return series with datapoints of all parts in interval
+    ``(from_ts, until_ts)``, datapoints of earlier parts take precedence.
+    """
+    timestamps = np.concatenate(
+        [part.timestamps for part in parts] + [np.empty(0, dtype=np.int64)])
+    values = np.concatenate(
+        [part.values for part in parts] + [np.empty(0, dtype=np.float64)])
+    mask = (timestamps > from_ts) & (timestamps <= until_ts)
+    timestamps, indexes = np.unique(timestamps[mask], return_index=True)
+    return Series(target, timestamps, values[mask][indexes])
+
+
+class DatapointCache(object):
+    """ Range-merging LRU cache of Graphite datapoints.
+    """
+
+    def __init__(self, max_points=1000000, settle=120):
+        """
+        Args:
+            max_points (int): maximal number of stored datapoints
+            settle (float): age in seconds after which are datapoints stored
+        """
+        self.max_points = max_points
+        self.settle = settle
+        self._entries = OrderedDict()
+        self._points = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fetches = 0
+
+    def __len__(self):
+        return self._points
+
+    def missing(self, target, from_ts, until_ts):
+        """ Return list of sub-intervals of ``(from_ts, until_ts)`` which are
+        not stored for the target.
+        """
+        with self._lock:
+            entry = self._entries.get(target)
+            intervals = entry["intervals"] if entry else []
+        missing = []
+        start = from_ts
+        for cached_from, cached_until in intervals:
+            if cached_until <= start:
+                continue
+            if cached_from >= until_ts:
+                break
+            if cached_from > start:
+                missing.append((start, cached_from))
+            start = max(start, cached_until)
+        if start < until_ts:
+            missing.append((start, until_ts))
+        return missing
+
+    def series(self, target, from_ts, until_ts):
+        """ Return stored datapoints of the target in given interval.
+        """
+        with self._lock:
+            entry = self._entries.get(target)
+            if entry is None:
+                return Series(target, [], [])
+            self._entries.move_to_end(target)
+            return merge_series(target, [entry["series"]], from_ts, until_ts)
+
+    def store(self, target, series, from_ts, until_ts):
+        """ Store datapoints of the target fetched for given interval.
+        """
+        with self._lock:
+            entry = self._entries.pop(target, None)
+            if entry is None:
+                entry = {"intervals": [], "series": Series(target, [], [])}
+            self._points -= len(entry["series"])
+            stored = merge_series(target, [series], from_ts, until_ts)
+            entry["series"] = merge_series(
+                target, [stored, entry["series"]], -np.inf, np.inf)
+            entry["intervals"] = merge_intervals(
+                entry["intervals"] + [(from_ts, until_ts)])
+            self._points += len(entry["series"])
+            self._entries[target] = entry
+            while self._points > self.max_points and len(self._entries) > 1:
+                evicted, old = self._entries.popitem(last=False)
+                self._points -= len(old["series"])
+                LOGGER.debug("datapoints of {} evicted from cache".format(evicted))
+
+    def get_many(self, targets, from_ts, until_ts, fetch, now=None):
+        """ Return datapoints of targets in interval ``(from_ts, until_ts)``,
+        fetch only datapoints which are not stored.
+
+        Args:
+            targets (list): names of Graphite targets
+            from_ts (int): start of interval, epoch seconds
+            until_ts (int): end of interval, epoch seconds
+            fetch (function): function with arguments ``targets``,
+                ``from_ts`` and ``until_ts`` which returns dictionary of
+                Series objects fetched from Graphite
+            now (float): current time, epoch seconds
+
+        Returns:
+            dict: Series objects of targets
+        """
+        settled = int((time.time() if now is None else now) - self.settle)
+        cached_until = min(until_ts, settled)
+        parts = {target: [] for target in targets}
+        plan = OrderedDict()
+        for target in targets:
+            ranges = []
+            if cached_until > from_ts:
+                parts[target].append(
+                    self.series(target, from_ts, cached_until))
+                ranges = self.missing(target, from_ts, cached_until)
+            if until_ts > max(settled, from_ts):
+                ranges.append((max(settled, from_ts), until_ts))
+            for interval in merge_intervals(ranges):
+                plan.setdefault(interval, []).append(target)
+        with self._lock:
+            if plan:
+                self.fetches += len(plan)
+            else:
+                self.hits += 1
+        for (start, end), group in plan.items():
+            fetched = fetch(group, start, end)
+            for target in group:
+                series = fetched.get(target) or Series(target, [], [])
+                # fetched datapoints take precedence over stored ones
+                parts[target].insert(0, series)
+                if start < settled:
+                    self.store(target, series, start, min(end, settled))
+        return {
+            target: merge_series(target, parts[target], from_ts, until_ts)
+            for target in targets}
+
+    def stats(self):
+        """ Return statistics of the cache.
+        """
+        with self._lock:
+            return {
+                "targets": len(self._entries),
+                "points": self._points,
+                "hits": self.hits,
+                "fetches": self.fetches}
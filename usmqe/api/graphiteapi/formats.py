@@ -0,0 +1,114 @@
+"""
+Parsers of Graphite render formats.
+
+Compact formats (``raw``, ``msgpack`` and ``pickle``) describe each series
+by start, end and step and contain plain list of values, so they are much
+smaller and faster to decode than ``json`` with nested datapoints. Parsers
+decode all formats directly into :class:`Series` objects.
+
+``msgpack`` format requires optional msgpack module. ``pickle`` format
+is decoded by unpickler which refuses any classes, only builtin data types
+produced by Graphite are allowed.
+"""
+
+import io
+import pickle
+
+import numpy as np
+
+from usmqe.api.graphiteapi.series import Series
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _series(name, start, step, values):
+    values = np.array(
+        [np.nan if value is None else value for value in values],
+        dtype=np.float64)
+    timestamps = start + step * np.arange(len(values), dtype=np.int64)
+    return Series(name, timestamps, values)
+
+
+def parse_json(response):
+    """ Parse response of ``format=json`` render request.
+    """
+    return [
+        Series.from_datapoints(item["target"], item["datapoints"])
+        for item in response.json()]
+
+
+def parse_raw(response):
+    """ Parse response of ``format=raw`` render request, which contains
+    one line for each series: ``name,start,end,step|value,value,...``.
+    """
+    result = []
+    for line in response.text.splitlines():
+        if not line:
+            continue
+        header, _, values = line.rpartition("|")
+        name, start, _, step = header.rsplit(",", 3)
+        if values:
+            values = np.array(
+                values.replace("None", "nan").split(","), dtype=np.float64)
+        else:
+            values = np.empty(0, dtype=np.float64)
+        start, step = int(start), int(step)
+        timestamps = start + step * np.arange(len(values), dtype=np.int64)
+        result.append(Series(name, timestamps, values))
+    return result
+
+
+def parse_msgpack(response):
+    """ Parse response of ``format=msgpack`` render request.
+    """
+    if msgpack is None:
+        raise ValueError("msgpack render format requires msgpack module")
+    return [
+        _series(item["name"], item["start"], item["step"], item["values"])
+        for item in msgpack.unpackb(response.content, raw=False)]
+
+
+class _SafeUnpickler(pickle.Unpickler):
+    """ Unpickler which refuses to load any class or function.
+    """
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(
+            "Class {}.{} is not allowed in Graphite data".format(module, name))
+
+
+def safe_loads(data):
+    """ Unpickle data which may contain only builtin data types.
+    """
+    return _SafeUnpickler(io.BytesIO(data)).load()
+
+
+def parse_pickle(response):
+    """ Parse response of ``format=pickle`` render request.
+    """
+    data = safe_loads(response.content)
+    return [
+        _series(item["name"], item["start"], item["step"], item["values"])
+        for item in data]
+
+
+PARSERS = {
+    "json": parse_json,
+    "raw": parse_raw,
+    "msgpack": parse_msgpack,
+    "pickle": parse_pickle,
+    }
+
+
+def parse(render_format, response):
+    """ Parse response of render request in given format into list of
+    :class:`Series` objects (in order returned by Graphite).
+    """
+    try:
+        parser = PARSERS[render_format]
+    except KeyError:
+        raise ValueError("Unknown render format '{}'".format(render_format))
+    return parser(response)
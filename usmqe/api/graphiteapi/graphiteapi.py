@@ -3,20 +3,109 @@
 Graphite REST API.
 """
 
-import requests
+import re
+import time
+
 import pytest
+from usmqe.api import cassette
+from usmqe.api.backoff import backoff_delays
 from usmqe.api.base import ApiBase
+from usmqe.api.graphiteapi import formats
+from usmqe.api.graphiteapi.cache import DatapointCache
+from usmqe.api.graphiteapi.series import Series
 from usmqe.usmqeconfig import UsmConfig
 
 LOGGER = pytest.get_logger("graphiteapi", module=True)
 CONF = UsmConfig()
 
+# datapoint cache shared by all GraphiteApi objects, when enabled in config
+CACHE_CONF = dict(CONF.config["usmqe"].get("graphite_cache", {}))
+if CACHE_CONF.pop("enabled", False):
+    DATAPOINT_CACHE = DatapointCache(**CACHE_CONF)
+else:
+    DATAPOINT_CACHE = None
+
+# targets with these characters are not cached, their series may be
+# returned under different names
+NOT_CACHED_CHARS = set("*?[{(")
+
+# targets with these characters may match more series, so their aggregation
+# can't be pushed down to Graphite
+WILDCARD_CHARS = set("*?[{")
+
+# alias of rendered function target (including aliased target) with given
+# index, functions should return one series as all series of the target get
+# the same name
+TARGET_ALIAS = "usmqe.target.{}"
+
+
+def get_render_format(name=None):
+    """ Return given render format or default one from config.
+    """
+    return name or CONF.config["usmqe"].get("graphite_render_format", "json")
+
+
+def match_targets(targets, series):
+    """ Map list of ``(name, data)`` pairs of returned series to requested
+    targets. Wildcard target which matches exactly one returned series gets
+    data of this series.
+
+    Returns:
+        dict: data of given targets (None for target without data), series
+            with names which don't match any given target (e.g. expanded
+            wildcards) are under their own names
+    """
+    # metrics module uses GraphiteApi
+    from usmqe.api.graphiteapi.metrics import glob_regex
+    series = dict(series)
+    result = {target: series.pop(target, None) for target in targets}
+    for target in targets:
+        if result[target] is None and WILDCARD_CHARS.intersection(target):
+            regex = re.compile(r"\A{}\Z".format(glob_regex(target)))
+            names = [name for name in series if regex.match(name)]
+            if len(names) == 1:
+                result[target] = series[names[0]]
+    result.update(series)
+    return result
+
+
+def workload_range(start, end, sample_rate=1):
+    """ Return interval of workload measurement used for evaluation of
+    Graphite data, datapoints too close to end of the measurement (30% of
+    sample rate) are dropped like in :meth:`GraphiteApi.compare_data_mean`.
+
+    Args:
+        start: datetime or timestamp of start of the measurement
+        end: datetime or timestamp of end of the measurement
+        sample_rate (int): number of samples per minute
+
+    Returns:
+        tuple: timestamps ``from`` and ``until`` and expected number of
+            samples in the interval
+    """
+    if not isinstance(start, int):
+        start = int(start.timestamp())
+    if not isinstance(end, int):
+        end = int(end.timestamp()) - int(60 * sample_rate * 0.3)
+    return start, end, round((end - start) / 60) * sample_rate
+
 
 class GraphiteApi(ApiBase):
     """ Common methods for graphite REST API.
     """
 
-    def get_datapoints(self, target, from_date=None, until_date=None):
+    def __init__(self, cache=None):
+        """
+        Args:
+            cache: DatapointCache object used by :meth:`get_series_many`,
+                None for shared cache :data:`DATAPOINT_CACHE`, False to
+                disable caching
+        """
+        self._cache = DATAPOINT_CACHE if cache is None else cache or None
+
+    def get_datapoints(
+            self, target, from_date=None, until_date=None,
+            render_format=None):
         """ Get required datapoints of provided Graphite target. If there
         are no datapoints then return empty list.
         Datapoints are in format:
@@ -28,22 +117,290 @@ class GraphiteApi(ApiBase):
             target: id of Graphite metric.
             from_date: datetime string from which date are records shown
             until_date: datetime string to which date are records shown
+            render_format: format of data transferred from Graphite (see
+                :mod:`usmqe.api.graphiteapi.formats`), None for
+                ``graphite_render_format`` config option
         """
-        pattern = "render/?target={}&format=json".format(target)
-        if from_date:
-            pattern += "&from={}".format(from_date)
-        if until_date:
-            pattern += "&until={}".format(until_date)
-        response = requests.get(
-            CONF.config["usmqe"]["graphite_api_url"] + pattern)
-        self.print_req_info(response)
-        self.check_response(response)
-        response_json = response.json()
+        if get_render_format(render_format) != "json":
+            response_json = [
+                {"target": series.target, "datapoints": series.datapoints()}
+                for series in self.render(
+                    [target], from_date, until_date, render_format)]
+        else:
+            pattern = "render/?target={}&format=json".format(target)
+            if from_date:
+                pattern += "&from={}".format(from_date)
+            if until_date:
+                pattern += "&until={}".format(until_date)
+            response = self.request(
+                "GET",
+                CONF.config["usmqe"]["graphite_api_url"] + pattern)
+            self.print_req_info(response)
+            self.check_response(response)
+            response_json = response.json()
         if len(response_json) == 1 and "datapoints" in response_json[0]:
             return response_json[0]["datapoints"]
         else:
             return response_json
 
+    def render(self, targets, from_date=None, until_date=None, render_format=None):
+        """ Get series of several Graphite targets in one request.
+
+        Args:
+            targets (list): ids of Graphite metrics.
+            from_date: datetime string from which date are records shown
+            until_date: datetime string to which date are records shown
+            render_format: format of data transferred from Graphite (see
+                :mod:`usmqe.api.graphiteapi.formats`), None for
+                ``graphite_render_format`` config option
+
+        Returns:
+            list: :class:`usmqe.api.graphiteapi.series.Series` objects in
+                order returned by Graphite, series of functions are named
+                by their targets
+        """
+        render_format = get_render_format(render_format)
+        targets = list(targets)
+        # series of functions are named differently than their targets,
+        # aliases map them back to the targets
+        aliases = {
+            TARGET_ALIAS.format(idx): target
+            for idx, target in enumerate(targets)
+            if "(" in target}
+        params = {
+            "target": [
+                'alias({}, "{}")'.format(target, TARGET_ALIAS.format(idx))
+                if TARGET_ALIAS.format(idx) in aliases else target
+                for idx, target in enumerate(targets)],
+            "format": render_format}
+        if from_date:
+            params["from"] = from_date
+        if until_date:
+            params["until"] = until_date
+        response = self.request(
+            "GET",
+            CONF.config["usmqe"]["graphite_api_url"] + "render/",
+            params=params)
+        self.print_req_info(response)
+        self.check_response(response, check_json=render_format == "json")
+        try:
+            result = formats.parse(render_format, response)
+        except (ValueError, KeyError, IndexError) as err:
+            pytest.check(
+                False,
+                "Bad response '{}' {} format: '{}'".format(
+                    response, render_format, err))
+            return []
+        for series in result:
+            series.target = aliases.get(series.target, series.target)
+        return result
+
+    def get_datapoints_many(self, targets, from_date=None, until_date=None):
+        """ Get datapoints of several Graphite targets in one request.
+        Datapoints of each target are in the same format as returned by
+        :meth:`get_datapoints`.
+
+        Args:
+            targets (list): ids of Graphite metrics.
+            from_date: datetime string from which date are records shown
+            until_date: datetime string to which date are records shown
+
+        Returns:
+            dict: datapoints of given targets (empty list for target without
+                data), series with names which don't match any given target
+                (e.g. expanded wildcards) are under their own names
+        """
+        targets = list(targets)
+        result = match_targets(targets, [
+            (series.target, series.datapoints())
+            for series in self.render(targets, from_date, until_date, "json")])
+        return {
+            target: [] if data is None else data
+            for target, data in result.items()}
+
+    def get_series_many(
+            self, targets, from_date=None, until_date=None,
+            render_format=None):
+        """ Get datapoints of several Graphite targets in one request as
+        :class:`usmqe.api.graphiteapi.series.Series` objects.
+
+        Args:
+            targets (list): ids of Graphite metrics.
+            from_date: datetime string from which date are records shown
+            until_date: datetime string to which date are records shown
+            render_format: format of data transferred from Graphite (see
+                :mod:`usmqe.api.graphiteapi.formats`), None for
+                ``graphite_render_format`` config option
+
+        Returns:
+            dict: Series objects, keys are the same as keys returned by
+                :meth:`get_datapoints_many`
+        """
+        targets = list(targets)
+
+        def fetch(targets, from_date, until_date):
+            result = match_targets(targets, [
+                (series.target, series)
+                for series in self.render(
+                    targets, from_date, until_date, render_format)])
+            return {
+                target: Series(target, [], []) if series is None else series
+                for target, series in result.items()}
+
+        # only time ranges given by timestamps could be cached, replayed
+        # requests must not be split by current time
+        if self._cache is None or cassette.LIBRARY.replaying() or \
+                not isinstance(from_date, int) or \
+                not isinstance(until_date, int) or \
+                any(NOT_CACHED_CHARS.intersection(t) for t in targets):
+            return fetch(targets, from_date, until_date)
+        return self._cache.get_many(targets, from_date, until_date, fetch)
+
+    def wait_for_data(self, targets, until_date, timeout=None, lookback=None):
+        """ Wait until Graphite has data of all targets up to given time, i.e.
+        the last datapoint with value of each target covers ``until_date``.
+        Targets are polled with growing delays (see ``graphite_ready``
+        config option). Recorded data are ready when they are replayed
+        from cassette.
+
+        Args:
+            targets (list): ids of Graphite metrics.
+            until_date: datetime or timestamp which should be covered by data
+            timeout (float): maximal time of waiting in seconds, None for
+                ``graphite_ready.timeout`` config option, 0 disables waiting
+            lookback (int): length of time range in seconds before
+                ``until_date`` used for search of the last datapoint
+
+        Returns:
+            bool: True when data of all targets are ready in time
+        """
+        ready_conf = CONF.config["usmqe"].get("graphite_ready", {})
+        if timeout is None:
+            timeout = ready_conf.get("timeout", 120)
+        if lookback is None:
+            lookback = ready_conf.get("lookback", 600)
+        if not timeout or cassette.LIBRARY.replaying():
+            return True
+        if not isinstance(until_date, int):
+            until_date = int(until_date.timestamp())
+        deadline = time.monotonic() + timeout
+        delays = backoff_delays(**ready_conf.get("backoff", {}))
+        pending = list(targets)
+        while True:
+            found = match_targets(pending, [
+                (series.target, series)
+                for series in self.render(
+                    pending, until_date - lookback, until_date)])
+            pending = [
+                target for target in pending
+                if found[target] is None or not self._covers(
+                    found[target], until_date)]
+            if not pending:
+                return True
+            delay = next(delays)
+            if time.monotonic() + delay > deadline:
+                LOGGER.warning(
+                    "Graphite data of {} are not ready after {}s".format(
+                        pending, timeout))
+                return False
+            LOGGER.debug("waiting {:.1f}s for Graphite data of {}".format(
+                delay, pending))
+            time.sleep(delay)
+
+    def get_ready_series(
+            self, targets, from_date, until_date, issue=None,
+            render_format=None):
+        """ Wait for data of targets (see :meth:`wait_for_data`), log check
+        that they are ready and return them as
+        :class:`usmqe.api.graphiteapi.series.Series` objects for
+        :mod:`usmqe.api.graphiteapi.assertions`.
+
+        Args:
+            targets (list): ids of Graphite metrics.
+            from_date: timestamp from which date are records shown
+            until_date: timestamp to which date are records shown
+            issue (str): known issue, log WAIVE
+            render_format: format of data transferred from Graphite
+
+        Returns:
+            dict: Series objects, see :meth:`get_series_many`
+        """
+        targets = list(targets)
+        self._check_ready(targets, until_date, issue)
+        return self.get_series_many(
+            targets, from_date=from_date, until_date=until_date,
+            render_format=render_format)
+
+    def _check_ready(self, targets, until_date, issue=None):
+        pytest.check(
+            self.wait_for_data(targets, until_date),
+            "Graphite data of targets {} should be ready".format(targets),
+            issue=issue)
+
+    @staticmethod
+    def _covers(series, until_date):
+        """ Check that the last datapoint with value of the series covers
+        given timestamp.
+        """
+        timestamps = series.timestamps[series.valid()]
+        if not len(timestamps):
+            return False
+        return timestamps[-1] + (series.step() or 60) > until_date
+
+    def get_aggregates(self, targets, from_date, until_date, function="avg"):
+        """ Get aggregated value and number of datapoints of each target in
+        given time range computed by Graphite, so only a few datapoints are
+        transferred. Values are computed by ``summarize`` function aligned
+        to ``from_date``, datapoints are counted as ``summarize`` of
+        ``isNonNull`` series.
+
+        Args:
+            targets (list): ids of Graphite metrics, wildcards are not allowed
+            from_date (int): timestamp from which date are records used
+            until_date (int): timestamp to which date are records used
+            function (str): aggregation function of ``summarize``
+
+        Returns:
+            dict: tuples ``(value, count)`` for given targets (value is None
+                when there are no data), None when Graphite failed to
+                compute them
+        """
+        targets = list(targets)
+        interval = "{}s".format(until_date - from_date + 1)
+        expressions = []
+        for idx, target in enumerate(targets):
+            expressions.append(
+                'alias(summarize({}, "{}", "{}", true), "value.{}")'.format(
+                    target, interval, function, idx))
+            expressions.append(
+                'alias(summarize(isNonNull({}), "{}", "sum", true), '
+                '"count.{}")'.format(target, interval, idx))
+        response = self.request(
+            "GET",
+            CONF.config["usmqe"]["graphite_api_url"] + "render/",
+            params={
+                "target": expressions, "format": "json", "from": from_date,
+                "until": until_date})
+        self.print_req_info(response)
+        try:
+            if not response.ok:
+                raise ValueError("{} {}".format(response.status_code, response.reason))
+            data = {
+                item["target"]: [
+                    value for value, _ in item["datapoints"] if value is not None]
+                for item in response.json()}
+        except (ValueError, KeyError, TypeError) as err:
+            LOGGER.warning("Graphite failed to aggregate data: {}".format(err))
+            return None
+        result = {}
+        for idx, target in enumerate(targets):
+            values = data.get("value.{}".format(idx))
+            counts = data.get("count.{}".format(idx))
+            result[target] = (
+                values[0] if values else None,
+                int(sum(counts)) if counts else 0)
+        return result
+
     def compare_data_mean(
             self,
             expected_result,
@@ -53,7 +410,9 @@ class GraphiteApi(ApiBase):
             divergence=10,
             sample_rate=1,
             operation='sum',
-            issue=None):
+            issue=None,
+            render_format=None,
+            push_down=None):
         """
         Compare expected result with sum of means from graphite data from given targets.
 
@@ -69,6 +428,12 @@ class GraphiteApi(ApiBase):
                 sum - summation of data
                 diff - subtraction of data
             issue (str): known issue, log WAIVE
+            render_format (str): format of data transferred from Graphite,
+                None for ``graphite_render_format`` config option
+            push_down (bool): compute means and numbers of samples by
+                Graphite (see :meth:`get_aggregates`), data are processed
+                locally when Graphite fails to compute them, None for
+                ``graphite_push_down`` config option
         """
         graphite_data_mean_all = 0
         if from_date and not isinstance(from_date, int):
@@ -79,24 +444,44 @@ class GraphiteApi(ApiBase):
             until_date = int(
                 until_date.timestamp()) - int(60 * sample_rate * 0.3)
 
+        targets = list(targets)
+        if until_date:
+            # make sure that all data in graphite are saved
+            self._check_ready(targets, until_date, issue)
+        if push_down is None:
+            push_down = CONF.config["usmqe"].get("graphite_push_down", False)
+        aggregates = None
+        if push_down and isinstance(from_date, int) and \
+                isinstance(until_date, int) and \
+                not any(WILDCARD_CHARS.intersection(t) for t in targets):
+            aggregates = self.get_aggregates(targets, from_date, until_date)
+        if aggregates is None:
+            all_series = self.get_series_many(
+                targets, from_date=from_date, until_date=until_date,
+                render_format=render_format)
+            # empty data points are ignored
+            aggregates = {
+                target: (series.mean() if series.count() else None,
+                         series.count())
+                for target, series in all_series.items()}
+            for target in targets:
+                gaps = all_series[target].gaps()
+                if gaps:
+                    LOGGER.debug("gaps in data from `{}` in Graphite: {}".format(
+                        target, gaps))
         for idx, target in enumerate(targets):
-            graphite_data = self.get_datapoints(
-                target, from_date=from_date, until_date=until_date)
-            # drop empty data points
-            graphite_data = [x for x in graphite_data if x[0] is not None]
-            # process data from graphite
-            graphite_data_mean = sum(
-                [x[0] for x in graphite_data]) / max(
-                    len(graphite_data), 1)
+            graphite_data_mean, samples = aggregates[target]
+            if graphite_data_mean is None:
+                graphite_data_mean = 0
             # check for expected number of datapoints only when data are time bound
             if from_date and until_date:
                 workload_time_range = until_date - from_date
                 expected_number_of_datapoints = round(workload_time_range / 60) * sample_rate
                 pytest.check(
-                    (len(graphite_data) == expected_number_of_datapoints) or
-                    (len(graphite_data) == expected_number_of_datapoints - 1),
+                    (samples == expected_number_of_datapoints) or
+                    (samples == expected_number_of_datapoints - 1),
                     "Number of samples of used data should be {}, is {}.".format(
-                        expected_number_of_datapoints, len(graphite_data)),
+                        expected_number_of_datapoints, samples),
                     issue=issue)
             LOGGER.debug("mean of data from `{}` in Graphite: {}".format(
                 target, graphite_data_mean))
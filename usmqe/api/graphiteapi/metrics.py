@@ -0,0 +1,276 @@
+"""
+Index of Graphite metric tree.
+
+Names of all metrics are loaded by one ``metrics/index.json`` request and
+kept in memory for ``ttl`` seconds, so any number of targets could be
+expanded and verified without further requests. When Graphite doesn't
+provide the index, each pattern is expanded by ``metrics/find`` request.
+
+Patterns use Graphite glob syntax, wildcards ``*``, ``?``, ``[...]`` and
+``{a,b}`` don't match across ``.`` separated nodes.
+
+Example::
+
+    targets = metrics.expand_placeholders(
+        ["tendrl.clusters.$cluster_id.nodes.$host_name.cpu.percent-user"],
+        cluster_id=[cluster_id],
+        host_name=[metrics.graphite_name(node) for node in nodes])
+    metrics.INDEX.check_targets(targets)
+"""
+
+import bisect
+import itertools
+import re
+import threading
+import time
+
+import pytest
+from usmqe.api.graphiteapi.graphiteapi import GraphiteApi
+from usmqe.usmqeconfig import UsmConfig
+
+LOGGER = pytest.get_logger("graphiteapi.metrics", module=True)
+CONF = UsmConfig()
+
+GLOB_CHARS = set("*?[{")
+
+PLACEHOLDER_RE = re.compile(r"\$(\w+)")
+
+
+def graphite_name(name):
+    """ Return name of host (or other item with dots in name) as used in
+    Graphite metric names.
+    """
+    return name.replace(".", "_")
+
+
+def expand_placeholders(templates, **values):
+    """ Return list of targets created from templates by substitution of
+    ``$name`` placeholders with all combinations of given values.
+
+    Args:
+        templates (list): targets with placeholders, e.g.
+            ``tendrl.clusters.$cluster_id.nodes.$host_name.cpu.percent-user``
+        values: lists of values of placeholders, e.g. ``host_name=[...]``
+
+    Returns:
+        list: targets in order of templates and values
+    """
+    result = []
+    for template in templates:
+        names = sorted(set(PLACEHOLDER_RE.findall(template)))
+        unknown = [name for name in names if name not in values]
+        if unknown:
+            raise ValueError("No values of placeholders {} in '{}'".format(
+                unknown, template))
+        for combination in itertools.product(*[values[name] for name in names]):
+            substitution = dict(zip(names, combination))
+            target = PLACEHOLDER_RE.sub(
+                lambda match: str(substitution[match.group(1)]), template)
+            if target not in result:
+                result.append(target)
+    return result
+
+
+def glob_regex(pattern):
+    """ Translate Graphite glob pattern into regular expression (without
+    anchors).
+    """
+    regex = []
+    idx = 0
+    while idx < len(pattern):
+        char = pattern[idx]
+        end = -1
+        if char == "[":
+            end = pattern.find("]", idx + 2)
+        elif char == "{":
+            end = pattern.find("}", idx + 1)
+        if char == "*":
+            regex.append("[^.]*")
+        elif char == "?":
+            regex.append("[^.]")
+        elif char == "[" and end != -1:
+            content = pattern[idx + 1:end].replace("\\", "\\\\")
+            if content.startswith("!"):
+                content = "^" + content[1:]
+            regex.append("[{}]".format(content))
+            idx = end
+        elif char == "{" and end != -1:
+            regex.append("(?:{})".format("|".join(
+                glob_regex(option)
+                for option in pattern[idx + 1:end].split(","))))
+            idx = end
+        else:
+            regex.append(re.escape(char))
+        idx += 1
+    return "".join(regex)
+
+
+def glob_prefix(pattern):
+    """ Return literal part of pattern before the first wildcard.
+    """
+    for idx, char in enumerate(pattern):
+        if char in GLOB_CHARS:
+            return pattern[:idx]
+    return pattern
+
+
+class MetricIndex(object):
+    """ Cached index of names of Graphite metrics.
+    """
+
+    def __init__(self, api=None, ttl=300):
+        """
+        Args:
+            api: GraphiteApi object used for requests
+            ttl (float): time in seconds after which is the index reloaded
+        """
+        self.api = api or GraphiteApi()
+        self.ttl = ttl
+        self._names = None
+        self._name_set = None
+        self._found = {}
+        self._loaded = None
+        self._lock = threading.Lock()
+
+    def _request(self, pattern, params=None):
+        response = self.api.request(
+            "GET", CONF.config["usmqe"]["graphite_api_url"] + pattern,
+            params=params)
+        self.api.print_req_info(response)
+        if not response.ok:
+            raise ValueError("{} {}".format(response.status_code, response.reason))
+        return response.json()
+
+    def refresh(self):
+        """ Load names of all metrics from ``metrics/index.json``, cached
+        results of ``metrics/find`` are dropped when the index is not
+        available.
+        """
+        try:
+            names = self._request("metrics/index.json")
+            if not isinstance(names, list):
+                raise ValueError("list of metrics expected")
+        except ValueError as err:
+            LOGGER.info(
+                "index of Graphite metrics is not available, metrics/find "
+                "is used: {}".format(err))
+            names = None
+        with self._lock:
+            self._names = None if names is None else sorted(names)
+            self._name_set = None if names is None else set(names)
+            self._found = {}
+            self._loaded = time.monotonic()
+        if names is not None:
+            LOGGER.debug("index of {} Graphite metrics loaded".format(len(names)))
+
+    def _current(self):
+        """ Return sorted list of metric names (None when Graphite doesn't
+        provide the index), the index is reloaded when it is too old.
+        """
+        if self._loaded is None or time.monotonic() - self._loaded > self.ttl:
+            self.refresh()
+        return self._names
+
+    def _find(self, query):
+        """ Return list of ``metrics/find`` nodes matching the query.
+        """
+        with self._lock:
+            if query in self._found:
+                return self._found[query]
+        try:
+            nodes = self._request("metrics/find", params={"query": query})
+        except ValueError as err:
+            LOGGER.warning("metrics/find of '{}' failed: {}".format(query, err))
+            nodes = []
+        with self._lock:
+            self._found[query] = nodes
+        return nodes
+
+    def _candidates(self, names, pattern):
+        """ Return names which start with literal prefix of pattern.
+        """
+        prefix = glob_prefix(pattern)
+        start = bisect.bisect_left(names, prefix)
+        end = bisect.bisect_left(names, prefix + "\U0010ffff")
+        return names[start:end]
+
+    def expand(self, pattern):
+        """ Return sorted list of names of metrics matching the pattern.
+        """
+        names = self._current()
+        if names is None:
+            return sorted(
+                node["id"] for node in self._find(pattern) if node.get("leaf"))
+        if not GLOB_CHARS.intersection(pattern):
+            return [pattern] if pattern in self._name_set else []
+        regex = re.compile(r"\A{}\Z".format(glob_regex(pattern)))
+        return [
+            name for name in self._candidates(names, pattern)
+            if regex.match(name)]
+
+    def children(self, pattern):
+        """ Return sorted list of names of nodes directly under nodes
+        matching the pattern.
+        """
+        names = self._current()
+        if names is None:
+            return sorted(set(
+                node["text"] for node in self._find(pattern + ".*")))
+        regex = re.compile(r"\A{}\.([^.]+)".format(glob_regex(pattern)))
+        return sorted(set(
+            match.group(1)
+            for match in map(regex.match, self._candidates(names, pattern))
+            if match))
+
+    def nearest(self, target):
+        """ Return tuple ``(prefix, children)`` with the longest existing
+        prefix of the target and names of nodes under it, e.g. to show
+        wrongly composed host name.
+        """
+        nodes = target.split(".")
+        for length in range(len(nodes) - 1, 0, -1):
+            prefix = ".".join(nodes[:length])
+            children = self.children(prefix)
+            if children:
+                return prefix, children
+        return "", sorted(set(
+            name.split(".", 1)[0] for name in self._current() or []))
+
+    def missing(self, targets):
+        """ Return list of targets (names or patterns) which don't match any
+        metric.
+        """
+        return [target for target in targets if not self.expand(target)]
+
+    def check_targets(self, targets, refresh=True, issue=None):
+        """ Check that all targets match some metric, log one check with all
+        missing targets and the nearest existing nodes.
+
+        Args:
+            targets (list): names or patterns of metrics
+            refresh (bool): reload the index before the check, so metrics
+                created after previous load are found
+            issue: known issue, log WAIVE
+
+        Returns:
+            list: missing targets
+        """
+        targets = list(targets)
+        if refresh:
+            self.refresh()
+        missing = self.missing(targets)
+        msg = "All {} targets should exist in Graphite".format(len(targets))
+        if missing:
+            details = []
+            for target in missing:
+                prefix, children = self.nearest(target)
+                details.append("{} (existing under '{}': {}{})".format(
+                    target, prefix, ", ".join(children[:5]),
+                    ", ..." if len(children) > 5 else ""))
+            msg += ", {} missing:\n\t{}".format(len(missing), "\n\t".join(details))
+        pytest.check(not missing, msg, issue=issue)
+        return missing
+
+
+# index shared by all tests, it is loaded with the first use
+INDEX = MetricIndex(**CONF.config["usmqe"].get("graphite_index", {}))
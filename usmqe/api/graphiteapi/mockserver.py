@@ -0,0 +1,335 @@
+"""
+Stand-in of Graphite with Carbon receivers.
+
+It serves ``render`` (``json``, ``raw``, ``pickle`` and ``msgpack``
+formats, plain metric names and globs, no functions), ``metrics/find`` and
+``metrics/index.json`` requests. Datapoints are received by Carbon
+plaintext and pickle protocols (e.g. from :class:`CarbonClient`) and stored
+in memory aligned to step like in whisper files, metrics of optional
+:class:`usmqe.api.graphiteapi.synthetic.SyntheticMetrics` generator are
+computed on request, so thousands of series don't need to be fed first.
+
+Example::
+
+    generator = SyntheticMetrics()
+    names = tendrl_names("c1", hosts=hosts, volumes=volumes)
+    with GraphiteMockServer(generator=generator, names=names) as server:
+        CONF.config["usmqe"]["graphite_api_url"] = server.url
+        CarbonClient(port=server.carbon_port).send(datapoints)
+"""
+
+import pickle
+import re
+import socket
+import socketserver
+import struct
+import threading
+import time
+from urllib.parse import parse_qs
+
+import numpy as np
+
+from usmqe.api.graphiteapi.formats import safe_loads
+from usmqe.api.graphiteapi.metrics import GLOB_CHARS, glob_regex
+from usmqe.api.graphiteapi.series import Series
+from usmqe.api.mockserver import MockServer
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+RELATIVE_TIME_RE = re.compile(r"^-(\d+)(s|min|h|d)$")
+
+TIME_UNITS = {"s": 1, "min": 60, "h": 3600, "d": 86400}
+
+
+def parse_time(value, now):
+    """ Parse ``from``/``until`` value of render request: timestamp,
+    ``now`` or relative time like ``-10min``.
+    """
+    if value == "now":
+        return now
+    match = RELATIVE_TIME_RE.match(value)
+    if match:
+        return now - int(match.group(1)) * TIME_UNITS[match.group(2)]
+    return int(value)
+
+
+class _CarbonServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class GraphiteMockServer(MockServer):
+    """ In-process stand-in of Graphite web and Carbon receivers.
+    """
+
+    def __init__(
+            self, generator=None, names=(), step=60, carbon=True, **kwargs):
+        """
+        Args:
+            generator: SyntheticMetrics object which computes values of
+                ``names`` metrics
+            names (list): names of synthetic metrics
+            step (int): time between stored datapoints in seconds
+            carbon (bool): start Carbon plaintext and pickle receivers
+            kwargs: arguments of MockServer (``latency``, ``jitter``, ...)
+        """
+        super().__init__(**kwargs)
+        self.generator = generator
+        self.step = generator.step if generator else step
+        self.carbon = carbon
+        self.carbon_port = None
+        self.carbon_pickle_port = None
+        self.received = 0
+        self._synthetic = set(names)
+        self._stored = {}
+        self._names = None
+        self._data_lock = threading.Lock()
+        self._carbon_servers = []
+        self.route("GET", "/render/?", self._render)
+        self.route("POST", "/render/?", self._render)
+        self.route("GET", "/metrics/find/?", self._find)
+        self.route("GET", "/metrics/index.json", self._index)
+
+    def names(self):
+        """ Return sorted list of names of all metrics.
+        """
+        with self._data_lock:
+            if self._names is None:
+                self._names = sorted(self._synthetic.union(self._stored))
+            return self._names
+
+    def store(self, name, timestamp, value):
+        """ Store datapoint of the metric (received by Carbon).
+        """
+        timestamp = int(timestamp) // self.step * self.step
+        with self._data_lock:
+            if name not in self._stored:
+                self._stored[name] = {}
+                self._names = None
+            self._stored[name][timestamp] = float(value)
+            self.received += 1
+
+    def wait_for_received(self, count, timeout=10):
+        """ Wait until given number of datapoints is received by Carbon.
+
+        Returns:
+            bool: True when the datapoints were received in time
+        """
+        deadline = time.monotonic() + timeout
+        while self.received < count:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def series(self, name, from_ts, until_ts):
+        """ Return Series of the metric in interval ``(from_ts, until_ts)``,
+        stored datapoints take precedence over synthetic ones.
+        """
+        first = (from_ts // self.step + 1) * self.step
+        timestamps = np.arange(first, until_ts + 1, self.step, dtype=np.int64)
+        if self.generator is not None and name in self._synthetic:
+            values = self.generator.values(name, timestamps)
+        else:
+            values = np.full(len(timestamps), np.nan)
+        with self._data_lock:
+            stored = dict(self._stored.get(name, {}))
+        for idx, timestamp in enumerate(timestamps.tolist()):
+            if timestamp in stored:
+                values[idx] = stored[timestamp]
+        return Series(name, timestamps, values)
+
+    def expand(self, pattern):
+        """ Return names of metrics matching the Graphite glob pattern.
+        """
+        if not GLOB_CHARS.intersection(pattern):
+            return [pattern] if pattern in self._synthetic or \
+                pattern in self._stored else []
+        regex = re.compile(r"\A{}\Z".format(glob_regex(pattern)))
+        return [name for name in self.names() if regex.match(name)]
+
+    def _render(self, request):
+        query = dict(request.query)
+        if request.method == "POST":
+            query.update(parse_qs(request.body.decode("utf-8")))
+        now = int(time.time())
+        until_ts = parse_time(query.get("until", ["now"])[0], now)
+        from_ts = parse_time(query.get("from", ["-1d"])[0], now)
+        render_format = query.get("format", ["json"])[0]
+        start = (from_ts // self.step + 1) * self.step
+        result = []
+        for target in query.get("target", []):
+            if "(" in target:
+                return 400, "functions are not supported: {}".format(target)
+            result.extend(
+                self.series(name, from_ts, until_ts)
+                for name in self.expand(target))
+        if render_format == "json":
+            return 200, [
+                {"target": series.target, "datapoints": series.datapoints()}
+                for series in result]
+        if render_format == "raw":
+            return 200, "".join(
+                "{},{},{},{}|{}\n".format(
+                    series.target, start, until_ts, self.step, ",".join(
+                        "None" if np.isnan(value) else repr(value)
+                        for value in series.values.tolist()))
+                for series in result)
+        items = [{
+            "name": series.target,
+            "start": start,
+            "end": until_ts,
+            "step": self.step,
+            "values": [
+                None if np.isnan(value) else value
+                for value in series.values.tolist()]}
+            for series in result]
+        if render_format == "pickle":
+            return 200, pickle.dumps(items, protocol=2)
+        if render_format == "msgpack" and msgpack is not None:
+            return 200, msgpack.packb(items, use_bin_type=True)
+        return 400, "unsupported format: {}".format(render_format)
+
+    def _find(self, request):
+        query = request.query["query"][0]
+        depth = query.count(".") + 1
+        regex = re.compile(r"\A{}\Z".format(glob_regex(query)))
+        nodes = {}
+        for name in self.names():
+            parts = name.split(".")
+            node = ".".join(parts[:depth])
+            if len(parts) >= depth and node not in nodes and regex.match(node):
+                leaf = int(len(parts) == depth)
+                nodes[node] = {
+                    "id": node, "text": parts[depth - 1], "leaf": leaf,
+                    "expandable": 1 - leaf, "allowChildren": 1 - leaf,
+                    "context": {}}
+        return 200, list(nodes.values())
+
+    def _index(self, request):
+        return 200, self.names()
+
+    def _plaintext_handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        name, value, timestamp = line.decode("utf-8").split()
+                        server.store(name, float(timestamp), float(value))
+                    except ValueError:
+                        continue
+
+        return Handler
+
+    def _pickle_handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+
+            def handle(self):
+                while True:
+                    header = self.rfile.read(4)
+                    if len(header) < 4:
+                        return
+                    length = struct.unpack("!L", header)[0]
+                    for name, (timestamp, value) in safe_loads(
+                            self.rfile.read(length)):
+                        server.store(name, timestamp, value)
+
+        return Handler
+
+    def start(self):
+        """ Start the server and Carbon receivers in background threads.
+        """
+        super().start()
+        if self.carbon:
+            for handler in (self._plaintext_handler(), self._pickle_handler()):
+                carbon_server = _CarbonServer((self.host, 0), handler)
+                threading.Thread(
+                    target=carbon_server.serve_forever, daemon=True).start()
+                self._carbon_servers.append(carbon_server)
+            self.carbon_port = self._carbon_servers[0].server_address[1]
+            self.carbon_pickle_port = self._carbon_servers[1].server_address[1]
+        return self
+
+    def stop(self):
+        """ Stop the server and Carbon receivers.
+        """
+        for carbon_server in self._carbon_servers:
+            carbon_server.shutdown()
+            carbon_server.server_close()
+        self._carbon_servers = []
+        super().stop()
+
+
+class CarbonClient(object):
+    """ Client of Carbon plaintext and pickle protocols.
+    """
+
+    def __init__(
+            self, host="127.0.0.1", port=2003, protocol="plaintext",
+            batch=500, timeout=10):
+        """
+        Args:
+            host (str): address of Carbon receiver
+            port (int): port of Carbon receiver (2003 for plaintext and 2004
+                for pickle protocol by default)
+            protocol (str): ``plaintext`` or ``pickle``
+            batch (int): number of datapoints sent in one pickle message
+            timeout (float): timeout of socket operations in seconds
+        """
+        if protocol not in ("plaintext", "pickle"):
+            raise ValueError("Unknown Carbon protocol '{}'".format(protocol))
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.batch = batch
+        self.timeout = timeout
+
+    def _messages(self, datapoints):
+        if self.protocol == "plaintext":
+            for name, timestamp, value in datapoints:
+                yield "{} {!r} {}\n".format(name, value, int(timestamp)).encode(
+                    "utf-8")
+            return
+        batch = []
+        for name, timestamp, value in datapoints:
+            batch.append((name, (int(timestamp), value)))
+            if len(batch) >= self.batch:
+                yield self._pickle_message(batch)
+                batch = []
+        if batch:
+            yield self._pickle_message(batch)
+
+    @staticmethod
+    def _pickle_message(batch):
+        payload = pickle.dumps(batch, protocol=2)
+        return struct.pack("!L", len(payload)) + payload
+
+    def send(self, datapoints):
+        """ Send datapoints to Carbon.
+
+        Args:
+            datapoints: iterable of ``(name, timestamp, value)`` tuples
+
+        Returns:
+            int: number of sent datapoints
+        """
+        datapoints = list(datapoints)
+        with socket.create_connection(
+                (self.host, self.port), timeout=self.timeout) as sock:
+            buf = bytearray()
+            for message in self._messages(datapoints):
+                buf += message
+                if len(buf) > 65536:
+                    sock.sendall(buf)
+                    buf = bytearray()
+            if buf:
+                sock.sendall(buf)
+        return len(datapoints)
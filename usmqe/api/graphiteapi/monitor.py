@@ -0,0 +1,224 @@
+"""
+Monitor of gaps and staleness of Graphite data.
+
+Background thread periodically renders configured targets (usually globs
+matching metrics of all hosts and volumes) over the last ``window`` seconds
+and records into timeline number of series, stale series (without value
+for more than ``stale`` seconds), ingestion lag (age of the newest value)
+and gaps of settled data. Requests of the monitor don't log any checks and
+are sent by its own session, outside of cassettes, retries and circuit
+breaker of API transport, so they don't affect running test cases.
+
+Example::
+
+    with GraphiteMonitor(["tendrl.clusters.*.nodes.*.cpu.*"]) as monitor:
+        run_long_test()
+    LOGGER.info(monitor.format_report())
+"""
+
+import json
+import threading
+import time
+
+import numpy as np
+import requests
+
+import pytest
+from usmqe.api.graphiteapi import formats
+from usmqe.api.graphiteapi.cache import merge_intervals
+from usmqe.api.transport import TRANSPORT
+from usmqe.usmqeconfig import UsmConfig
+
+LOGGER = pytest.get_logger("graphiteapi.monitor", module=True)
+CONF = UsmConfig()
+
+
+class GraphiteMonitor(object):
+    """ Background monitor of Graphite data of given targets.
+    """
+
+    def __init__(
+            self, targets=(), interval=60, window=600, stale=300, settle=120,
+            render_format="json", report_file=None, session=None):
+        """
+        Args:
+            targets (list): names or patterns of monitored metrics
+            interval (float): time between scans in seconds
+            window (int): time range in seconds rendered by each scan
+            stale (int): age in seconds of the newest value after which is
+                the series stale
+            settle (int): age in seconds after which are missing values
+                recorded as gaps (the newest values may not be stored yet)
+            render_format (str): format of data transferred from Graphite
+            report_file (str): path of json file with timeline and report
+                written when the monitor is stopped, None to disable it
+            session: requests.Session object used for requests
+        """
+        self.targets = list(targets)
+        self.interval = interval
+        self.window = window
+        self.stale = stale
+        self.settle = settle
+        self.render_format = render_format
+        self.report_file = report_file
+        self.session = session or requests.Session()
+        self.timeline = []
+        self._gaps = {}
+        self._stale_scans = {}
+        self._steps = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _render(self, from_ts, until_ts):
+        response = self.session.get(
+            CONF.config["usmqe"]["graphite_api_url"] + "render/",
+            params={
+                "target": self.targets, "format": self.render_format,
+                "from": from_ts, "until": until_ts},
+            timeout=TRANSPORT.timeout)
+        if not response.ok:
+            raise ValueError("{} {}".format(response.status_code, response.reason))
+        return formats.parse(self.render_format, response)
+
+    def scan(self, now=None):
+        """ Render monitored targets once and record the results.
+
+        Args:
+            now (int): current time, epoch seconds
+
+        Returns:
+            dict: timeline entry of the scan
+        """
+        now = int(time.time() if now is None else now)
+        entry = {
+            "time": now, "series": 0, "stale": [], "max_lag": None,
+            "median_lag": None, "new_gaps": 0, "error": None}
+        try:
+            all_series = self._render(now - self.window, now)
+        except (ValueError, KeyError, IndexError, IOError) as err:
+            LOGGER.warning("Graphite monitor failed to get data: {}".format(err))
+            entry["error"] = str(err)
+            all_series = []
+        lags = []
+        with self._lock:
+            for series in all_series:
+                valid = series.timestamps[series.valid()]
+                lag = now - int(valid[-1]) if len(valid) else self.window
+                lags.append(lag)
+                if lag > self.stale:
+                    entry["stale"].append(series.target)
+                    self._stale_scans[series.target] = \
+                        self._stale_scans.get(series.target, 0) + 1
+                gaps = series.slice(until_ts=now - self.settle).gaps()
+                if gaps:
+                    known = self._gaps.get(series.target, [])
+                    entry["new_gaps"] += sum(
+                        1 for start, end in gaps
+                        if not any(s <= end and start <= e for s, e in known))
+                    self._gaps[series.target] = merge_intervals(known + gaps)
+                    self._steps[series.target] = series.step() or 0
+            entry["series"] = len(all_series)
+            if lags:
+                entry["max_lag"] = int(max(lags))
+                entry["median_lag"] = float(np.median(lags))
+            self.timeline.append(entry)
+        if entry["stale"] or entry["new_gaps"]:
+            LOGGER.debug("Graphite monitor: {} stale series, {} new gaps".format(
+                len(entry["stale"]), entry["new_gaps"]))
+        return entry
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            self.scan()
+            self._stop_event.wait(
+                max(self.interval - (time.monotonic() - started), 0))
+
+    def start(self):
+        """ Start scanning in background thread.
+        """
+        if self._thread is None and self.targets:
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="graphite-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """ Stop background thread and write report file.
+        """
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        if self.report_file:
+            with open(self.report_file, "w") as report_file:
+                json.dump(
+                    {"report": self.report(), "timeline": self.timeline},
+                    report_file, indent=2)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def report(self):
+        """ Return summary of all scans.
+
+        Returns:
+            dict: number of ``scans`` and failed scans (``errors``), maximal
+                number of ``series``, ``max_lag`` and mean of maximal lags
+                of scans (``mean_lag``), numbers of scans in which were
+                targets ``stale`` and merged ``gaps`` (timestamps of the
+                first and the last missing value) of targets with their
+                total length in ``missing_seconds``
+        """
+        with self._lock:
+            lags = [
+                entry["max_lag"] for entry in self.timeline
+                if entry["max_lag"] is not None]
+            gaps = {target: list(gaps) for target, gaps in self._gaps.items()}
+            return {
+                "scans": len(self.timeline),
+                "errors": sum(1 for entry in self.timeline if entry["error"]),
+                "series": max(
+                    (entry["series"] for entry in self.timeline), default=0),
+                "max_lag": max(lags, default=None),
+                "mean_lag": float(np.mean(lags)) if lags else None,
+                "stale": dict(self._stale_scans),
+                "gaps": gaps,
+                "missing_seconds": {
+                    target: sum(
+                        end - start + self._steps[target]
+                        for start, end in target_gaps)
+                    for target, target_gaps in gaps.items()},
+                }
+
+    def format_report(self, limit=10):
+        """ Return human readable report with the worst targets.
+        """
+        report = self.report()
+        lines = [
+            "{scans} scans ({errors} failed) of {series} series, "
+            "ingestion lag max {max_lag}s, mean {mean_lag}s".format(**report),
+            "{} stale series, {} series with gaps".format(
+                len(report["stale"]), len(report["gaps"]))]
+        for target, scans in sorted(
+                report["stale"].items(), key=lambda item: -item[1])[:limit]:
+            lines.append("  stale in {} scans: {}".format(scans, target))
+        for target, gaps in sorted(
+                report["gaps"].items(),
+                key=lambda item: -report["missing_seconds"][item[0]])[:limit]:
+            lines.append("  {} gaps ({}s): {} {}".format(
+                len(gaps), report["missing_seconds"][target], target, gaps))
+        return "\n".join(lines)
+
+
+# monitor of the whole test run, when enabled in config
+MONITOR_CONF = dict(CONF.config["usmqe"].get("graphite_monitor", {}))
+if MONITOR_CONF.pop("enabled", False):
+    MONITOR = GraphiteMonitor(**MONITOR_CONF)
+else:
+    MONITOR = None
@@ -0,0 +1,136 @@
+"""
+Graphite series stored in NumPy arrays.
+
+Values are float64 array with NaN in place of missing (``None``) values,
+timestamps are int64 array of epoch seconds.
+
+Example::
+
+    series = Series.from_datapoints(target, [[1.0, 60], [None, 120]])
+    series.mean(), series.count(), series.gaps()
+"""
+
+import numpy as np
+
+
+class Series(object):
+    """ Datapoints of one Graphite target.
+    """
+
+    __slots__ = ("target", "timestamps", "values")
+
+    def __init__(self, target, timestamps, values):
+        """
+        Args:
+            target (str): name of Graphite target
+            timestamps: int64 array of epoch seconds
+            values: float64 array of values, NaN for missing values
+        """
+        self.target = target
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float64)
+
+    @classmethod
+    def from_datapoints(cls, target, datapoints):
+        """ Create series from Graphite datapoints
+        ``[[value, epoch-time], [value, epoch-time], ...]``.
+        """
+        data = np.array(datapoints, dtype=np.float64).reshape(-1, 2)
+        return cls(target, data[:, 1].astype(np.int64), data[:, 0])
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return "Series({}: {} datapoints, {} values)".format(
+            self.target, len(self), self.count())
+
+    def datapoints(self):
+        """ Return datapoints in Graphite format.
+        """
+        return [
+            [None if np.isnan(value) else float(value), int(timestamp)]
+            for value, timestamp in zip(self.values, self.timestamps)]
+
+    def valid(self):
+        """ Return boolean array, True for datapoints with value.
+        """
+        return ~np.isnan(self.values)
+
+    def count(self):
+        """ Return number of datapoints with value.
+        """
+        return int(np.count_nonzero(self.valid()))
+
+    def mean(self):
+        """ Return mean of values, missing values are ignored. NaN is
+        returned when there is no value.
+        """
+        if not self.count():
+            return float("nan")
+        return float(np.nanmean(self.values))
+
+    def step(self):
+        """ Return time between datapoints in seconds (None for series with
+        less than two datapoints).
+        """
+        if len(self) < 2:
+            return None
+        return int(np.median(np.diff(self.timestamps)))
+
+    def gaps(self):
+        """ Return list of ``(from, until)`` timestamps of runs of missing
+        values (both inclusive).
+        """
+        missing = np.concatenate(
+            ([False], np.isnan(self.values), [False])).astype(np.int8)
+        edges = np.diff(missing)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1) - 1
+        return [
+            (int(self.timestamps[start]), int(self.timestamps[end]))
+            for start, end in zip(starts, ends)]
+
+    def slice(self, from_ts=None, until_ts=None):
+        """ Return series with datapoints in given time range (inclusive).
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if from_ts is not None:
+            mask &= self.timestamps >= from_ts
+        if until_ts is not None:
+            mask &= self.timestamps <= until_ts
+        return Series(self.target, self.timestamps[mask], self.values[mask])
+
+
+def combine(series_list, operation="sum", target=None):
+    """ Combine values of series with the same timestamps.
+
+    Only timestamps present in all series are used, missing value in any
+    series makes the combined value missing.
+
+    Args:
+        series_list (list): Series objects
+        operation (str): ``sum`` - summation of values, ``diff`` - values of
+            other series are subtracted from values of the first one
+        target (str): name of combined series
+    """
+    if operation not in ("sum", "diff"):
+        raise ValueError("Operation '{0}' is not supported.".format(operation))
+    if not series_list:
+        return Series(target, [], [])
+    timestamps = series_list[0].timestamps
+    for series in series_list[1:]:
+        timestamps = np.intersect1d(timestamps, series.timestamps)
+    values = None
+    for series in series_list:
+        aligned = series.values[np.searchsorted(series.timestamps, timestamps)]
+        if values is None:
+            values = aligned.copy()
+        elif operation == "sum":
+            values += aligned
+        else:
+            values -= aligned
+    if target is None:
+        target = "{}({})".format(
+            operation, ",".join(str(series.target) for series in series_list))
+    return Series(target, timestamps, values)
@@ -0,0 +1,170 @@
+"""
+Deterministic synthetic Graphite metrics.
+
+Values of each metric are computed from its name and timestamp only (a
+sine wave with level, amplitude, period and phase derived from the name
+plus hash based noise), so any time range of any number of metrics can be
+generated repeatedly with the same result, without stored state.
+
+Example::
+
+    names = synthetic.tendrl_names(
+        "c1", hosts=["host1_example_com"], volumes={"vol1": ["brick1"]})
+    generator = synthetic.SyntheticMetrics(seed=1, gap_ratio=0.01)
+    series = generator.series(names[0], from_ts, until_ts)
+"""
+
+import zlib
+
+import numpy as np
+
+from usmqe.api.graphiteapi.series import Series
+
+NODE_METRICS = (
+    "cpu.percent-user",
+    "cpu.percent-system",
+    "memory.percent-used",
+    "swap.percent-used",
+    "network.if_octets.rx",
+    "network.if_octets.tx",
+    )
+
+VOLUME_METRICS = (
+    "pcnt_used",
+    "usable_capacity",
+    "used_capacity",
+    )
+
+BRICK_METRICS = (
+    "utilization.percent-percent_bytes",
+    "iops.gauge-read",
+    "iops.gauge-write",
+    )
+
+
+def tendrl_names(
+        cluster_id, hosts=(), volumes=None, short_name=None,
+        node_metrics=NODE_METRICS, volume_metrics=VOLUME_METRICS,
+        brick_metrics=BRICK_METRICS):
+    """ Return names of metrics of a cluster in Tendrl naming scheme.
+
+    Args:
+        cluster_id (str): integration id of the cluster, metrics are under
+            ``tendrl.clusters.<cluster_id>``
+        hosts (list): names of hosts as used in Graphite
+        volumes (dict): lists of bricks (names as used in Graphite) of
+            volumes, bricks are assigned to hosts in round robin
+        short_name (str): short name of the cluster, the same metrics are
+            also under ``tendrl.names.<short_name>``
+        node_metrics (list): metrics of each host
+        volume_metrics (list): metrics of each volume
+        brick_metrics (list): metrics of each brick
+    """
+    roots = ["tendrl.clusters.{}".format(cluster_id)]
+    if short_name:
+        roots.append("tendrl.names.{}".format(short_name))
+    hosts = list(hosts)
+    names = []
+    for root in roots:
+        for host in hosts:
+            names.extend(
+                "{}.nodes.{}.{}".format(root, host, metric)
+                for metric in node_metrics)
+        for volume, bricks in (volumes or {}).items():
+            names.extend(
+                "{}.volumes.{}.{}".format(root, volume, metric)
+                for metric in volume_metrics)
+            for idx, brick in enumerate(bricks):
+                host = hosts[idx % len(hosts)] if hosts else "localhost"
+                names.extend(
+                    "{}.volumes.{}.nodes.{}.bricks.{}.{}".format(
+                        root, volume, host, brick, metric)
+                    for metric in brick_metrics)
+    return names
+
+
+def _hash(name, seed):
+    return zlib.crc32("{}:{}".format(seed, name).encode("utf-8"))
+
+
+def _noise(key, timestamps):
+    """ Return deterministic pseudo random numbers in <0, 1) for key and
+    timestamps.
+    """
+    mixed = (timestamps.astype(np.uint64) + np.uint64(key)) * \
+        np.uint64(0x9E3779B97F4A7C15)
+    mixed ^= mixed >> np.uint64(29)
+    mixed *= np.uint64(0xBF58476D1CE4E5B9)
+    mixed ^= mixed >> np.uint64(32)
+    return (mixed >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+class SyntheticMetrics(object):
+    """ Generator of deterministic values of Graphite metrics.
+    """
+
+    def __init__(
+            self, seed=0, step=60, noise=1.0, gap_ratio=0.0, overrides=None):
+        """
+        Args:
+            seed (int): seed which changes values of all metrics
+            step (int): time between datapoints in seconds
+            noise (float): amplitude of random noise added to values
+            gap_ratio (float): ratio of missing values (None datapoints)
+            overrides (dict): functions which get int64 array of timestamps
+                and return values of given metrics (e.g. expected workload),
+                keys are metric names
+        """
+        self.seed = seed
+        self.step = step
+        self.noise = noise
+        self.gap_ratio = gap_ratio
+        self.overrides = dict(overrides or {})
+
+    def timestamps(self, from_ts, until_ts):
+        """ Return timestamps of datapoints in interval ``(from_ts,
+        until_ts)`` aligned to step.
+        """
+        first = (int(from_ts) // self.step + 1) * self.step
+        return np.arange(first, int(until_ts) + 1, self.step, dtype=np.int64)
+
+    def values(self, name, timestamps):
+        """ Return values of the metric in given timestamps, NaN for
+        missing values.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        key = _hash(name, self.seed)
+        if name in self.overrides:
+            values = np.asarray(
+                self.overrides[name](timestamps), dtype=np.float64).copy()
+        else:
+            level = key % 80 + 10
+            amplitude = (key >> 8) % 10
+            period = ((key >> 16) % 24 + 1) * 3600
+            phase = (key >> 24) % 360 / 180 * np.pi
+            values = level + amplitude * np.sin(
+                2 * np.pi * timestamps / period + phase)
+            if self.noise:
+                values += self.noise * (_noise(key, timestamps) - 0.5)
+        if self.gap_ratio:
+            values[_noise(key ^ 0x5bd1e995, timestamps) < self.gap_ratio] = np.nan
+        return values
+
+    def series(self, name, from_ts, until_ts):
+        """ Return Series of the metric in interval ``(from_ts, until_ts)``.
+        """
+        timestamps = self.timestamps(from_ts, until_ts)
+        return Series(name, timestamps, self.values(name, timestamps))
+
+    def datapoints(self, names, from_ts, until_ts):
+        """ Generate ``(name, timestamp, value)`` tuples of all metrics in
+        interval ``(from_ts, until_ts)``, missing values are skipped (e.g.
+        for :class:`usmqe.api.graphiteapi.mockserver.CarbonClient`).
+        """
+        for name in names:
+            series = self.series(name, from_ts, until_ts)
+            valid = series.valid()
+            for timestamp, value in zip(
+                    series.timestamps[valid].tolist(),
+                    series.values[valid].tolist()):
+                yield name, timestamp, value
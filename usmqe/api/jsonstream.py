@@ -0,0 +1,213 @@
+"""
+Iterative decoding of large json responses.
+
+Items of a list in json body are decoded and yielded one by one while the
+body is being downloaded, so the whole body and all decoded items are never
+in memory at once.
+
+Example::
+
+    response = api.request("GET", url, auth=auth, stream=True)
+    for node in iter_items(response, key="nodes", fields=["node_id", "fqdn"]):
+        ...
+"""
+
+import codecs
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+# characters which change state of scan of json value
+STRING_SPECIAL_RE = re.compile(r'["\\]')
+STRUCTURE_RE = re.compile(r'["\[\]{}]')
+SCALAR_END_RE = re.compile(r'[\s,\]}]')
+
+
+class _Buffer(object):
+    """ Text buffer filled from iterator of byte chunks.
+    """
+
+    def __init__(self, chunks, encoding="utf-8"):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self.text = ""
+        self.pos = 0
+        self.finished = False
+
+    def fill(self):
+        """ Read next chunk into the buffer, return False at the end.
+        """
+        if self.finished:
+            return False
+        # drop consumed text, so the buffer doesn't grow with the body
+        if self.pos:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self.text += self._decoder.decode(chunk)
+                return True
+        self.text += self._decoder.decode(b"", final=True)
+        self.finished = True
+        return False
+
+    def peek(self):
+        """ Return next character which is not whitespace (None at the end).
+        """
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, chars):
+        """ Consume next character, which has to be one of given characters.
+        """
+        char = self.peek()
+        if char is None or char not in chars:
+            raise ValueError("Expected one of '{}' at position {}, got {!r}".format(
+                chars, self.pos, char))
+        self.pos += 1
+        return char
+
+    def scan(self, state):
+        """ Scan text of the next json value which was not scanned yet.
+
+        Args:
+            state (dict): state of the scan (position relative to the start
+                of the value, depth of brackets and string flag), updated
+                by the scan
+
+        Returns:
+            int: end of the value in the buffer, None when the value is not
+                complete yet
+        """
+        text = self.text
+        pos = self.pos + state["offset"]
+        if text[self.pos] not in '"[{':
+            # number, true, false or null ends by delimiter
+            match = SCALAR_END_RE.search(text, pos)
+            state["offset"] = len(text) - self.pos
+            return match.start() if match else None
+        end = None
+        while end is None:
+            if state["string"]:
+                match = STRING_SPECIAL_RE.search(text, pos)
+                if match is None:
+                    pos = len(text)
+                    break
+                if match.group() == "\\":
+                    if match.end() == len(text):
+                        # escaped character is in next chunk
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                state["string"] = False
+                pos = match.end()
+                if state["depth"] == 0:
+                    end = pos
+                continue
+            match = STRUCTURE_RE.search(text, pos)
+            if match is None:
+                pos = len(text)
+                break
+            pos = match.end()
+            char = match.group()
+            if char == '"':
+                state["string"] = True
+            elif char in "[{":
+                state["depth"] += 1
+            else:
+                state["depth"] -= 1
+                if state["depth"] == 0:
+                    end = pos
+        state["offset"] = pos - self.pos
+        return end
+
+    def decode(self, decoder):
+        """ Decode next json value from the buffer. Text of the value is
+        scanned as the chunks are read and decoded only once when the value
+        is complete.
+        """
+        if self.peek() is None:
+            raise ValueError("Expected json value at position {}".format(self.pos))
+        state = {"offset": 0, "depth": 0, "string": False}
+        while self.scan(state) is None and self.fill():
+            pass
+        value, end = decoder.raw_decode(self.text, self.pos)
+        self.pos = end
+        return value
+
+
+def project(record, fields):
+    """ Return copy of the record with given fields only.
+
+    Args:
+        record (dict): decoded json object
+        fields (list): dotted paths of fields, e.g.
+            ``["node_id", "localstorage.blockdevices.free"]``
+    """
+    result = {}
+    for field in fields:
+        source = record
+        target = result
+        keys = field.split(".")
+        for key in keys[:-1]:
+            if not isinstance(source, dict) or key not in source:
+                break
+            source = source[key]
+            target = target.setdefault(key, {})
+        else:
+            if isinstance(source, dict) and keys[-1] in source:
+                target[keys[-1]] = source[keys[-1]]
+    return result
+
+
+def iter_json_items(chunks, key=None, fields=None):
+    """ Decode items of json list from iterator of byte chunks.
+
+    Args:
+        chunks: iterator of bytes with json document
+        key (str): key of the list in top level json object, None when the
+            top level value is the list itself
+        fields (list): dotted paths of fields of returned items (see
+            :func:`project`), None for whole items
+
+    Raises:
+        ValueError: when the document is not valid json or the key is missing
+    """
+    buf = _Buffer(chunks)
+    decoder = json.JSONDecoder()
+    if key is not None:
+        buf.expect("{")
+        while True:
+            if buf.peek() == "}":
+                raise ValueError("Key '{}' not found in json object".format(key))
+            name = buf.decode(decoder)
+            buf.expect(":")
+            if name == key:
+                break
+            buf.decode(decoder)
+            if buf.expect(",}") == "}":
+                raise ValueError("Key '{}' not found in json object".format(key))
+    buf.expect("[")
+    if buf.peek() == "]":
+        return
+    while True:
+        item = buf.decode(decoder)
+        yield project(item, fields) if fields else item
+        if buf.expect(",]") == "]":
+            return
+
+
+def iter_items(response, key=None, fields=None, chunk_size=CHUNK_SIZE):
+    """ Decode items of json list from response of request sent with
+    ``stream=True`` (see :func:`iter_json_items`).
+    """
+    return iter_json_items(
+        response.iter_content(chunk_size=chunk_size), key=key, fields=fields)
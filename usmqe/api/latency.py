@@ -0,0 +1,126 @@
+"""
+Latency budgets of REST API endpoints.
+
+Response time of each response checked by :meth:`ApiBase.check_response` is
+recorded per endpoint. Endpoint is identified by HTTP method and path of
+the url with ids replaced by ``:id``, e.g.
+``GET /api/1.0/clusters/:id/volumes``. Budgets of endpoints are configured
+in ``api_latency`` config option.
+"""
+
+import fnmatch
+import re
+import threading
+from urllib.parse import urlparse
+
+import pytest
+from usmqe.usmqeconfig import UsmConfig
+
+LOGGER = pytest.get_logger("api_latency", module=True)
+CONF = UsmConfig()
+
+ID_RE = re.compile(
+    r"(?<=/)([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+    r"|[0-9a-f]{32}|\d+)(?=/|$)", re.IGNORECASE)
+
+
+def endpoint(method, url):
+    """ Return name of endpoint of the request, e.g.
+    ``GET /api/1.0/clusters/:id/volumes``.
+    """
+    return "{} {}".format(method, ID_RE.sub(":id", urlparse(url).path))
+
+
+class LatencyBudgets(object):
+    """ Recorded response times and latency budgets of API endpoints.
+    """
+
+    def __init__(self, default=None, budgets=None, issue=None, report=10):
+        """
+        Args:
+            default (float): budget in seconds of endpoints without their own
+                budget, None means no limit
+            budgets (dict): budgets of endpoints, keys are fnmatch patterns of
+                endpoint names, values are budgets in seconds or dictionaries
+                with ``max`` (budget in seconds) and ``issue`` keys
+            issue: known issue, exceeded budgets are logged as WAIVE
+            report (int): number of the slowest endpoints in summary
+        """
+        self.default = default
+        self.budgets = []
+        for pattern, budget in (budgets or {}).items():
+            if not isinstance(budget, dict):
+                budget = {"max": budget}
+            self.budgets.append(
+                (pattern, budget["max"], budget.get("issue", issue)))
+        self.issue = issue
+        self.report = report
+        self._elapsed = {}
+        self._lock = threading.Lock()
+
+    def budget(self, name):
+        """ Return tuple ``(budget, issue)`` of endpoint with given name.
+        """
+        for pattern, budget, issue in self.budgets:
+            if fnmatch.fnmatch(name, pattern):
+                return budget, issue
+        return self.default, self.issue
+
+    def record(self, name, elapsed):
+        """ Record response time (in seconds) of given endpoint.
+        """
+        with self._lock:
+            self._elapsed.setdefault(name, []).append(elapsed)
+
+    def check(self, resp, max_latency=None, issue=None):
+        """ Record response time of the response and check it against
+        budget of its endpoint.
+
+        Args:
+            resp: response to check
+            max_latency (float): budget in seconds which overrides configured
+                budget of the endpoint
+            issue: known issue, log WAIVE
+        """
+        name = endpoint(resp.request.method, resp.url)
+        elapsed = resp.elapsed.total_seconds()
+        self.record(name, elapsed)
+        budget, budget_issue = self.budget(name)
+        if max_latency is not None:
+            budget = max_latency
+        if budget is None:
+            return
+        pytest.check(
+            elapsed <= budget,
+            "Response time of {} ({:.3f}s) should be at most {}s".format(
+                name, elapsed, budget),
+            issue=issue or budget_issue)
+
+    def summary(self):
+        """ Return statistics of the slowest endpoints.
+
+        Returns:
+            list: dictionaries with ``endpoint``, ``count``, ``mean`` and
+                ``max`` response time, sorted by ``max`` (slowest first)
+        """
+        with self._lock:
+            items = [(name, list(values)) for name, values in self._elapsed.items()]
+        stats = [
+            {"endpoint": name, "count": len(values),
+             "mean": sum(values) / len(values), "max": max(values)}
+            for name, values in items]
+        stats.sort(key=lambda item: item["max"], reverse=True)
+        return stats[:self.report]
+
+    def format_summary(self):
+        """ Format summary of the slowest endpoints as text table.
+        """
+        lines = ["{:<60}{:>8}{:>10}{:>10}".format(
+            "endpoint", "count", "mean", "max")]
+        for item in self.summary():
+            lines.append("{:<60}{:>8}{:>10.3f}{:>10.3f}".format(
+                item["endpoint"], item["count"], item["mean"], item["max"]))
+        return "\n".join(lines)
+
+
+LATENCY = LatencyBudgets(**CONF.config["usmqe"].get("api_latency", {}))
@@ -0,0 +1,180 @@
+"""
+In-process HTTP server used as a stand-in of REST API servers.
+
+Subclasses register handlers of requests via :meth:`MockServer.route`,
+handler gets :class:`MockRequest` object and returns tuple
+``(status, body)`` or ``(status, body, headers)``, where body is
+a json serializable object, string or bytes.
+"""
+
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlparse
+
+
+class MockRequest(object):
+    """ Request received by MockServer.
+    """
+
+    def __init__(self, method, path, query, headers, body, match):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.match = match
+
+    def json(self):
+        """ Return decoded json body of the request.
+        """
+        return json.loads(self.body.decode("utf-8")) if self.body else None
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class MockServer(object):
+    """ HTTP server running in background thread of current process.
+
+    Example::
+
+        with TendrlMockServer(latency=0.05) as server:
+            CONF.config["usmqe"]["api_url"] = server.url + "api/1.0/"
+    """
+
+    def __init__(
+            self, host="127.0.0.1", port=0, latency=0, jitter=0,
+            compress=False):
+        """
+        Args:
+            host (str): address where the server listens
+            port (int): port of the server, 0 means random free port
+            latency (float): time in seconds added to processing of each
+                request
+            jitter (float): maximal random time in seconds added to latency
+            compress (bool): compress responses by gzip, when the client
+                accepts it
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.compress = compress
+        self.requests_count = 0
+        self._routes = []
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        """ Base url of running server (ends with slash).
+        """
+        return "http://{}:{}/".format(self.host, self.port)
+
+    def route(self, method, pattern, handler):
+        """ Register handler of requests.
+
+        Args:
+            method (str): HTTP method, e.g. ``GET``
+            pattern (str): regular expression which has to match whole path
+                of the request, its groups are available in ``request.match``
+            handler (function): function which gets MockRequest object
+        """
+        self._routes.append((method, re.compile(pattern + "$"), handler))
+
+    def dispatch(self, method, raw_path, headers, body):
+        """ Find handler of the request and return its response tuple.
+        """
+        url = urlparse(raw_path)
+        with self._lock:
+            self.requests_count += 1
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+        path_found = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(url.path)
+            if match is None:
+                continue
+            path_found = True
+            if route_method == method:
+                request = MockRequest(
+                    method, url.path, parse_qs(url.query), headers, body,
+                    match)
+                return handler(request)
+        if path_found:
+            return 405, {"errors": {"message": "Method Not Allowed"}}
+        return 404, {"errors": {"message": "Not Found"}}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def handle_request(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                response = server.dispatch(
+                    self.command, self.path, self.headers, body)
+                status, content = response[:2]
+                headers = response[2] if len(response) > 2 else {}
+                if isinstance(content, bytes):
+                    content_type = "application/octet-stream"
+                elif isinstance(content, str):
+                    content = content.encode("utf-8")
+                    content_type = "text/plain"
+                else:
+                    content = json.dumps(content).encode("utf-8")
+                    content_type = "application/json"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                if server.compress and "gzip" in (
+                        self.headers.get("Accept-Encoding") or ""):
+                    content = gzip.compress(content)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(content)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_DELETE = handle_request
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """ Start the server in background thread.
+        """
+        self._server = _ThreadingHTTPServer(
+            (self.host, self.port), self._handler_class())
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """ Stop the server.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,25 @@
+"""
+Redaction of secrets (tokens, passwords, cookies) in requests and responses
+which are logged or stored in cassettes.
+"""
+
+import re
+
+# headers with secret values, lower case
+REDACTED_HEADERS = ("authorization", "cookie", "set-cookie")
+
+# json fields with secret values
+REDACTED_BODY_RE = re.compile(
+    r'("(?:access_token|password|password_confirmation)"\s*:\s*)"[^"]*"')
+
+
+def redact_body(body):
+    """ Return text of json body with hidden values of secret fields.
+    """
+    return REDACTED_BODY_RE.sub(r'\1"***"', body)
+
+
+def secret_header(name):
+    """ Return True for header with secret value.
+    """
+    return name.lower() in REDACTED_HEADERS
@@ -0,0 +1,86 @@
+"""
+Validation of REST API data against simple ``{key: type}`` schema.
+"""
+
+
+class SchemaValidator(object):
+    """ Schema compiled into validator of whole lists of dictionaries.
+
+    Example::
+
+        validator = SchemaValidator({'name': str, 'size': int})
+        violations = validator(bricks)
+    """
+
+    def __init__(self, schema, id_key=None):
+        """
+        Args:
+            schema: dictionary with keys and value types, e.g.:
+                  {'name': str, 'size': int, 'tasks': dict}
+            id_key: key used to identify a record in messages about
+                  violations, index of the record is used when it is None
+        """
+        self.schema = schema
+        self.id_key = id_key
+        self._keys = frozenset(schema)
+        self._types = tuple(schema.items())
+
+    def __repr__(self):
+        return "SchemaValidator({})".format(self.schema)
+
+    def _record_id(self, index, record):
+        if self.id_key is not None and self.id_key in record:
+            return "{}={}".format(self.id_key, record[self.id_key])
+        return "#{}".format(index)
+
+    def validate(self, record, index=0):
+        """ Return list of violations of the schema in one dictionary.
+
+        Args:
+            record: dictionary to check
+            index: position of the record in checked list
+        """
+        violations = []
+        keys = record.keys()
+        if keys != self._keys:
+            missing = self._keys - keys
+            unknown = keys - self._keys
+            if missing:
+                violations.append("{}: missing keys {}".format(
+                    self._record_id(index, record), sorted(missing)))
+            if unknown:
+                violations.append("{}: unknown keys {}".format(
+                    self._record_id(index, record), sorted(unknown)))
+        for key, value_type in self._types:
+            if key in record and not isinstance(record[key], value_type):
+                violations.append(
+                    "{}: '{}' value {!r} should be instance of {}".format(
+                        self._record_id(index, record), key, record[key],
+                        value_type))
+        return violations
+
+    def __call__(self, records):
+        """ Return list of violations of the schema in all given records.
+
+        Args:
+            records: iterable of dictionaries to check
+        """
+        violations = []
+        for index, record in enumerate(records):
+            # fast path for valid records
+            if record.keys() == self._keys and all(
+                    isinstance(record[key], value_type)
+                    for key, value_type in self._types):
+                continue
+            violations.extend(self.validate(record, index))
+        return violations
+
+
+def compile_schema(schema, id_key=None):
+    """ Compile ``{key: type}`` schema into :class:`SchemaValidator`.
+
+    Args:
+        schema: dictionary with keys and value types
+        id_key: key used to identify a record in messages about violations
+    """
+    return SchemaValidator(schema, id_key=id_key)
@@ -0,0 +1,216 @@
+"""
+Asyncio variant of Tendrl REST API.
+
+Every coroutine runs the synchronous method of the same name from
+:class:`TendrlApi` (or :class:`TendrlApiGluster`) in a thread pool, so the
+responses are checked exactly the same way (``check_response``) as in the
+synchronous API. Checks of responses are collected by :class:`CheckCollector`
+of the call and logged in the thread of event loop when the method finishes.
+Size of the thread pool limits number of requests which are sent to Tendrl at
+once.
+The thread pool exists only inside of ``with`` block of the api object.
+
+Example::
+
+    with AsyncTendrlApiGluster(auth=valid_session_credentials) as api:
+        cluster = asyncapi.run(api.describe_cluster(cluster_id))
+"""
+
+import asyncio
+import concurrent.futures
+import copy
+
+import pytest
+from usmqe.api.base import ApiBase
+from usmqe.api.tendrlapi.common import TendrlApi
+from usmqe.api.tendrlapi.glusterapi import TendrlApiGluster
+
+LOGGER = pytest.get_logger("tendrlapi.asyncapi", module=True)
+
+# default number of requests which could be processed at the same time
+DEFAULT_CONCURRENCY = 8
+
+
+def run(coroutine):
+    """ Run given coroutine in a new event loop and return its result.
+
+    Args:
+        coroutine: coroutine object, e.g. ``api.get_cluster_list()``
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class CheckCollector(object):
+    """ Collector of response checks of one api call, which is used instead
+    of ``check_response`` method of the api object in worker thread.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def check_response(self, *args, **kwargs):
+        """ Store arguments of :meth:`ApiBase.check_response`.
+        """
+        self.calls.append((args, kwargs))
+
+    def log(self):
+        """ Check all collected responses.
+        """
+        for args, kwargs in self.calls:
+            ApiBase.check_response(*args, **kwargs)
+        self.calls = []
+
+
+class AsyncTendrlApi(object):
+    """ Common methods for Tendrl REST API as coroutines.
+    """
+
+    api_class = TendrlApi
+
+    def __init__(self, auth=None, concurrency=DEFAULT_CONCURRENCY):
+        """
+        Args:
+            auth: TendrlAuth object (defines bearer token header), when auth is
+               None, requests are send without athentication header
+            concurrency (int): maximal number of requests processed at once
+        """
+        self.api = self.api_class(auth=auth)
+        self.concurrency = concurrency
+        self._executor = None
+
+    def __enter__(self):
+        """ Start thread pool used for processing of requests.
+        """
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.concurrency)
+        return self
+
+    def __exit__(self, *args):
+        """ Shutdown thread pool used for processing of requests.
+        """
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    async def _call(self, method, *args, **kwargs):
+        """ Run synchronous api method in thread pool and log its checks.
+
+        Args:
+            method (str): name of method of synchronous api object
+            args, kwargs: arguments passed to the method
+        """
+        if self._executor is None:
+            raise RuntimeError(
+                "{} has to be used in with statement".format(
+                    type(self).__name__))
+        loop = asyncio.get_event_loop()
+        collector = CheckCollector()
+        # api object of the call, its responses are checked after the call
+        api = copy.copy(self.api)
+        api.check_response = collector.check_response
+        try:
+            return await loop.run_in_executor(
+                self._executor, lambda: getattr(api, method)(*args, **kwargs))
+        finally:
+            collector.log()
+
+    async def gather(self, *coroutines):
+        """ Wait for all given coroutines and return list of their results.
+        """
+        return await asyncio.gather(*coroutines)
+
+    async def get_job_attribute(self, job_id, attribute="status", section=None):
+        """ See :meth:`TendrlApi.get_job_attribute`.
+        """
+        return await self._call(
+            "get_job_attribute", job_id, attribute=attribute, section=section)
+
+    async def get_job_messages(self, job_id):
+        """ See :meth:`TendrlApi.get_job_messages`.
+        """
+        return await self._call("get_job_messages", job_id)
+
+    async def jobs(self, asserts_in=None):
+        """ See :meth:`TendrlApi.jobs`.
+        """
+        return await self._call("jobs", asserts_in=asserts_in)
+
+    async def ping(self, asserts_in=None):
+        """ See :meth:`TendrlApi.ping`.
+        """
+        return await self._call("ping", asserts_in=asserts_in)
+
+    async def get_nodes(self):
+        """ See :meth:`TendrlApi.get_nodes`.
+        """
+        return await self._call("get_nodes")
+
+    async def get_cluster_list(self):
+        """ See :meth:`TendrlApi.get_cluster_list`.
+        """
+        return await self._call("get_cluster_list")
+
+    async def get_cluster(self, cluster_id):
+        """ See :meth:`TendrlApi.get_cluster`.
+        """
+        return await self._call("get_cluster", cluster_id)
+
+
+class AsyncTendrlApiGluster(AsyncTendrlApi):
+    """ Gluster methods for Tendrl REST API as coroutines.
+    """
+
+    api_class = TendrlApiGluster
+
+    async def get_node_list(self, cluster):
+        """ See :meth:`TendrlApiGluster.get_node_list`.
+        """
+        return await self._call("get_node_list", cluster)
+
+    async def get_volume_list(self, cluster):
+        """ See :meth:`TendrlApiGluster.get_volume_list`.
+        """
+        return await self._call("get_volume_list", cluster)
+
+    async def get_brick_list(self, cluster, volume):
+        """ See :meth:`TendrlApiGluster.get_brick_list`.
+        """
+        return await self._call("get_brick_list", cluster, volume)
+
+    async def get_volume_attribute(self, cluster, volume, attribute):
+        """ See :meth:`TendrlApiGluster.get_volume_attribute`.
+        """
+        return await self._call(
+            "get_volume_attribute", cluster, volume, attribute)
+
+    async def describe_cluster(self, cluster):
+        """ Get cluster, its nodes, volumes and bricks of all volumes.
+
+        Cluster, node list and volume list are requested at once, brick lists
+        of all volumes are requested at once when volume list is available.
+
+        Args:
+            cluster: id of cluster
+
+        Returns:
+            dict: with keys ``cluster``, ``nodes``, ``volumes`` and ``bricks``
+                (dictionary of brick lists where key is volume id)
+        """
+        cluster_info, nodes, volumes = await self.gather(
+            self.get_cluster(cluster),
+            self.get_node_list(cluster),
+            self.get_volume_list(cluster))
+        volume_ids = [volume["vol_id"] for volume in volumes["volumes"]]
+        brick_lists = await self.gather(*[
+            self.get_brick_list(cluster, volume_id)
+            for volume_id in volume_ids])
+        LOGGER.debug("cluster {} described: {} volumes".format(
+            cluster, len(volume_ids)))
+        return {
+            "cluster": cluster_info,
+            "nodes": nodes,
+            "volumes": volumes,
+            "bricks": dict(zip(volume_ids, brick_lists))}
@@ -0,0 +1,118 @@
+"""
+Cache of responses of idempotent Tendrl REST API requests.
+"""
+
+import fnmatch
+import threading
+import time
+
+import pytest
+from usmqe.api.base import ApiResponse
+
+LOGGER = pytest.get_logger("tendrlapi.cache", module=True)
+
+
+class ResponseCache(object):
+    """
+    Cache of successful responses of GET requests, identified by user and
+    url.
+
+    Cached response is used for ``ttl`` seconds. When it expires and the
+    server provided ``ETag`` or ``Last-Modified`` header, the request is
+    sent as conditional request and the cached response is used again when
+    the server replies with ``304 Not Modified``. All cached responses
+    should be dropped by :meth:`invalidate` after any change of Tendrl state
+    (:class:`usmqe.api.tendrlapi.common.TendrlApi` does it after every
+    non-GET request and after waiting for jobs). Every caller gets its own
+    :class:`ApiResponse` of the cached response, so it decodes its own copy
+    of json body, which could be changed without effect on other callers.
+    """
+
+    def __init__(self, ttl=60, exclude=None):
+        """
+        Args:
+            ttl (float): time in seconds for which is a response used without
+                asking the server
+            exclude (list): url path patterns (in fnmatch format) of requests
+                which are never cached, e.g. ``["*/jobs*"]``
+        """
+        self.ttl = ttl
+        self.exclude = exclude or []
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.invalidations = 0
+
+    def cacheable(self, url):
+        """ Return True if response of given url could be cached.
+        """
+        path = url.split("?", 1)[0]
+        return not any(
+            fnmatch.fnmatch(path, pattern) for pattern in self.exclude)
+
+    def get(self, key, send, fresh=False):
+        """ Return cached response for given key or get new one.
+
+        Args:
+            key: identification of request, e.g. ``(username, url)``
+            send: function which sends the request, it takes dictionary of
+                additional headers (for conditional request) as its argument
+            fresh (bool): don't use cached response and store the new one,
+                e.g. in loops which poll for change of Tendrl state
+        """
+        with self._lock:
+            entry = None if fresh else self._entries.get(key)
+        headers = {}
+        if entry is not None:
+            stored, response = entry
+            if time.monotonic() - stored < self.ttl:
+                with self._lock:
+                    self.hits += 1
+                return self._copy(response)
+            if "ETag" in response.headers:
+                headers["If-None-Match"] = response.headers["ETag"]
+            if "Last-Modified" in response.headers:
+                headers["If-Modified-Since"] = response.headers["Last-Modified"]
+        new_response = send(headers)
+        with self._lock:
+            if entry is not None and headers and new_response.status_code == 304:
+                self.revalidations += 1
+                self._entries[key] = (time.monotonic(), entry[1])
+                return self._copy(entry[1])
+            self.misses += 1
+            if new_response.status_code == 200:
+                self._entries[key] = (time.monotonic(), new_response)
+        return new_response
+
+    @staticmethod
+    def _copy(response):
+        """ Return new wrapper of cached response with json body not decoded
+        yet.
+        """
+        if isinstance(response, ApiResponse):
+            return ApiResponse(response.response)
+        return response
+
+    def invalidate(self):
+        """ Drop all cached responses.
+        """
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self):
+        """ Return dictionary with cache statistics.
+        """
+        with self._lock:
+            requests_count = self.hits + self.revalidations + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "revalidations": self.revalidations,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": (self.hits + self.revalidations) / max(
+                    requests_count, 1)}
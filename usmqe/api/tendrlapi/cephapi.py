@@ -2,7 +2,6 @@
 Tendrl REST API for ceph.
 """
 import pytest
-import requests
 from usmqe.api.tendrlapi.common import TendrlApi
 from usmqe.usmqeconfig import UsmConfig
 
@@ -72,7 +71,8 @@ class TendrlApiCeph(TendrlApi):
             pool_data["Pool.quota_max_objects"] = quota_max_objects
         if quota_max_bytes:
             pool_data["Pool.quota_max_bytes"] = quota_max_bytes
-        response = requests.post(
+        response = self.request(
+            "POST",
             CONF.config["usmqe"]["api_url"] + pattern,
             json=pool_data,
             auth=self._auth)
@@ -133,7 +133,8 @@ class TendrlApiCeph(TendrlApi):
         if quota_max_bytes:
             pool_data["Pool.quota_max_bytes"] = quota_max_bytes
 
-        response = requests.put(
+        response = self.request(
+            "PUT",
             CONF.config["usmqe"]["api_url"] + pattern,
             json=pool_data,
             auth=self._auth)
@@ -159,7 +160,8 @@ class TendrlApiCeph(TendrlApi):
             asserts_in (dict): assert values for this call and this method
         """
         pattern = "{}/GetPoolList".format(cluster)
-        response = requests.get(
+        response = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth)
         self.print_req_info(response)
@@ -180,7 +182,8 @@ class TendrlApiCeph(TendrlApi):
         """
         pattern = "{}/CephDeletePool".format(cluster)
         pool_data = {"Pool.pool_id": pool_id}
-        response = requests.delete(
+        response = self.request(
+            "DELETE",
             CONF.config["usmqe"]["api_url"] + pattern,
             json=pool_data,
             auth=self._auth)
@@ -212,7 +215,8 @@ class TendrlApiCeph(TendrlApi):
                      "Rbd.name": name,
                      "Rbd.size": size
                      }
-        response = requests.post(
+        response = self.request(
+            "POST",
             CONF.config["usmqe"]["api_url"] + pattern,
             json=pool_data,
             auth=self._auth)
@@ -244,7 +248,8 @@ class TendrlApiCeph(TendrlApi):
                      "Rbd.name": name,
                      "Rbd.size": size
                      }
-        response = requests.put(
+        response = self.request(
+            "PUT",
             CONF.config["usmqe"]["api_url"] + pattern,
             json=pool_data,
             auth=self._auth)
@@ -272,7 +277,8 @@ class TendrlApiCeph(TendrlApi):
         """
         pattern = "{}/CephDeleteRbd".format(cluster)
         pool_data = {"Rbd.pool_id": pool_id, "Rbd.name": name}
-        response = requests.delete(
+        response = self.request(
+            "DELETE",
             CONF.config["usmqe"]["api_url"] + pattern,
             json=pool_data,
             auth=self._auth)
@@ -314,7 +320,8 @@ class TendrlApiCeph(TendrlApi):
                      "ECProfile.directory": directory,
                      "ECProfile.ruleset_failure_domain": ruleset_fail_dom,
                      }
-        response = requests.post(
+        response = self.request(
+            "POST",
             CONF.config["usmqe"]["api_url"] + pattern,
             json=pool_data,
             auth=self._auth)
@@ -341,7 +348,8 @@ class TendrlApiCeph(TendrlApi):
         """
         pattern = "{}/CephDeleteECProfile".format(cluster)
         pool_data = {"ECProfile.name": name}
-        response = requests.delete(
+        response = self.request(
+            "DELETE",
             CONF.config["usmqe"]["api_url"] + pattern,
             json=pool_data,
             auth=self._auth)
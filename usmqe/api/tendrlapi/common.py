@@ -1,18 +1,38 @@
 """Tendrl REST API common functions."""
 
 import json
+import threading
 import time
 import datetime
 
 import pytest
 import requests
 
+from usmqe.api.backoff import backoff_delays
+from usmqe.api import jsonstream
 from usmqe.api.base import ApiBase
+from usmqe.api.tendrlapi.cache import ResponseCache
 from usmqe.usmqeconfig import UsmConfig
 
 LOGGER = pytest.get_logger("commonapi", module=True)
 CONF = UsmConfig()
 
+# response cache shared by all TendrlApi objects, when enabled in config
+CACHE_CONF = CONF.config["usmqe"].get("api_cache", {})
+if CACHE_CONF.get("enabled"):
+    RESPONSE_CACHE = ResponseCache(
+        ttl=CACHE_CONF.get("ttl", 60), exclude=CACHE_CONF.get("exclude"))
+else:
+    RESPONSE_CACHE = None
+
+
+def mask_token(token):
+    """ Return token for logs, only its last 4 characters are shown.
+    """
+    if not token:
+        return repr(token)
+    return "***{}".format(token[-4:] if len(token) >= 16 else "")
+
 
 class TendrlAuth(requests.auth.AuthBase):
     """
@@ -30,19 +50,25 @@ class TendrlAuth(requests.auth.AuthBase):
     See also: http://docs.python-requests.org/en/master/user/authentication/
     """
 
-    def __init__(self, token, username=None):
+    def __init__(self, token, username=None, relogin=None):
         """
         Args:
             token (str): tendrl ``access_token`` string
             username (str): username of account associated with the token
+            relogin (function): function without arguments which returns new
+                TendrlAuth object, when it is provided, request rejected with
+                401 status code is sent again with new token
         """
         self.__bearer_token = token
         # metadata attributes for easier debugging, we need to trust login
         # function to store correct values there
         self.username = username
+        self.relogin = relogin
+        # True when the token was obtained by login function
+        self.verified = False
 
     def __repr__(self):
-        return "TendrlAuth(token={})".format(self.__bearer_token)
+        return "TendrlAuth(token={})".format(mask_token(self.__bearer_token))
 
     def __call__(self, r):
         """
@@ -55,10 +81,35 @@ class TendrlAuth(requests.auth.AuthBase):
             "Authorization": "Bearer {}".format(self.__bearer_token),
             }
         r.prepare_headers(headers)
+        if self.relogin is not None:
+            r.register_hook("response", self.handle_401)
         return r
 
+    def handle_401(self, r, **kwargs):
+        """
+        Get new token via ``relogin`` function and send the request again
+        when it was rejected with 401 status code.
 
-def login(username, password, asserts_in=None):
+        See also ``requests.auth.HTTPDigestAuth.handle_401``.
+        """
+        if r.status_code != 401:
+            return r
+        LOGGER.info("token of user {} was rejected, login again".format(
+            self.username))
+        self.__bearer_token = self.relogin().__bearer_token
+        # consume content and release the original connection
+        r.content
+        r.close()
+        prep = r.request.copy()
+        prep.headers["Authorization"] = "Bearer {}".format(
+            self.__bearer_token)
+        new_r = r.connection.send(prep, **kwargs)
+        new_r.history.append(r)
+        new_r.request = prep
+        return new_r
+
+
+def login(username, password, asserts_in=None, relogin=None):
     """
     Login Tendrl user.
 
@@ -66,19 +117,23 @@ def login(username, password, asserts_in=None):
         username: name of user that is going logged in
         password: password for username
         asserts_in: assert values for this call and this method
+        relogin: function used by returned auth object to login again when
+            its token is rejected (see TendrlAuth)
 
     Returns requests auth object (instance of TendrlAuth)
     """
     pattern = "login"
     post_data = {"username": username, "password": password}
-    request = requests.post(
+    request = ApiBase().request(
+        "POST",
         CONF.config["usmqe"]["api_url"] + pattern,
         data=json.dumps(post_data))
     ApiBase.print_req_info(request)
     ApiBase.check_response(request, asserts_in)
     token = request.json().get("access_token")
-    LOGGER.info("access_token: {}".format(token))
-    auth = TendrlAuth(token, username)
+    LOGGER.info("access_token: {}".format(mask_token(token)))
+    auth = TendrlAuth(token, username, relogin=relogin)
+    auth.verified = True
     return auth
 
 
@@ -91,25 +146,217 @@ def logout(auth, asserts_in=None):
         auth: TendrlAuth object (defines bearer token header)
     """
     pattern = "logout"
-    request = requests.delete(
+    request = ApiBase().request(
+        "DELETE",
         CONF.config["usmqe"]["api_url"] + pattern,
         auth=auth)
     ApiBase.print_req_info(request)
     ApiBase.check_response(request, asserts_in)
 
 
+class TokenCache(object):
+    """
+    Cache of logged in Tendrl sessions, so every user is logged in only once
+    during the test run.
+
+    Cached TendrlAuth objects login again automatically when their token is
+    rejected by Tendrl. Token which was not used via the cache for
+    ``validate_interval`` seconds is checked by cheap ``current_user``
+    request before it is returned.
+    """
+
+    def __init__(self, validate_interval=300):
+        """
+        Args:
+            validate_interval (float): time in seconds after which is cached
+                token validated
+        """
+        self.validate_interval = validate_interval
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _login(self, username, password):
+        return login(
+            username, password,
+            relogin=lambda: self._login(username, password))
+
+    def _validate(self, auth):
+        """ Check that the token is accepted, expired token is replaced by
+        ``handle_401`` hook of the auth object.
+        """
+        response = ApiBase().request(
+            "GET",
+            CONF.config["usmqe"]["api_url"] + "current_user",
+            auth=auth)
+        ApiBase.print_req_info(response)
+        return response.ok
+
+    def login(self, username, password):
+        """
+        Return TendrlAuth object for given user, login the user only when
+        there is no valid cached session.
+
+        Args:
+            username: name of user that is going logged in
+            password: password for username
+        """
+        with self._lock:
+            session = self._sessions.get(username)
+            now = time.monotonic()
+            if session is not None and session["password"] == password:
+                if now - session["used"] < self.validate_interval or\
+                        self._validate(session["auth"]):
+                    session["used"] = now
+                    return session["auth"]
+            auth = self._login(username, password)
+            self._sessions[username] = {
+                "auth": auth, "password": password, "used": now}
+            return auth
+
+    def logout_all(self):
+        """
+        Logout all cached sessions.
+        """
+        with self._lock:
+            for username, session in self._sessions.items():
+                LOGGER.debug("logout cached session of {}".format(username))
+                logout(session["auth"])
+            self._sessions.clear()
+
+
+# logged in Tendrl sessions shared by all tests
+TOKEN_CACHE = TokenCache()
+
+
+class JobMessageLog(object):
+    """
+    Ordered log of messages of one Tendrl job, which is updated incrementally.
+
+    Tendrl API always returns whole list of job messages, so the whole list
+    is downloaded during each update. But only messages which were not seen
+    yet are decoded and appended into the log: when the new response starts
+    with the body of previous response, only its tail is decoded.
+    """
+
+    def __init__(self, api, job_id):
+        """
+        Args:
+            api: TendrlApi object used for requests
+            job_id: id of job
+        """
+        self.api = api
+        self.job_id = job_id
+        self.messages = []
+        self._content = b""
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __iter__(self):
+        return iter(self.messages)
+
+    def _decode_new(self, response):
+        """ Return list of messages from the response which are not in the
+        log yet.
+        """
+        content = response.content
+        prefix = self._content.rstrip()[:-1].rstrip()
+        tail = content[len(prefix):].strip()
+        if prefix and content.startswith(prefix) and (
+                prefix == b"[" or tail.startswith(b",")):
+            try:
+                return json.loads((b"[" + tail.lstrip(b",")).decode("utf-8"))
+            except ValueError:
+                LOGGER.debug("can't decode tail of job messages, decoding all")
+        return response.json()[len(self.messages):]
+
+    def update(self):
+        """ Download messages of the job and return list of new ones.
+
+        Name:       "get_job_messages",
+        Method:     "GET",
+        Pattern     "jobs/:job_id:/messages",
+        """
+        pattern = "jobs/{}/messages".format(self.job_id)
+        response = self.api.request(
+            "GET",
+            CONF.config["usmqe"]["api_url"] + pattern,
+            auth=self.api._auth)
+        self.api.print_req_info(response)
+        if response.ok and response.content == self._content:
+            return []
+        # json is validated by decoding of new messages
+        self.api.check_response(response, check_json=False)
+        if not response.ok:
+            return []
+        try:
+            new_messages = self._decode_new(response)
+        except ValueError as err:
+            pytest.check(
+                False,
+                "Bad response '{}' json format: '{}'".format(response, err))
+            return []
+        self._content = response.content
+        self.messages.extend(new_messages)
+        return new_messages
+
+
 class TendrlApi(ApiBase):
     """ Common methods for Tendrl REST API.
     """
 
-    def __init__(self, auth=None):
+    def __init__(self, auth=None, cache=None):
         """
         Args:
             auth: TendrlAuth object (defines bearer token header), when auth is
                None, requests are send without athentication header
+            cache: ResponseCache object for responses of GET requests, when
+               cache is None, shared cache is used if it is enabled in
+               configuration (``api_cache``), False disables caching
         """
         # requests auth object with so called tendrl bearer token
         self._auth = auth
+        if cache is None:
+            cache = RESPONSE_CACHE
+        self._cache = cache or None
+        self._message_logs = {}
+
+    def request(self, method, url, **kwargs):
+        """ Send request and return its response. When response cache is
+        used, responses of GET requests are taken from the cache and any
+        other request invalidates the cache. Responses are shared by all
+        tokens of the same user obtained by login, other auth objects (e.g.
+        with invalid tokens) have their own responses.
+
+        Args:
+            method (str): HTTP method, e.g. ``GET``
+            url (str): url of the request
+            kwargs: other arguments of :func:`requests.request`, ``fresh=True``
+                bypasses cached response of GET request (see
+                :meth:`ResponseCache.get`)
+        """
+        fresh = kwargs.pop("fresh", False)
+        if self._cache is None or kwargs.get("stream"):
+            return super().request(method, url, **kwargs)
+        if method.upper() != "GET":
+            try:
+                return super().request(method, url, **kwargs)
+            finally:
+                self._cache.invalidate()
+        if not self._cache.cacheable(url):
+            return super().request(method, url, **kwargs)
+
+        def send(headers):
+            if headers:
+                kwargs["headers"] = dict(kwargs.get("headers") or {}, **headers)
+            return super(TendrlApi, self).request(method, url, **kwargs)
+
+        if getattr(self._auth, "verified", False):
+            user = self._auth.username
+        else:
+            user = self._auth
+        key = (user, url, repr(kwargs.get("params")))
+        return self._cache.get(key, send, fresh=fresh)
 
     def get_job_attribute(self, job_id, attribute="status", section=None):
         """ Get attribute from job specified by job_id.
@@ -124,7 +371,8 @@ class TendrlApi(ApiBase):
             section:    section of response in which is attribute located
         """
         pattern = "jobs/{}".format(job_id)
-        response = requests.get(
+        response = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth,)
         self.print_req_info(response)
@@ -145,13 +393,28 @@ class TendrlApi(ApiBase):
             job_id:     id of job
         """
         pattern = "jobs/{}/messages".format(job_id)
-        response = requests.get(
+        response = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth,)
         self.print_req_info(response)
         self.check_response(response)
         return response.json()
 
+    def get_job_message_log(self, job_id):
+        """ Get log of messages from job specified by job_id, which is
+        updated only with new messages by its ``update()`` method.
+
+        Args:
+            job_id:     id of job
+
+        Returns:
+            JobMessageLog: the same object for all calls with given job_id
+        """
+        if job_id not in self._message_logs:
+            self._message_logs[job_id] = JobMessageLog(self, job_id)
+        return self._message_logs[job_id]
+
     def wait_for_job_status(
             self,
             job_id,
@@ -172,44 +435,104 @@ class TendrlApi(ApiBase):
             update_time: event should be done in ``update_time`` seconds
             status: expected status of job that is checked
             issue: pytest issue message (usually github issue link)
-            sleep_time: time in seconds between 2 job status function calls
+            sleep_time: maximal time in seconds between 2 job status function
+                calls
         """
+        return self.wait_for_jobs(
+            [job_id],
+            job_time=job_time,
+            update_time=update_time,
+            status=status,
+            issue=issue,
+            sleep_time=sleep_time)[job_id]["status"]
+
+    def wait_for_jobs(
+            self,
+            job_ids,
+            job_time=10800,
+            update_time=2700,
+            status="finished",
+            issue=None,
+            sleep_time=10,
+            initial_sleep_time=1):
+        """ Repeatedly check if status of all jobs with provided ids is in
+        required state. Time limits are the same as in
+        :meth:`wait_for_job_status` and they are applied to each job
+        separately. Jobs are polled with growing delay (starting with
+        ``initial_sleep_time`` up to ``sleep_time``) and job which reached
+        final state is not polled anymore.
+
+        Args:
+            job_ids: ids provided by api requests
+            job_time: job should achieve status in ``job_time`` seconds
+            update_time: event should be done in ``update_time`` seconds
+            status: expected status of jobs that are checked
+            issue: pytest issue message (usually github issue link)
+            sleep_time: maximal time in seconds between 2 polls
+            initial_sleep_time: time in seconds between first 2 polls
 
+        Returns:
+            dict: for each job id dictionary with ``status`` of the job,
+                ``duration`` of waiting (timedelta) and list of all job
+                ``messages``
+        """
         start_time = datetime.datetime.now()
-        last_update = start_time
         job_timeout = datetime.timedelta(seconds=job_time)
         update_timeout = datetime.timedelta(seconds=update_time)
-        current_status = ""
-        messages_count = 0
-        now = datetime.datetime.now()
-        while current_status not in (status, "finished", "failed") and\
-                now - start_time <= job_timeout and\
-                now - last_update <= update_timeout:
-            current_status = self.get_job_attribute(
-                job_id,
-                attribute="status")
-            time.sleep(sleep_time)
-            now = datetime.datetime.now()
-            LOGGER.debug("status: %s" % current_status)
-            messages = self.get_job_messages(job_id)
-            if len(messages) > messages_count:
-                last_update = datetime.datetime.now()
-                messages_count = len(messages)
-        pytest.check(
-            now - start_time <= job_timeout,
-            msg="Job shouldn't take longer then {},"
-            "it took: {}".format(job_timeout, now - start_time))
-        pytest.check(
-            now - last_update <= job_timeout,
-            msg="Job event shouldn't take longer then {},"
-            "last event took: {}".format(job_timeout, now - last_update))
-        pytest.check(
-            current_status == status,
-            msg="Job status is {} and should be {}".format(
-                current_status,
-                status),
-            issue=issue)
-        return current_status
+        jobs = {
+            job_id: {
+                "status": "",
+                "last_update": start_time,
+                "messages": self.get_job_message_log(job_id),
+                "end": None}
+            for job_id in job_ids}
+        delays = backoff_delays(initial=initial_sleep_time, maximum=sleep_time)
+        while True:
+            for job_id, job in jobs.items():
+                if job["end"]:
+                    continue
+                job["status"] = self.get_job_attribute(
+                    job_id,
+                    attribute="status")
+                now = datetime.datetime.now()
+                LOGGER.debug("job {} status: {}".format(job_id, job["status"]))
+                if job["messages"].update():
+                    job["last_update"] = now
+                if job["status"] in (status, "finished", "failed") or\
+                        now - start_time > job_timeout or\
+                        now - job["last_update"] > update_timeout:
+                    job["end"] = now
+            if all(job["end"] for job in jobs.values()):
+                break
+            time.sleep(next(delays))
+        # finished jobs changed state of Tendrl
+        if self._cache is not None:
+            self._cache.invalidate()
+        result = {}
+        for job_id, job in jobs.items():
+            duration = job["end"] - start_time
+            LOGGER.info("job {} finished with status {} in {}".format(
+                job_id, job["status"], duration))
+            pytest.check(
+                duration <= job_timeout,
+                msg="Job shouldn't take longer then {},"
+                "it took: {}".format(job_timeout, duration))
+            pytest.check(
+                job["end"] - job["last_update"] <= update_timeout,
+                msg="Job event shouldn't take longer then {},"
+                "last event took: {}".format(
+                    update_timeout, job["end"] - job["last_update"]))
+            pytest.check(
+                job["status"] == status,
+                msg="Job status is {} and should be {}".format(
+                    job["status"],
+                    status),
+                issue=issue)
+            result[job_id] = {
+                "status": job["status"],
+                "duration": duration,
+                "messages": job["messages"].messages}
+        return result
 
     def jobs(self, asserts_in=None):
         """ Jobs REST API
@@ -218,7 +541,8 @@ class TendrlApi(ApiBase):
         Pattern:     "jobs",
         """
         pattern = "jobs"
-        response = requests.get(
+        response = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth,)
         self.print_req_info(response)
@@ -232,7 +556,8 @@ class TendrlApi(ApiBase):
         Pattern:     "ping",
         """
         pattern = "ping"
-        response = requests.get(
+        response = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth,)
         self.print_req_info(response)
@@ -247,13 +572,44 @@ class TendrlApi(ApiBase):
         Pattern:     "nodes",
         """
         pattern = "nodes"
-        response = requests.get(
+        response = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth)
         self.print_req_info(response)
         self.check_response(response)
         return response.json()
 
+    def iter_nodes(self, fields=None):
+        """ Iterate over nodes, they are decoded one by one while the response
+        is downloaded.
+
+        Name:        "get_nodes",
+        Method:      "GET",
+        Pattern:     "nodes",
+
+        Args:
+            fields (list): dotted paths of fields of returned nodes, e.g.
+                ``["node_id", "localstorage.blockdevices.free"]``,
+                None for whole nodes
+        """
+        pattern = "nodes"
+        response = self.request(
+            "GET",
+            CONF.config["usmqe"]["api_url"] + pattern,
+            auth=self._auth,
+            stream=True)
+        self.print_req_info(response)
+        self.check_response(response, check_json=False)
+        try:
+            yield from jsonstream.iter_items(response, key="nodes", fields=fields)
+        except ValueError as err:
+            pytest.check(
+                False,
+                "Bad response '{}' json format: '{}'".format(response, err))
+        finally:
+            response.close()
+
     def create_cluster(
             self,
             name,
@@ -313,7 +669,8 @@ class TendrlApi(ApiBase):
                     "provisioning_ip": x[node_identifier]}
                 for x in nodes}
         }
-        response = requests.post(
+        response = self.request(
+            "POST",
             CONF.config["usmqe"]["api_url"] + pattern,
             data=json.dumps(data),
             auth=self._auth)
@@ -348,7 +705,8 @@ class TendrlApi(ApiBase):
         data = {
             "Cluster.volume_profiling_flag": profiling,
             "Cluster.short_name": short_name}
-        response = requests.post(
+        response = self.request(
+            "POST",
             CONF.config["usmqe"]["api_url"] + pattern,
             data=json.dumps(data),
             auth=self._auth)
@@ -372,39 +730,51 @@ class TendrlApi(ApiBase):
             "reason": 'Accepted',
             "status": 202}
         pattern = "clusters/{}/unmanage".format(cluster_id)
-        response = requests.post(
+        response = self.request(
+            "POST",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth)
         self.print_req_info(response)
         self.check_response(response, asserts_in)
         return response.json()
 
-    def get_cluster_list(self):
+    def get_cluster_list(self, fresh=False):
         """ Get list of clusters
 
         Name:        "get_cluster_list",
         Method:      "GET",
         Pattern:     "clusters",
+
+        Args:
+            fresh (bool): don't use cached response, e.g. when polling
         """
         pattern = "clusters"
-        response = requests.get(
+        response = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
-            auth=self._auth)
+            auth=self._auth,
+            fresh=fresh)
         self.print_req_info(response)
         self.check_response(response)
         return response.json()["clusters"]
 
-    def get_cluster(self, cluster_id):
+    def get_cluster(self, cluster_id, fresh=False):
         """ Get cluster informations
 
         Name:        "get_cluster",
         Method:      "GET",
         Pattern:     "clusters/:cluster_id:",
+
+        Args:
+            cluster_id (str): id of the cluster
+            fresh (bool): don't use cached response, e.g. when polling
         """
         pattern = "clusters/{}".format(cluster_id)
-        response = requests.get(
+        response = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
-            auth=self._auth)
+            auth=self._auth,
+            fresh=fresh)
         self.print_req_info(response)
         self.check_response(response)
         return response.json()
@@ -2,7 +2,6 @@
 Tendrl REST API for gluster.
 """
 
-import requests
 import pytest
 from usmqe.api.tendrlapi.common import TendrlApi
 from usmqe.usmqeconfig import UsmConfig
@@ -57,7 +56,8 @@ class TendrlApiGluster(TendrlApi):
             cluster: id of cluster where will be created volume
         """
         pattern = "clusters/{}/nodes".format(cluster)
-        response = requests.get(
+        response = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth)
         self.print_req_info(response)
@@ -75,7 +75,8 @@ class TendrlApiGluster(TendrlApi):
             cluster: id of cluster where will be created volume
         """
         pattern = "clusters/{}/volumes".format(cluster)
-        response = requests.get(
+        response = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth)
         self.print_req_info(response)
@@ -95,7 +96,8 @@ class TendrlApiGluster(TendrlApi):
             volume: id of volume
         """
         pattern = "clusters/{}/volumes/{}/bricks".format(cluster, volume)
-        response = requests.get(
+        response = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth)
         self.print_req_info(response)
@@ -122,7 +124,8 @@ class TendrlApiGluster(TendrlApi):
                 for device in devices[node["node_id"]]
             } for node in nodes}
         }
-        response = requests.post(
+        response = self.request(
+            "POST",
             CONF.config["usmqe"]["api_url"] + pattern,
             json=data,
             auth=self._auth)
@@ -142,7 +145,9 @@ class TendrlApiGluster(TendrlApi):
             volume: id of a volume
             attribute: name of the searched attribute
         """
-        value = [x[attribute] for x in self.get_volume_list(cluster)
-                 if x["vol_id"] == volume][0]
+        volumes = self.get_volume_list(cluster)
+        if isinstance(volumes, dict):
+            volumes = volumes["volumes"]
+        value = [x[attribute] for x in volumes if x["vol_id"] == volume][0]
         LOGGER.debug("{} = {}".format(attribute, value))
         return value
@@ -0,0 +1,186 @@
+"""
+Load generator for Tendrl REST API.
+
+Requests are sent from several threads for given time by one session with
+auth of functional tests, but without retries and circuit breaker of API
+transport, so every failure is counted and the load is not throttled.
+Endpoint of each request is chosen randomly according to weights of request
+mix.
+
+Example::
+
+    generator = LoadGenerator(
+        auth, mix={"clusters": 2, "jobs": 1}, concurrency=8, duration=60)
+    report = generator.run()
+    LOGGER.info(format_report(report))
+"""
+
+import concurrent.futures
+import math
+import random
+import threading
+import time
+
+import requests
+
+import pytest
+from usmqe.api.transport import TRANSPORT
+from usmqe.usmqeconfig import UsmConfig
+
+LOGGER = pytest.get_logger("tendrlapi.loadgen", module=True)
+CONF = UsmConfig()
+
+# url patterns of endpoints which could be used in request mix,
+# ``{cluster_id}`` is replaced by id of cluster given to LoadGenerator
+ENDPOINTS = {
+    "ping": "ping",
+    "jobs": "jobs",
+    "nodes": "nodes",
+    "clusters": "clusters",
+    "cluster_nodes": "clusters/{cluster_id}/nodes",
+    "cluster_volumes": "clusters/{cluster_id}/volumes",
+    "users": "users",
+    "notifications": "notifications",
+    "alerts": "alerts",
+    }
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values, percent):
+    """ Return percentile of sorted list of values (nearest-rank method).
+    """
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LoadGenerator(object):
+    """ Generate load of Tendrl REST API and measure its latency.
+    """
+
+    def __init__(
+            self, auth, mix, concurrency=8, duration=60, cluster_id=None,
+            seed=None):
+        """
+        Args:
+            auth: TendrlAuth object
+            mix (dict): weights of endpoints (keys of ``ENDPOINTS``)
+            concurrency (int): number of threads which send requests
+            duration (float): time in seconds for which is load generated
+            cluster_id: id of cluster used in cluster related endpoints
+            seed: seed of random generator, for reproducible request order
+        """
+        unknown = set(mix) - set(ENDPOINTS)
+        if unknown:
+            raise ValueError("Unknown endpoints in request mix: {}".format(
+                sorted(unknown)))
+        self.auth = auth
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_maxsize=concurrency, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.mix = mix
+        self.concurrency = concurrency
+        self.duration = duration
+        self.cluster_id = cluster_id
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._results = {name: {"latencies": [], "errors": 0} for name in mix}
+
+    def _choose(self):
+        with self._lock:
+            return self._random.choices(
+                list(self.mix), weights=list(self.mix.values()))[0]
+
+    def _request(self, name):
+        """ Send one request to given endpoint and record its result.
+        """
+        url = CONF.config["usmqe"]["api_url"] + ENDPOINTS[name].format(
+            cluster_id=self.cluster_id)
+        start = time.perf_counter()
+        try:
+            response = self.session.get(
+                url, auth=self.auth, timeout=TRANSPORT.timeout)
+            response.content
+            failed = not response.ok
+        except Exception as err:
+            LOGGER.debug("request to {} failed: {}".format(url, err))
+            failed = True
+        latency = time.perf_counter() - start
+        with self._lock:
+            result = self._results[name]
+            result["latencies"].append(latency)
+            if failed:
+                result["errors"] += 1
+
+    def _worker(self, deadline):
+        while time.monotonic() < deadline:
+            self._request(self._choose())
+
+    def run(self):
+        """ Generate the load and return report about it.
+
+        Returns:
+            dict: for each endpoint number of ``requests``, ``errors``,
+                ``error_rate``, ``throughput`` (requests per second) and
+                latency percentiles in seconds (``p50``, ``p90``, ...,
+                ``max``), totals are under ``total`` key
+        """
+        LOGGER.info(
+            "generating load for {}s with {} threads, request mix: {}".format(
+                self.duration, self.concurrency, self.mix))
+        start = time.monotonic()
+        deadline = start + self.duration
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.concurrency) as executor:
+            for future in [executor.submit(self._worker, deadline)
+                           for _ in range(self.concurrency)]:
+                future.result()
+        elapsed = time.monotonic() - start
+        report = {}
+        all_latencies = []
+        all_errors = 0
+        for name, result in self._results.items():
+            all_latencies.extend(result["latencies"])
+            all_errors += result["errors"]
+            report[name] = self._summary(
+                result["latencies"], result["errors"], elapsed)
+        report["total"] = self._summary(all_latencies, all_errors, elapsed)
+        return report
+
+    @staticmethod
+    def _summary(latencies, errors, elapsed):
+        latencies = sorted(latencies)
+        summary = {
+            "requests": len(latencies),
+            "errors": errors,
+            "error_rate": errors / max(len(latencies), 1),
+            "throughput": len(latencies) / elapsed,
+            "max": latencies[-1] if latencies else None}
+        for percent in PERCENTILES:
+            summary["p{}".format(percent)] = percentile(latencies, percent)
+        return summary
+
+
+def format_report(report):
+    """ Format report of LoadGenerator as text table.
+    """
+    columns = ["requests", "errors", "throughput"] + [
+        "p{}".format(percent) for percent in PERCENTILES] + ["max"]
+    lines = ["{:<16}".format("endpoint") + "".join(
+        "{:>11}".format(column) for column in columns)]
+    for name, summary in report.items():
+        line = "{:<16}".format(name)
+        for column in columns:
+            value = summary[column]
+            if value is None:
+                line += "{:>11}".format("-")
+            elif isinstance(value, float):
+                line += "{:>11.3f}".format(value)
+            else:
+                line += "{:>11}".format(value)
+        lines.append(line)
+    return "\n".join(lines)
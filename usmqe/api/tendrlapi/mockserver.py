@@ -0,0 +1,328 @@
+"""
+Stand-in of Tendrl REST API with synthetic Gluster cluster.
+
+It allows to use and benchmark client side of usmqe API (auth, polling,
+caching, snapshots, load generator) without real Tendrl server.
+
+Example::
+
+    with TendrlMockServer(nodes=100, volumes=50, latency=0.01) as server:
+        CONF.config["usmqe"]["api_url"] = server.api_url
+        auth = login("admin", "adminuser")
+"""
+
+import threading
+import time
+import uuid
+
+from usmqe.api.mockserver import MockServer
+
+API_PREFIX = "/api/1.0/"
+
+UNAUTHORIZED = 401, {"errors": {"message": "Unauthorized"}}
+NOT_FOUND = 404, {"errors": {"message": "Not Found"}}
+
+
+class TendrlMockServer(MockServer):
+    """ In-process stand-in of Tendrl REST API server.
+    """
+
+    def __init__(
+            self, nodes=6, volumes=2, bricks_per_volume=6, devices_per_node=2,
+            notifications=20, job_duration=1, job_messages=5,
+            username="admin", password="adminuser", **kwargs):
+        """
+        Args:
+            nodes (int): number of nodes of the cluster
+            volumes (int): number of volumes of the cluster
+            bricks_per_volume (int): number of bricks of each volume
+            devices_per_node (int): number of free block devices of each node
+            notifications (int): number of notifications and alerts
+            job_duration (float): time in seconds after which a job finishes
+            job_messages (int): number of messages of a finished job
+            username (str): name of admin user
+            password (str): password of admin user
+            kwargs: arguments of MockServer (``latency``, ``jitter``, ...)
+        """
+        super().__init__(**kwargs)
+        self.job_duration = job_duration
+        self.job_messages = job_messages
+        self.passwords = {username: password}
+        self.users = {username: {
+            "name": "Admin", "username": username, "role": "admin",
+            "email": "{}@example.com".format(username),
+            "email_notifications": False}}
+        self.tokens = {}
+        self.jobs = {}
+        self._data_lock = threading.Lock()
+        self._generate_cluster(
+            nodes, volumes, bricks_per_volume, devices_per_node)
+        self.notifications = [
+            {"message_id": str(uuid.uuid4()),
+             "timestamp": "2018-01-01T00:00:{:02}Z".format(i % 60),
+             "priority": "notice",
+             "message": "synthetic notification {}".format(i)}
+            for i in range(notifications)]
+        self.alerts = [
+            {"alert_id": str(uuid.uuid4()),
+             "severity": "warning",
+             "resource": "node_alert",
+             "node_id": self.node_list[i % len(self.node_list)]["node_id"],
+             "tags": {"message": "synthetic alert {}".format(i)}}
+            for i in range(notifications)]
+        self._register_routes()
+
+    @property
+    def api_url(self):
+        """ Url of Tendrl API, value for ``api_url`` config option.
+        """
+        return self.url.rstrip("/") + API_PREFIX
+
+    def _generate_cluster(self, nodes, volumes, bricks_per_volume, devices):
+        self.cluster_id = str(uuid.uuid4())
+        self.node_list = []
+        for i in range(nodes):
+            free = {
+                "/dev/vd{}".format(chr(ord("b") + d)): {
+                    "device_kernel_name": "/dev/vd{}".format(
+                        chr(ord("b") + d)),
+                    "size": 10737418240}
+                for d in range(devices)}
+            self.node_list.append({
+                "node_id": str(uuid.uuid4()),
+                "fqdn": "mock-gl{}.usmqe.tendrl.org".format(i + 1),
+                "status": "UP",
+                "tags": ["tendrl/node", "gluster/server"],
+                "cluster_id": self.cluster_id,
+                "localstorage": {"blockdevices": {"free": free, "used": {}}}})
+        self.volume_list = []
+        self.bricks = {}
+        for i in range(volumes):
+            vol_id = str(uuid.uuid4())
+            self.volume_list.append({
+                "vol_id": vol_id,
+                "name": "volume_{}".format(i),
+                "status": "Started",
+                "type": "Distributed-Replicate",
+                "brick_count": bricks_per_volume})
+            self.bricks[vol_id] = []
+            for b in range(bricks_per_volume):
+                node = self.node_list[(i * bricks_per_volume + b) % nodes]
+                self.bricks[vol_id].append({
+                    "brick_path": "{}:/bricks/volume_{}/brick{}".format(
+                        node["fqdn"], i, b),
+                    "hostname": node["fqdn"],
+                    "node_id": node["node_id"],
+                    "vol_id": vol_id,
+                    "status": "Started"})
+        self.cluster = {
+            "cluster_id": self.cluster_id,
+            "integration_id": self.cluster_id,
+            "short_name": "mock_cluster",
+            "sds_name": "gluster",
+            "is_managed": "yes",
+            "nodes": [
+                {"node_id": node["node_id"], "fqdn": node["fqdn"],
+                 "status": node["status"]}
+                for node in self.node_list]}
+
+    def _register_routes(self):
+        routes = [
+            ("POST", "login", self.login),
+            ("DELETE", "logout", self.logout),
+            ("GET", "ping", self.ping),
+            ("GET", "current_user", self.current_user),
+            ("GET", "nodes", self.get_nodes),
+            ("GET", "clusters", self.get_clusters),
+            ("GET", "clusters/([^/]+)", self.get_cluster),
+            ("GET", "clusters/([^/]+)/nodes", self.get_cluster_nodes),
+            ("GET", "clusters/([^/]+)/volumes", self.get_volumes),
+            ("GET", "clusters/([^/]+)/volumes/([^/]+)/bricks",
+             self.get_bricks),
+            ("POST", "clusters/([^/]+)/(import|unmanage)", self.create_job),
+            ("POST", "([^/]+)/GlusterCreateBrick", self.create_job),
+            ("GET", "jobs", self.get_jobs),
+            ("GET", "jobs/([^/]+)", self.get_job),
+            ("GET", "jobs/([^/]+)/messages", self.get_job_messages),
+            ("GET", "users", self.get_users),
+            ("POST", "users", self.add_user),
+            ("GET", "users/([^/]+)", self.get_user),
+            ("PUT", "users/([^/]+)", self.edit_user),
+            ("DELETE", "users/([^/]+)", self.delete_user),
+            ("GET", "notifications", self.get_notifications),
+            ("GET", "alerts", self.get_alerts),
+            ]
+        for method, pattern, handler in routes:
+            self.route(method, API_PREFIX + pattern, handler)
+
+    def authorized(self, request):
+        """ Return username of the token from request or None.
+        """
+        header = request.headers.get("Authorization") or ""
+        if not header.startswith("Bearer "):
+            return None
+        return self.tokens.get(header[len("Bearer "):])
+
+    def auth_required(handler):
+        def wrapper(self, request):
+            if self.authorized(request) is None:
+                return UNAUTHORIZED
+            return handler(self, request)
+        wrapper.__doc__ = handler.__doc__
+        return wrapper
+
+    def login(self, request):
+        data = request.json() or {}
+        username = data.get("username")
+        if username is None or \
+                self.passwords.get(username) != data.get("password"):
+            return UNAUTHORIZED
+        token = uuid.uuid4().hex
+        with self._data_lock:
+            self.tokens[token] = username
+        return 200, {"access_token": token}
+
+    @auth_required
+    def logout(self, request):
+        token = request.headers["Authorization"][len("Bearer "):]
+        with self._data_lock:
+            self.tokens.pop(token, None)
+        return 200, {"message": "Logged out"}
+
+    def ping(self, request):
+        return 200, {"status": "Ok"}
+
+    @auth_required
+    def current_user(self, request):
+        return 200, self.users[self.authorized(request)]
+
+    @auth_required
+    def get_nodes(self, request):
+        return 200, {"nodes": self.node_list}
+
+    @auth_required
+    def get_clusters(self, request):
+        return 200, {"clusters": [self.cluster]}
+
+    @auth_required
+    def get_cluster(self, request):
+        if request.match.group(1) != self.cluster_id:
+            return NOT_FOUND
+        return 200, self.cluster
+
+    @auth_required
+    def get_cluster_nodes(self, request):
+        if request.match.group(1) != self.cluster_id:
+            return NOT_FOUND
+        return 200, {"nodes": self.cluster["nodes"]}
+
+    @auth_required
+    def get_volumes(self, request):
+        if request.match.group(1) != self.cluster_id:
+            return NOT_FOUND
+        return 200, {"volumes": self.volume_list}
+
+    @auth_required
+    def get_bricks(self, request):
+        cluster_id, vol_id = request.match.groups()
+        if cluster_id != self.cluster_id or vol_id not in self.bricks:
+            return NOT_FOUND
+        return 200, {"bricks": self.bricks[vol_id]}
+
+    @auth_required
+    def create_job(self, request):
+        job_id = str(uuid.uuid4())
+        with self._data_lock:
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "flow": request.path.rsplit("/", 1)[-1],
+                "created": time.monotonic()}
+        return 202, {"job_id": job_id}
+
+    def _job_state(self, job):
+        """ Return job description and its messages in current time.
+        """
+        progress = (time.monotonic() - job["created"]) / max(
+            self.job_duration, 1e-6)
+        status = "finished" if progress >= 1 else "processing"
+        messages = [
+            {"message_id": "{}-{}".format(job["job_id"], i),
+             "job_id": job["job_id"],
+             "priority": "info",
+             "payload": {"message": "step {} of {}".format(i + 1, job["flow"])}}
+            for i in range(min(
+                int(progress * self.job_messages) + 1, self.job_messages))]
+        return {"job_id": job["job_id"], "status": status,
+                "flow": job["flow"]}, messages
+
+    @auth_required
+    def get_jobs(self, request):
+        return 200, [self._job_state(job)[0] for job in list(self.jobs.values())]
+
+    @auth_required
+    def get_job(self, request):
+        job = self.jobs.get(request.match.group(1))
+        if job is None:
+            return NOT_FOUND
+        return 200, self._job_state(job)[0]
+
+    @auth_required
+    def get_job_messages(self, request):
+        job = self.jobs.get(request.match.group(1))
+        if job is None:
+            return NOT_FOUND
+        return 200, self._job_state(job)[1]
+
+    @auth_required
+    def get_users(self, request):
+        return 200, list(self.users.values())
+
+    @auth_required
+    def add_user(self, request):
+        data = request.json()
+        user = {key: data.get(key) for key in (
+            "name", "username", "role", "email", "email_notifications")}
+        with self._data_lock:
+            self.users[user["username"]] = user
+            self.passwords[user["username"]] = data.get("password")
+        return 201, user
+
+    @auth_required
+    def get_user(self, request):
+        user = self.users.get(request.match.group(1))
+        if user is None:
+            return NOT_FOUND
+        return 200, user
+
+    @auth_required
+    def edit_user(self, request):
+        username = request.match.group(1)
+        if username not in self.users:
+            return NOT_FOUND
+        data = request.json()
+        with self._data_lock:
+            if "password" in data:
+                self.passwords[username] = data.pop("password")
+            data.pop("password_confirmation", None)
+            self.users[username].update(data)
+        return 200, self.users[username]
+
+    @auth_required
+    def delete_user(self, request):
+        username = request.match.group(1)
+        with self._data_lock:
+            user = self.users.pop(username, None)
+            self.passwords.pop(username, None)
+        if user is None:
+            return NOT_FOUND
+        return 200, {"name": username}
+
+    @auth_required
+    def get_notifications(self, request):
+        return 200, self.notifications
+
+    @auth_required
+    def get_alerts(self, request):
+        return 200, self.alerts
+
+    del auth_required
@@ -2,7 +2,6 @@
 tendrl REST API.
 """
 
-import requests
 import pytest
 from usmqe.api.tendrlapi.common import TendrlApi
 from usmqe.usmqeconfig import UsmConfig
@@ -25,12 +24,13 @@ class ApiNotifications(TendrlApi):
             asserts_in: assert values for this call and this method
         """
         pattern = "notifications"
-        request = requests.get(
+        request = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth)
         self.print_req_info(request)
         self.check_response(request, asserts_in)
-        return request.json(encoding='unicode')
+        return request.json()
 
     def get_alerts(self, asserts_in=None):
         """ Get notifications.
@@ -43,9 +43,10 @@ class ApiNotifications(TendrlApi):
             asserts_in: assert values for this call and this method
         """
         pattern = "alerts"
-        request = requests.get(
+        request = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth)
         self.print_req_info(request)
         self.check_response(request, asserts_in)
-        return request.json(encoding='unicode')
+        return request.json()
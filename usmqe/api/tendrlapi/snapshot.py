@@ -0,0 +1,166 @@
+"""
+Indexed snapshot of state of Gluster cluster as seen by Tendrl REST API.
+
+Example::
+
+    snapshot = ClusterSnapshot.fetch(valid_session_credentials, cluster_id)
+    node = snapshot.nodes_by_fqdn[CONF.config["usmqe"]["cluster_member"]]
+    bricks = snapshot.bricks_by_node[node.node_id]
+"""
+
+from collections import namedtuple
+
+import pytest
+from usmqe.api.tendrlapi import asyncapi
+
+LOGGER = pytest.get_logger("tendrlapi.snapshot", module=True)
+
+
+Node = namedtuple("Node", ["node_id", "fqdn", "status", "data"])
+Volume = namedtuple("Volume", ["vol_id", "name", "data"])
+Brick = namedtuple("Brick", ["brick_path", "node_id", "vol_id", "data"])
+
+
+class ClusterSnapshot(object):
+    """
+    Nodes, volumes, bricks and free block devices of one cluster, indexed
+    for constant time lookups.
+
+    Attributes:
+        cluster_id: id of the cluster
+        nodes_by_id, nodes_by_fqdn: dictionaries of :class:`Node` records
+        volumes_by_id, volumes_by_name: dictionaries of :class:`Volume`
+            records
+        bricks: dictionary of :class:`Brick` records, key is
+            ``(vol_id, brick_path)``
+        bricks_by_node, bricks_by_volume: dictionaries of lists of
+            :class:`Brick` records, keys are node ids and volume ids
+        free_devices: dictionary of sorted lists of kernel names of free
+            block devices, key is node id
+    """
+
+    __slots__ = (
+        "cluster_id", "nodes_by_id", "nodes_by_fqdn", "volumes_by_id",
+        "volumes_by_name", "bricks", "bricks_by_node", "bricks_by_volume",
+        "free_devices")
+
+    def __init__(self, cluster_id, nodes, volumes, bricks, storage_nodes=()):
+        """
+        Args:
+            cluster_id: id of the cluster
+            nodes: list of nodes from ``clusters/:cluster_id/nodes``
+            volumes: list of volumes from ``clusters/:cluster_id/volumes``
+            bricks: dictionary of brick lists from
+                ``clusters/:cluster_id/volumes/:volume_id/bricks``,
+                key is volume id
+            storage_nodes: list of nodes from ``nodes`` with
+                ``localstorage`` information
+        """
+        self.cluster_id = cluster_id
+        self.nodes_by_id = {}
+        self.nodes_by_fqdn = {}
+        for node in nodes:
+            record = Node(
+                node["node_id"], node.get("fqdn"), node.get("status"), node)
+            self.nodes_by_id[record.node_id] = record
+            self.nodes_by_fqdn[record.fqdn] = record
+        self.volumes_by_id = {}
+        self.volumes_by_name = {}
+        for volume in volumes:
+            record = Volume(volume["vol_id"], volume.get("name"), volume)
+            self.volumes_by_id[record.vol_id] = record
+            self.volumes_by_name[record.name] = record
+        self.bricks = {}
+        self.bricks_by_node = {node_id: [] for node_id in self.nodes_by_id}
+        self.bricks_by_volume = {vol_id: [] for vol_id in self.volumes_by_id}
+        for vol_id, volume_bricks in bricks.items():
+            for brick in volume_bricks:
+                node_id = brick.get("node_id")
+                if node_id is None and brick.get("hostname") in self.nodes_by_fqdn:
+                    node_id = self.nodes_by_fqdn[brick["hostname"]].node_id
+                record = Brick(brick["brick_path"], node_id, vol_id, brick)
+                self.bricks[(vol_id, record.brick_path)] = record
+                self.bricks_by_node.setdefault(node_id, []).append(record)
+                self.bricks_by_volume.setdefault(vol_id, []).append(record)
+        self.free_devices = {}
+        for node in storage_nodes:
+            if node["node_id"] not in self.nodes_by_id:
+                continue
+            free = node["localstorage"]["blockdevices"]["free"]
+            self.free_devices[node["node_id"]] = sorted(
+                device["device_kernel_name"] for device in free.values())
+
+    def __repr__(self):
+        return "ClusterSnapshot({}: {} nodes, {} volumes, {} bricks)".format(
+            self.cluster_id, len(self.nodes_by_id), len(self.volumes_by_id),
+            len(self.bricks))
+
+    @classmethod
+    def from_cluster(cls, cluster, storage_nodes=()):
+        """ Create snapshot from cluster returned by Tendrl API
+        (``clusters`` or ``clusters/:cluster_id``) without any request.
+        Volumes are not indexed, bricks are taken from ``bricks.all`` when
+        the cluster contains them.
+
+        Args:
+            cluster (dict): cluster from Tendrl API, its ``nodes`` could be
+                list or dictionary with node ids as keys
+            storage_nodes: list of nodes from ``nodes`` with
+                ``localstorage`` information
+        """
+        nodes = cluster.get("nodes") or []
+        if isinstance(nodes, dict):
+            nodes = [
+                dict(node, node_id=node_id) for node_id, node in nodes.items()]
+        bricks = {}
+        for brick in (cluster.get("bricks") or {}).get("all", {}).values():
+            bricks.setdefault(brick.get("vol_id"), []).append(brick)
+        return cls(cluster["cluster_id"], nodes, (), bricks, storage_nodes)
+
+    @classmethod
+    def fetch(cls, auth, cluster_id, concurrency=asyncapi.DEFAULT_CONCURRENCY):
+        """ Get all information about cluster from Tendrl API with
+        concurrent requests and create snapshot from them.
+
+        Args:
+            auth: TendrlAuth object
+            cluster_id: id of the cluster
+            concurrency (int): maximal number of requests processed at once
+        """
+        api = asyncapi.AsyncTendrlApiGluster(auth=auth, concurrency=concurrency)
+
+        async def fetch_all():
+            return await api.gather(
+                api.describe_cluster(cluster_id), api.get_nodes())
+
+        with api:
+            description, storage_nodes = asyncapi.run(fetch_all())
+        snapshot = cls(
+            cluster_id,
+            description["nodes"]["nodes"],
+            description["volumes"]["volumes"],
+            {vol_id: bricks["bricks"]
+             for vol_id, bricks in description["bricks"].items()},
+            storage_nodes["nodes"])
+        LOGGER.debug("snapshot created: {}".format(snapshot))
+        return snapshot
+
+    def diff(self, other):
+        """ Compare this snapshot with other (newer) snapshot.
+
+        Returns:
+            dict: for ``nodes``, ``volumes`` and ``bricks`` dictionary with
+                lists of ``added``, ``removed`` and ``changed`` keys
+        """
+        result = {}
+        for name, old, new in (
+                ("nodes", self.nodes_by_id, other.nodes_by_id),
+                ("volumes", self.volumes_by_id, other.volumes_by_id),
+                ("bricks", self.bricks, other.bricks)):
+            result[name] = {
+                "added": sorted(new.keys() - old.keys()),
+                "removed": sorted(old.keys() - new.keys()),
+                "changed": sorted(
+                    key for key in old.keys() & new.keys()
+                    if old[key] != new[key])}
+        return result
@@ -3,7 +3,6 @@ tendrl REST API.
 """
 
 import json
-import requests
 import pytest
 from usmqe.api.tendrlapi.common import TendrlApi
 from usmqe.usmqeconfig import UsmConfig
@@ -27,7 +26,8 @@ class ApiUser(TendrlApi):
             asserts_in: assert values for this call and this method
         """
         pattern = "users"
-        request = requests.get(
+        request = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth)
         self.print_req_info(request)
@@ -36,13 +36,13 @@ class ApiUser(TendrlApi):
             return False
 
         msg = "User {0} should contain: {1}\n\tUser {0} contains: {2}"
-        for item in request.json(encoding='unicode'):
+        for item in request.json():
             user = item["username"]
             response_keys = set(item.keys())
             pytest.check(
                 response_keys == USERDATA_KEYS,
                 msg.format(user, USERDATA_KEYS, response_keys))
-        return request.json(encoding='unicode')
+        return request.json()
 
     def edit_user(self, username, data, asserts_in=None):
         """ Edit a single user
@@ -54,16 +54,17 @@ class ApiUser(TendrlApi):
             asserts_in: assert values for this call and this method
         """
         pattern = "users/{}".format(username)
-        request = requests.put(
+        request = self.request(
+            "PUT",
             CONF.config["usmqe"]["api_url"] + pattern,
-            json.dumps(data),
+            data=json.dumps(data),
             auth=self._auth)
         self.print_req_info(request)
         self.check_response(
             request,
             asserts_in,
             issue="https://bugzilla.redhat.com/show_bug.cgi?id=1654743")
-        return request.json(encoding='unicode')
+        return request.json()
 
     def add_user(self, user_in, asserts_in=None):
         """ Add user throught **users**.
@@ -84,7 +85,8 @@ class ApiUser(TendrlApi):
             "status": 201}
 
         pattern = "users"
-        request = requests.post(
+        request = self.request(
+            "POST",
             CONF.config["usmqe"]["api_url"] + pattern,
             data=json.dumps(user_in),
             auth=self._auth)
@@ -118,13 +120,14 @@ class ApiUser(TendrlApi):
             asserts_in: assert values for this call and this method
         """
         pattern = "users/{}".format(username)
-        request = requests.get(
+        request = self.request(
+            "GET",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth)
         self.print_req_info(request)
         self.check_response(request, asserts_in)
 
-        return request.json(encoding='unicode')
+        return request.json()
 
     def check_user(self, user_data, asserts_in=None):
         """ Check if there is stored user with given attributes.
@@ -152,7 +155,8 @@ class ApiUser(TendrlApi):
             asserts_in: assert values for this call and this method
         """
         pattern = "users/{}".format(username)
-        request = requests.delete(
+        request = self.request(
+            "DELETE",
             CONF.config["usmqe"]["api_url"] + pattern,
             auth=self._auth)
         self.print_req_info(request)
@@ -0,0 +1,167 @@
+"""
+Transport policy of REST API requests.
+
+All requests sent via :meth:`ApiBase.request` use timeouts, safe requests
+(``GET``, ``HEAD``, ``OPTIONS``) are retried with growing jittered delays
+after connection errors,
+timeouts and ``502``, ``503`` or ``504`` responses, and hosts which
+repeatedly fail are not contacted for a while (circuit breaker), so outage
+of an API server costs seconds instead of hanging the test run. The policy
+is configured in ``api_transport`` config option.
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+import pytest
+import requests
+from usmqe.api.backoff import backoff_delays
+from usmqe.usmqeconfig import UsmConfig
+
+LOGGER = pytest.get_logger("api_transport", module=True)
+CONF = UsmConfig()
+
+# PUT and DELETE requests of Tendrl create jobs, so a retry after timeout
+# could run the job twice, they are retried only when requested by caller
+RETRIED_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
+RETRY_STATUSES = frozenset([502, 503, 504])
+RETRY_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """ Request was not sent, because the host failed repeatedly.
+    """
+
+
+class CircuitBreaker(object):
+    """ Count consecutive failures of hosts and reject requests to hosts with
+    too many of them.
+
+    After ``reset_timeout`` one trial request is allowed, its success closes
+    the circuit again, its failure keeps it open for next ``reset_timeout``.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        """
+        Args:
+            threshold (int): number of consecutive failures which open the
+                circuit, 0 disables the circuit breaker
+            reset_timeout (float): time in seconds after which a trial request
+                to failing host is allowed
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._failures = {}
+        self._opened = {}
+        self._lock = threading.Lock()
+
+    def allow(self, host):
+        """ Raise CircuitOpenError when requests to the host are not allowed.
+        """
+        with self._lock:
+            opened = self._opened.get(host)
+            if opened is None:
+                return
+            if time.monotonic() - opened < self.reset_timeout:
+                raise CircuitOpenError(
+                    "Circuit of host {} is open after {} failures".format(
+                        host, self._failures[host]))
+            # half-open state: allow one trial request
+            self._opened[host] = time.monotonic()
+
+    def success(self, host):
+        """ Record successful request to the host.
+        """
+        with self._lock:
+            self._failures.pop(host, None)
+            if self._opened.pop(host, None) is not None:
+                LOGGER.info("circuit of host {} closed".format(host))
+
+    def failure(self, host):
+        """ Record failed request to the host.
+        """
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if self.threshold and failures >= self.threshold:
+                if host not in self._opened:
+                    LOGGER.warning(
+                        "circuit of host {} opened after {} failures".format(
+                            host, failures))
+                self._opened[host] = time.monotonic()
+
+
+class TransportPolicy(object):
+    """ Timeouts, retries and circuit breaker of API requests.
+    """
+
+    def __init__(
+            self, connect_timeout=10, read_timeout=120, retries=2,
+            backoff=None, breaker_threshold=5, breaker_reset=30):
+        """
+        Args:
+            connect_timeout (float): timeout of connection in seconds
+            read_timeout (float): timeout of waiting for response in seconds
+            retries (int): number of retries of retried requests
+            backoff (dict): arguments of :func:`backoff_delays` for delays
+                between retries
+            breaker_threshold (int): number of consecutive failures of a host
+                after which its requests fail immediately
+            breaker_reset (float): time in seconds for which requests to
+                failing host fail immediately
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff or {"initial": 1, "maximum": 10, "jitter": 0.2}
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+
+    def send(self, method, url, retry=None, **kwargs):
+        """ Send request according to the policy and return its response.
+
+        Args:
+            method (str): HTTP method, e.g. ``GET``
+            url (str): url of the request
+            retry (bool): True to retry request which is safe to repeat
+                (e.g. idempotent ``PUT``), False to disable retries, None
+                retries only ``GET``, ``HEAD`` and ``OPTIONS`` requests
+            kwargs: other arguments of :func:`requests.request`, ``timeout``
+                overrides timeouts of the policy
+
+        Returns:
+            requests.Response: response of the request
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlparse(url).netloc
+        attempts = 1
+        if retry is None:
+            retry = method.upper() in RETRIED_METHODS
+        if retry:
+            attempts += self.retries
+        delays = backoff_delays(**self.backoff)
+        for attempt in range(1, attempts + 1):
+            self.breaker.allow(host)
+            try:
+                response = requests.request(method, url, **kwargs)
+            except RETRY_ERRORS as err:
+                self.breaker.failure(host)
+                if attempt == attempts:
+                    raise
+                reason = err
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.success(host)
+                    return response
+                self.breaker.failure(host)
+                if attempt == attempts:
+                    return response
+                reason = "{} {}".format(response.status_code, response.reason)
+                response.close()
+            delay = next(delays)
+            LOGGER.warning(
+                "{} {} failed ({}), retry {}/{} in {:.1f}s".format(
+                    method, url, reason, attempt, self.retries, delay))
+            time.sleep(delay)
+
+
+TRANSPORT = TransportPolicy(**CONF.config["usmqe"].get("api_transport", {}))
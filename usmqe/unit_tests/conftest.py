@@ -3,5 +3,26 @@
 Top level conftest.py file of usmqe unit tests.
 """
 
+from collections import namedtuple
+
+import pytest
+
 # only really essential and hardwired plugins needs to be there
 pytest_plugins = ('plugin.log_assert')
+
+Check = namedtuple("Check", ["result", "msg", "issue"])
+
+
+@pytest.fixture
+def checks(monkeypatch):
+    """
+    Collect arguments of pytest.check calls as Check records instead of
+    logging them.
+    """
+    collected = []
+    monkeypatch.setattr(
+        pytest, "check",
+        lambda result, msg=None, issue=None: collected.append(
+            Check(result, msg, issue)),
+        raising=False)
+    return collected
@@ -0,0 +1,148 @@
+# -*- coding: utf8 -*-
+"""
+Tests related to functionality of usmqe.api.base module
+"""
+
+import datetime
+import logging
+
+import pytest
+import requests
+
+from usmqe.api import base
+
+
+class FakeRequest(object):
+    def __init__(self, url, headers=None, body=None):
+        self.method = "POST"
+        self.url = url
+        self.headers = headers or {}
+        self.body = body
+
+
+class FakeResponse(object):
+    def __init__(self, request, headers=None, content=b""):
+        self.request = request
+        self.status_code = 200
+        self.reason = "OK"
+        self.elapsed = datetime.timedelta(seconds=0.5)
+        self.headers = headers or {}
+        self._content = content
+        self.content = content
+
+
+class FakeLogger(object):
+    """
+    Logger which formats and records all debug messages.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def isEnabledFor(self, level):
+        return level == logging.DEBUG
+
+    def debug(self, msg, *args):
+        self.messages.append(msg % args)
+
+
+def test_redaction():
+    tracer = base.RequestTracer(max_body=80)
+    headers = tracer.format_headers(
+        {"Authorization": "Bearer secret", "Set-Cookie": "id=secret",
+         "Content-Type": "application/json"})
+    assert "secret" not in headers
+    assert "application/json" in headers
+    body = tracer.format_body(
+        b'{"username": "admin", "password": "secret", "access_token": "x1"}')
+    assert body == '{"username": "admin", "password": "***", "access_token": "***"}'
+    assert tracer.format_body("x" * 100) == "{}... (100 characters)".format("x" * 80)
+    assert tracer.format_body(None) == ""
+
+
+def test_sampling():
+    tracer = base.RequestTracer(sample={"*/jobs/*": 0.25, "*/ping": 0})
+    traced = [tracer.sampled("/api/1.0/jobs/1") for _ in range(8)]
+    assert traced == [True, False, False, False] * 2
+    assert not tracer.sampled("/api/1.0/ping")
+    assert tracer.sampled("/api/1.0/clusters")
+
+
+def test_trace(monkeypatch):
+    logger = FakeLogger()
+    monkeypatch.setattr(base, "LOGGER", logger)
+    request = FakeRequest(
+        "http://tendrl/api/1.0/login", {"Authorization": "Bearer secret"},
+        '{"password": "secret"}')
+    response = FakeResponse(request, content=b'{"access_token": "secret"}')
+    tracer = base.RequestTracer(sample={"*/ping": 0})
+    tracer.trace(response)
+    assert logger.messages[0] == \
+        "request: POST http://tendrl/api/1.0/login -> 200 OK (0.500s)"
+    assert len(logger.messages) == 5
+    assert not any("secret" in message for message in logger.messages)
+    # streamed content is not read
+    response._content = False
+    del response.content
+    tracer.trace(response)
+    assert logger.messages[-1] == "response.content: <streamed>"
+    tracer.trace(FakeResponse(FakeRequest("http://tendrl/api/1.0/ping")))
+    base.RequestTracer(enabled=False).trace(response)
+    assert len(logger.messages) == 10
+
+
+def make_response(content, status_code=200, reason="OK", elapsed=0.1):
+    response = requests.Response()
+    response._content = content
+    response.status_code = status_code
+    response.reason = reason
+    response.elapsed = datetime.timedelta(seconds=elapsed)
+    response.request = requests.Request(
+        "GET", "http://tendrl/api/1.0/clusters").prepare()
+    response.url = response.request.url
+    return response
+
+
+def test_api_response_json_decoded_once(monkeypatch):
+    response = make_response(b'{"clusters": []}')
+    calls = []
+    decode = response.json
+    monkeypatch.setattr(
+        response, "json", lambda **kwargs: calls.append(kwargs) or decode())
+    wrapped = base.ApiResponse(response)
+    assert wrapped.json() == {"clusters": []}
+    assert wrapped.json() is wrapped.json()
+    assert len(calls) == 1
+    assert (wrapped.status, wrapped.ok, wrapped.reason) == (200, True, "OK")
+
+
+def test_api_response_invalid_json(monkeypatch):
+    response = make_response(b"<html>")
+    calls = []
+    decode = response.json
+    monkeypatch.setattr(
+        response, "json", lambda **kwargs: calls.append(kwargs) or decode())
+    wrapped = base.ApiResponse(response)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            wrapped.json()
+    assert len(calls) == 1
+
+
+def test_check_response(checks):
+    response = base.ApiResponse(make_response(b'{"clusters": []}', elapsed=0.5))
+    base.ApiBase.check_response(response, max_latency=1)
+    assert [check.result for check in checks] == [True, True, True, True]
+    assert "at most 1s" in checks[-1].msg
+
+
+@pytest.mark.parametrize("check_json,expected", [
+    (True, [False, True, True, True, False]), (False, [True, True, True, False])])
+def test_check_response_failures(checks, check_json, expected):
+    response = make_response(b"<html>", elapsed=2)
+    base.ApiBase.check_response(
+        response, check_json=check_json, max_latency=1, latency_issue="BZ1")
+    assert [check.result for check in checks] == expected
+    assert checks[-1].issue == "BZ1"
+    if check_json:
+        assert checks[0].msg.startswith("Bad response")
@@ -0,0 +1,72 @@
+# -*- coding: utf8 -*-
+"""
+Tests of usmqe.api.tendrlapi.asyncapi module against Tendrl API stand-in.
+"""
+
+import threading
+
+import pytest
+
+from usmqe.api.tendrlapi import asyncapi, common, glusterapi
+from usmqe.api.tendrlapi.mockserver import TendrlMockServer
+
+
+@pytest.fixture
+def tendrl_server(monkeypatch):
+    with TendrlMockServer(nodes=3, volumes=2, bricks_per_volume=2) as server:
+        for module in (common, glusterapi):
+            monkeypatch.setitem(
+                module.CONF.config["usmqe"], "api_url", server.api_url)
+        yield server
+
+
+@pytest.fixture
+def check_threads(monkeypatch):
+    """
+    Record names of threads which log checks.
+    """
+    threads = []
+    monkeypatch.setattr(
+        pytest, "check",
+        lambda *args, **kwargs: threads.append(threading.current_thread().name),
+        raising=False)
+    return threads
+
+
+def test_describe_cluster(tendrl_server, check_threads):
+    auth = common.login("admin", "adminuser")
+    del check_threads[:]
+    with asyncapi.AsyncTendrlApiGluster(auth=auth, concurrency=4) as api:
+        # overlapping api objects don't affect each other
+        with asyncapi.AsyncTendrlApi(auth=auth) as other_api:
+            description, _ = asyncapi.run(api.gather(
+                api.describe_cluster(tendrl_server.cluster_id),
+                other_api.get_nodes()))
+        executor = api._executor
+    assert len(description["nodes"]["nodes"]) == 3
+    assert len(description["volumes"]["volumes"]) == 2
+    assert [len(bricks["bricks"]) for bricks in description["bricks"].values()] == \
+        [2, 2]
+    # checks of worker threads are logged in thread of the event loop
+    assert check_threads
+    assert set(check_threads) == {threading.current_thread().name}
+    assert executor._shutdown
+    assert api._executor is None
+
+
+def test_checks_of_failed_call(tendrl_server, checks):
+    auth = common.login("admin", "adminuser")
+    del checks[:]
+    with asyncapi.AsyncTendrlApiGluster(auth=auth) as api:
+        asyncapi.run(api.get_cluster("missing"))
+        # api object of async api doesn't collect checks
+        api.api.check_response(
+            api.api.request("GET", tendrl_server.api_url + "ping"))
+    assert [check.result for check in checks if "should equal" in check.msg] == \
+        [False, False, True, True]
+
+
+def test_requires_with_statement():
+    api = asyncapi.AsyncTendrlApi()
+    with pytest.raises(RuntimeError):
+        asyncapi.run(api.ping())
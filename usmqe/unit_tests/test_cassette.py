@@ -0,0 +1,62 @@
+# -*- coding: utf8 -*-
+"""
+Tests of record/replay of API requests (usmqe.api.cassette).
+"""
+
+import datetime
+import gzip
+
+import pytest
+
+from usmqe.api import cassette
+from usmqe.api.tendrlapi import common
+from usmqe.api.tendrlapi.mockserver import TendrlMockServer
+
+
+@pytest.fixture
+def library(monkeypatch, tmpdir):
+    """
+    Replace cassette library by a new one which uses temporary directory.
+    """
+    def new_library(mode):
+        lib = cassette.CassetteLibrary(mode=mode, directory=str(tmpdir))
+        monkeypatch.setattr(cassette, "LIBRARY", lib)
+        return lib
+    return new_library
+
+
+def test_record_and_replay(library, monkeypatch):
+    measurement = {"start": datetime.datetime(2018, 1, 1, 12, 0, 0), "result": 1}
+    with TendrlMockServer(nodes=2, volumes=1) as server:
+        monkeypatch.setitem(
+            common.CONF.config["usmqe"], "api_url", server.api_url)
+        with library("record").use("test_node[1]") as recorded:
+            auth = common.login("admin", "adminuser")
+            api = common.TendrlApi(auth=auth, cache=False)
+            clusters = api.get_cluster_list()
+            nodes = api.get_nodes()
+            recorded.record_value("measurement", measurement)
+            with pytest.raises(TypeError):
+                recorded.record_value("measurement", {"result": object()})
+        requests_count = server.requests_count
+        token = next(iter(server.tokens))
+    # secrets are not stored in cassette
+    with gzip.open(recorded.path, "rt", encoding="utf-8") as cassette_file:
+        content = cassette_file.read()
+    assert "adminuser" not in content
+    assert token not in content
+    with library("replay").use("test_node[1]") as replayed:
+        auth = common.login("admin", "adminuser")
+        api = common.TendrlApi(auth=auth, cache=False)
+        assert api.get_cluster_list() == clusters
+        assert api.get_nodes() == nodes
+        assert replayed.value("measurement") == measurement
+        with pytest.raises(cassette.CassetteError):
+            api.get_cluster(server.cluster_id)
+    assert requests_count == 3
+
+
+def test_disabled(library):
+    with library("disabled").use("test_node") as disabled:
+        assert disabled is None
+        assert cassette.LIBRARY.active() is None
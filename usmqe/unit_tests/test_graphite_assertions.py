@@ -0,0 +1,75 @@
+# -*- coding: utf8 -*-
+"""
+Tests of assertions of Graphite data (usmqe.api.graphiteapi.assertions).
+"""
+
+import numpy as np
+import pytest
+
+from usmqe.api.graphiteapi import assertions
+from usmqe.api.graphiteapi.series import Series
+
+TIMESTAMPS = np.arange(60, 660, 60)
+
+
+@pytest.fixture
+def series():
+    step = np.where(TIMESTAMPS >= 300, 80.0, 20.0)
+    ramp = TIMESTAMPS * 2.0
+    gaps = ramp.copy()
+    gaps[[2, 3, 4]] = np.nan
+    return {
+        "step": Series("step", TIMESTAMPS, step),
+        "ramp": Series("ramp", TIMESTAMPS, ramp),
+        "gaps": Series("gaps", TIMESTAMPS, gaps)}
+
+
+def test_samples(checks, series):
+    result = assertions.check_samples(series, expected=10, tolerance=0)
+    assert result["gaps"] == (7, 180)
+    assert result["step"] == (10, 0)
+    assert checks[0][0] is False
+    assert "gaps: 7 samples" in checks[0][1]
+    assertions.check_samples(
+        {"gaps": series["gaps"]}, expected=10, tolerance=3, max_gap=120)
+    assert checks[1][0] is False
+    assert "gap of 180s" in checks[1][1]
+
+
+def test_band(checks, series):
+    result = assertions.check_band(
+        {"step": series["step"]}, lower=10, upper=70, max_outliers=6)
+    assert result["step"] == [300, 360, 420, 480, 540, 600]
+    assert checks == [(True, "Values should be within <10, 70>", None)]
+    assertions.check_band(
+        {"ramp": series["ramp"]}, lower=TIMESTAMPS * 2 - 1,
+        upper=TIMESTAMPS * 2 + 1)
+    assert checks[1][0] is True
+
+
+def test_statistics(checks, series):
+    assert assertions.check_mean(series, 50, 1)["step"] == pytest.approx(56)
+    assert assertions.check_percentile(
+        series, 50, 80, 1)["step"] == pytest.approx(80)
+    assert assertions.check_slope(
+        series, 2, 1e-9)["gaps"] == pytest.approx(2)
+    assert assertions.check_rate(series, 2, 1e-9)["gaps"] == pytest.approx(2)
+    assert [check.result for check in checks] == [False, False, False, False]
+
+
+def test_step(checks, series):
+    result = assertions.check_step(
+        series, expected_time=300, tolerance=60, min_change=30)
+    assert result["step"] == (300, 60.0)
+    assert "step:" not in checks[0][1]
+    assert result["ramp"] == (120, 120.0)
+    assert "ramp: change 120 at 120" in checks[0][1]
+
+
+def test_integral(checks, series):
+    result = assertions.check_integral(
+        {"step": series["step"]}, expected=30600, divergence=1)
+    assert result["step"] == pytest.approx(3 * 60 * 20 + 60 * 50 + 5 * 60 * 80)
+    assert checks[0][0] is True
+    assert assertions.integral(series["gaps"]) == pytest.approx(
+        assertions.integral(series["ramp"]) - 4 * 60 * 2 * 240)
@@ -0,0 +1,92 @@
+# -*- coding: utf8 -*-
+"""
+Tests of cache of Graphite datapoints (usmqe.api.graphiteapi.cache).
+"""
+
+import pytest
+
+from usmqe.api.graphiteapi.cache import DatapointCache, merge_intervals
+from usmqe.api.graphiteapi.series import Series
+
+NOW = 10000
+
+
+class FakeGraphite(object):
+    """
+    Fetch function which generates datapoints every 60 seconds
+    (value is timestamp of the datapoint) and records its calls.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, targets, from_ts, until_ts):
+        self.calls.append((list(targets), from_ts, until_ts))
+        timestamps = [ts for ts in range(60, NOW, 60) if from_ts < ts <= until_ts]
+        return {target: Series(target, timestamps, timestamps) for target in targets}
+
+
+def expected(from_ts, until_ts):
+    return [[float(ts), ts] for ts in range(60, NOW, 60) if from_ts < ts <= until_ts]
+
+
+def test_merge_intervals():
+    assert merge_intervals([(5, 7), (0, 2), (2, 3), (6, 9)]) == [(0, 3), (5, 9)]
+
+
+def test_subrange_served_from_cache():
+    cache = DatapointCache(settle=120)
+    fetch = FakeGraphite()
+    result = cache.get_many(["a", "b"], 600, 3000, fetch, now=NOW)
+    assert result["a"].datapoints() == expected(600, 3000)
+    result = cache.get_many(["a", "b"], 1200, 2400, fetch, now=NOW)
+    assert result["b"].datapoints() == expected(1200, 2400)
+    assert fetch.calls == [(["a", "b"], 600, 3000)]
+    assert cache.stats()["hits"] == 1
+
+
+def test_only_missing_edges_fetched():
+    cache = DatapointCache(settle=120)
+    fetch = FakeGraphite()
+    cache.get_many(["a"], 1200, 2400, fetch, now=NOW)
+    result = cache.get_many(["a", "b"], 600, 3000, fetch, now=NOW)
+    assert result["a"].datapoints() == expected(600, 3000)
+    assert result["b"].datapoints() == expected(600, 3000)
+    assert fetch.calls[1:] == [
+        (["a"], 600, 1200), (["a"], 2400, 3000), (["b"], 600, 3000)]
+
+
+def test_unsettled_data_not_stored():
+    cache = DatapointCache(settle=120)
+    fetch = FakeGraphite()
+    until = NOW - 60
+    result = cache.get_many(["a"], NOW - 600, until, fetch, now=NOW)
+    assert result["a"].datapoints() == expected(NOW - 600, until)
+    result = cache.get_many(["a"], NOW - 600, until, fetch, now=NOW)
+    assert result["a"].datapoints() == expected(NOW - 600, until)
+    assert fetch.calls == [
+        (["a"], NOW - 600, until), (["a"], NOW - 120, until)]
+
+
+def test_lru_eviction():
+    cache = DatapointCache(settle=0, max_points=15)
+    fetch = FakeGraphite()
+    cache.get_many(["a"], 0, 600, fetch, now=NOW)
+    cache.get_many(["b"], 0, 600, fetch, now=NOW)
+    cache.get_many(["a"], 0, 600, fetch, now=NOW)
+    cache.get_many(["c"], 0, 600, fetch, now=NOW)
+    assert len(cache) == 10
+    assert cache.missing("b", 0, 600) == [(0, 600)]
+    assert cache.missing("c", 0, 600) == []
+
+
+@pytest.mark.parametrize("from_ts,until_ts,missing", [
+    (0, 100, [(0, 100)]),
+    (300, 500, []),
+    (100, 900, [(100, 300), (600, 700), (800, 900)]),
+    ])
+def test_missing(from_ts, until_ts, missing):
+    cache = DatapointCache(settle=0)
+    cache.store("a", Series("a", [], []), 300, 600)
+    cache.store("a", Series("a", [], []), 700, 800)
+    assert cache.missing("a", from_ts, until_ts) == missing
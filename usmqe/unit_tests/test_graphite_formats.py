@@ -0,0 +1,65 @@
+# -*- coding: utf8 -*-
+"""
+Tests of parsers of Graphite render formats (usmqe.api.graphiteapi.formats).
+"""
+
+import json
+import pickle
+
+import pytest
+
+from usmqe.api.graphiteapi import formats
+
+SERIES = [
+    {"name": "sumSeries(tendrl.a,tendrl.b)", "start": 60, "end": 240,
+     "step": 60, "values": [1.5, None, 3]},
+    {"name": "tendrl.empty", "start": 60, "end": 60, "step": 60, "values": []},
+    ]
+DATAPOINTS = [[[1.5, 60], [None, 120], [3.0, 180]], []]
+
+
+class FakeResponse(object):
+    def __init__(self, content):
+        self.content = content
+        self.text = content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def encode(render_format):
+    if render_format == "json":
+        return json.dumps([
+            {"target": item["name"], "datapoints": [
+                [value, item["start"] + i * item["step"]]
+                for i, value in enumerate(item["values"])]}
+            for item in SERIES]).encode("utf-8")
+    if render_format == "raw":
+        return "".join(
+            "{},{},{},{}|{}\n".format(
+                item["name"], item["start"], item["end"], item["step"],
+                ",".join(str(value) for value in item["values"]))
+            for item in SERIES).encode("utf-8")
+    if render_format == "pickle":
+        return pickle.dumps(SERIES)
+    if render_format == "msgpack":
+        msgpack = pytest.importorskip("msgpack")
+        return msgpack.packb(SERIES)
+
+
+@pytest.mark.parametrize("render_format", ["json", "raw", "pickle", "msgpack"])
+def test_parse(render_format):
+    result = formats.parse(render_format, FakeResponse(encode(render_format)))
+    assert [series.target for series in result] == [
+        item["name"] for item in SERIES]
+    assert [series.datapoints() for series in result] == DATAPOINTS
+
+
+def test_pickle_refuses_classes():
+    with pytest.raises(pickle.UnpicklingError):
+        formats.parse("pickle", FakeResponse(pickle.dumps([FakeResponse])))
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        formats.parse("csv", FakeResponse(b""))
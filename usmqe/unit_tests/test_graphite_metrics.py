@@ -0,0 +1,111 @@
+# -*- coding: utf8 -*-
+"""
+Tests related to functionality of usmqe.api.graphiteapi.metrics module
+"""
+
+import re
+
+import pytest
+
+from usmqe.api.graphiteapi import metrics
+from usmqe.api.mockserver import MockServer
+
+NAMES = [
+    "tendrl.clusters.c1.nodes.host1_example_com.cpu.percent-user",
+    "tendrl.clusters.c1.nodes.host1_example_com.cpu.percent-system",
+    "tendrl.clusters.c1.nodes.host2_example_com.cpu.percent-user",
+    "tendrl.clusters.c1.nodes.host2_example_com.memory.percent-used",
+    "tendrl.clusters.c1.volumes.vol1.pcnt_used",
+    ]
+
+
+@pytest.fixture(params=["index", "find"])
+def graphite_metrics(request, monkeypatch):
+    """
+    Graphite metrics endpoints, with or without ``metrics/index.json``.
+    """
+    server = MockServer()
+    requests = []
+
+    def index_json(req):
+        requests.append(req.path)
+        if request.param == "find":
+            return 404, "not found"
+        return 200, NAMES
+
+    def find(req):
+        requests.append(req.path)
+        query = req.query["query"][0]
+        depth = query.count(".") + 1
+        regex = re.compile(r"\A{}\Z".format(metrics.glob_regex(query)))
+        nodes = {}
+        for name in NAMES:
+            parts = name.split(".")
+            node = ".".join(parts[:depth])
+            if len(parts) >= depth and regex.match(node):
+                nodes[node] = {
+                    "id": node, "text": parts[depth - 1],
+                    "leaf": int(len(parts) == depth)}
+        return 200, list(nodes.values())
+
+    server.route("GET", "/metrics/index.json", index_json)
+    server.route("GET", "/metrics/find", find)
+    with server:
+        monkeypatch.setitem(
+            metrics.CONF.config["usmqe"], "graphite_api_url", server.url)
+        yield metrics.MetricIndex(ttl=300), requests
+
+
+@pytest.mark.parametrize("pattern,expected", [
+    ("tendrl.clusters.c1.volumes.vol1.pcnt_used", [NAMES[4]]),
+    ("tendrl.clusters.c1.volumes.vol2.pcnt_used", []),
+    ("tendrl.clusters.*.nodes.*.cpu.*", sorted(NAMES[:3])),
+    ("tendrl.clusters.c1.nodes.host[12]_example_com.cpu.percent-user",
+     [NAMES[0], NAMES[2]]),
+    ("tendrl.clusters.c1.nodes.host2_example_com.{cpu,memory}.percent-*",
+     [NAMES[2], NAMES[3]]),
+    ("tendrl.clusters.c1.nodes.*", []),
+    ("tendrl.*.c1.volumes.vol?.pcnt_used", [NAMES[4]]),
+    ])
+def test_expand(graphite_metrics, pattern, expected):
+    index, _ = graphite_metrics
+    assert index.expand(pattern) == expected
+
+
+def test_index_loaded_once(graphite_metrics):
+    index, requests = graphite_metrics
+    for _ in range(3):
+        index.expand("tendrl.clusters.*.nodes.*.cpu.*")
+        index.expand(NAMES[0])
+    assert requests[0] == "/metrics/index.json"
+    # without the index, results of metrics/find are cached
+    assert requests[1:] in ([], ["/metrics/find"] * 2)
+
+
+def test_expand_placeholders():
+    targets = metrics.expand_placeholders(
+        ["tendrl.clusters.$cluster_id.nodes.$host_name.cpu.percent-user",
+         "tendrl.clusters.$cluster_id.volumes.$volume_name.pcnt_used"],
+        cluster_id=["c1"],
+        host_name=[metrics.graphite_name(host)
+                   for host in ("host1.example.com", "host2.example.com")],
+        volume_name=["vol1"])
+    assert targets == [NAMES[0], NAMES[2], NAMES[4]]
+    with pytest.raises(ValueError):
+        metrics.expand_placeholders(["tendrl.$unknown"], host_name=["a"])
+
+
+def test_check_targets(graphite_metrics, checks):
+    index, _ = graphite_metrics
+    targets = metrics.expand_placeholders(
+        ["tendrl.clusters.c1.nodes.$host_name.cpu.percent-user"],
+        host_name=["host1_example_com", "host2.example.com"])
+    missing = index.check_targets(targets)
+    assert missing == [
+        "tendrl.clusters.c1.nodes.host2.example.com.cpu.percent-user"]
+    assert len(checks) == 1
+    result, msg, _ = checks[0]
+    assert not result
+    assert "1 missing" in msg
+    assert "existing under 'tendrl.clusters.c1.nodes': " \
+        "host1_example_com, host2_example_com" in msg
@@ -0,0 +1,118 @@
+# -*- coding: utf8 -*-
+"""
+Tests of Graphite client against usmqe.api.graphiteapi.mockserver stand-in
+with synthetic metrics.
+"""
+
+import numpy as np
+import pytest
+
+from usmqe.api.graphiteapi import assertions, graphiteapi, metrics, synthetic
+from usmqe.api.graphiteapi.mockserver import CarbonClient, GraphiteMockServer
+
+UNTIL = 1500000000
+FROM = UNTIL - 6 * 3600
+
+HOSTS = ["host{}_example_com".format(i) for i in range(50)]
+VOLUMES = {
+    "vol{}".format(i): ["brick{}".format(j) for j in range(12)]
+    for i in range(10)}
+LOAD_TARGET = "tendrl.clusters.c1.volumes.vol0.pcnt_used"
+
+
+@pytest.fixture
+def graphite_server(monkeypatch):
+    """
+    Run Graphite stand-in with synthetic metrics of a cluster and point
+    graphite_api_url config option to it.
+    """
+    generator = synthetic.SyntheticMetrics(
+        seed=1, gap_ratio=0.01, overrides={LOAD_TARGET: lambda ts: ts * 0 + 42})
+    names = synthetic.tendrl_names(
+        "c1", hosts=HOSTS, volumes=VOLUMES, short_name="cl1")
+    monkeypatch.setitem(
+        graphiteapi.CONF.config["usmqe"], "graphite_ready", {"timeout": 0})
+    with GraphiteMockServer(generator=generator, names=names) as server:
+        for module in (graphiteapi, metrics):
+            monkeypatch.setitem(
+                module.CONF.config["usmqe"], "graphite_api_url", server.url)
+        yield server
+
+
+def test_tendrl_names():
+    names = synthetic.tendrl_names(
+        "c1", hosts=HOSTS, volumes=VOLUMES, short_name="cl1")
+    per_root = 50 * len(synthetic.NODE_METRICS) + \
+        10 * len(synthetic.VOLUME_METRICS) + \
+        120 * len(synthetic.BRICK_METRICS)
+    assert len(names) == len(set(names)) == 2 * per_root
+    assert "tendrl.names.cl1.volumes.vol3.nodes.host5_example_com." \
+        "bricks.brick5.iops.gauge-read" in names
+
+
+def test_synthetic_values_deterministic():
+    generator = synthetic.SyntheticMetrics(seed=3, gap_ratio=0.1)
+    whole = generator.series("tendrl.a", FROM, UNTIL)
+    part = generator.series("tendrl.a", FROM + 3600, FROM + 7200)
+    assert len(whole) == 360
+    assert np.array_equal(
+        whole.slice(FROM + 3601, FROM + 7200).values, part.values,
+        equal_nan=True)
+    assert 10 < len(whole) - whole.count() < 70
+    other = synthetic.SyntheticMetrics(seed=4).series("tendrl.a", FROM, UNTIL)
+    assert not np.allclose(whole.values[whole.valid()], other.values[whole.valid()])
+
+
+@pytest.mark.parametrize("render_format", ["json", "raw", "pickle"])
+def test_render_many_series(graphite_server, render_format):
+    graphite = graphiteapi.GraphiteApi(cache=False)
+    pattern = "tendrl.clusters.c1.volumes.*.nodes.*.bricks.*.*.*"
+    series = graphite.get_series_many(
+        [pattern], FROM, UNTIL, render_format=render_format)
+    series.pop(pattern)
+    assert len(series) == 120 * len(synthetic.BRICK_METRICS)
+    for name, item in series.items():
+        expected = graphite_server.generator.series(name, FROM, UNTIL)
+        assert np.array_equal(item.timestamps, expected.timestamps)
+        assert np.allclose(item.values, expected.values, equal_nan=True)
+
+
+def test_assertions_on_synthetic_data(graphite_server, checks):
+    graphite = graphiteapi.GraphiteApi(cache=False)
+    series = graphite.get_series_many([LOAD_TARGET], FROM, UNTIL)
+    assertions.check_band(series, lower=42, upper=42)
+    graphite.compare_data_mean(
+        42, [LOAD_TARGET], FROM, UNTIL, divergence=0.1, push_down=True)
+    results = [
+        check.result for check in checks
+        if check.msg.startswith(("Values should be", "Data mean"))]
+    assert results == [True, True]
+
+
+def test_metric_index(graphite_server, checks):
+    index = metrics.MetricIndex()
+    targets = metrics.expand_placeholders(
+        ["tendrl.clusters.c1.nodes.$host_name.cpu.percent-user"],
+        host_name=HOSTS[:3] + ["host1.example.com"])
+    assert index.check_targets(targets) == [
+        "tendrl.clusters.c1.nodes.host1.example.com.cpu.percent-user"]
+    assert index.children("tendrl.names") == ["cl1"]
+
+
+@pytest.mark.parametrize("protocol", ["plaintext", "pickle"])
+def test_carbon_feed(graphite_server, protocol):
+    generator = synthetic.SyntheticMetrics(seed=7, noise=0)
+    names = ["tendrl.clusters.c2.nodes.host{}.cpu.percent-user".format(i)
+             for i in range(20)]
+    port = graphite_server.carbon_port if protocol == "plaintext" else \
+        graphite_server.carbon_pickle_port
+    client = CarbonClient(port=port, protocol=protocol, batch=100)
+    sent = client.send(generator.datapoints(names, FROM, UNTIL))
+    assert sent == 20 * 360
+    assert graphite_server.wait_for_received(sent)
+    graphite = graphiteapi.GraphiteApi(cache=False)
+    series = graphite.get_series_many(
+        ["tendrl.clusters.c2.nodes.*.cpu.percent-user"], FROM, UNTIL)
+    for name in names:
+        expected = generator.series(name, FROM, UNTIL)
+        assert np.allclose(series[name].values, expected.values)
@@ -0,0 +1,93 @@
+# -*- coding: utf8 -*-
+"""
+Tests related to functionality of usmqe.api.graphiteapi.monitor module
+"""
+
+import json
+import time
+
+import numpy as np
+import pytest
+
+from usmqe.api import cassette
+from usmqe.api.graphiteapi import monitor, synthetic
+from usmqe.api.graphiteapi.mockserver import GraphiteMockServer
+
+NOW = 1500000000
+HOSTS = ["host{}_example_com".format(i) for i in range(4)]
+STALE = "tendrl.clusters.c1.nodes.host0_example_com.cpu.percent-user"
+GAPS = "tendrl.clusters.c1.nodes.host1_example_com.cpu.percent-user"
+
+
+def stale_values(timestamps):
+    return np.where(timestamps > NOW - 400, np.nan, 10.0)
+
+
+def gap_values(timestamps):
+    return np.where(
+        (timestamps > NOW - 300) & (timestamps <= NOW - 180), np.nan, 20.0)
+
+
+@pytest.fixture
+def graphite_server(monkeypatch):
+    """
+    Graphite stand-in with one stale series and one series with a gap.
+    """
+    generator = synthetic.SyntheticMetrics(
+        overrides={STALE: stale_values, GAPS: gap_values})
+    names = synthetic.tendrl_names(
+        "c1", hosts=HOSTS, node_metrics=["cpu.percent-user"])
+    with GraphiteMockServer(generator=generator, names=names, carbon=False) as server:
+        monkeypatch.setitem(
+            monitor.CONF.config["usmqe"], "graphite_api_url", server.url)
+        yield server
+
+
+def test_scan(graphite_server):
+    graphite_monitor = monitor.GraphiteMonitor(
+        ["tendrl.clusters.*.nodes.*.cpu.*"], window=600, stale=300, settle=120)
+    entry = graphite_monitor.scan(now=NOW)
+    assert entry["series"] == 4
+    assert entry["stale"] == [STALE]
+    assert entry["max_lag"] == 420
+    assert entry["new_gaps"] == 2
+    # the same (extended) gaps are not counted again
+    entry = graphite_monitor.scan(now=NOW + 60)
+    assert entry["new_gaps"] == 0
+    report = graphite_monitor.report()
+    assert report["scans"] == 2
+    assert report["stale"] == {STALE: 2}
+    assert report["gaps"][GAPS] == [(NOW - 240, NOW - 180)]
+    assert report["missing_seconds"][GAPS] == 120
+    assert report["gaps"][STALE] == [(NOW - 360, NOW - 60)]
+    assert "1 stale series, 2 series with gaps" in graphite_monitor.format_report()
+
+
+def test_scan_error(graphite_server):
+    graphite_monitor = monitor.GraphiteMonitor(["sumSeries(tendrl.*)"])
+    entry = graphite_monitor.scan(now=NOW)
+    assert entry["error"].startswith("400")
+    assert graphite_monitor.report()["errors"] == 1
+
+
+def test_requests_not_recorded(graphite_server, monkeypatch, tmpdir):
+    library = cassette.CassetteLibrary(mode="record", directory=str(tmpdir))
+    monkeypatch.setattr(cassette, "LIBRARY", library)
+    graphite_monitor = monitor.GraphiteMonitor(["tendrl.clusters.*.nodes.*.cpu.*"])
+    with library.use("test_node") as recorded:
+        assert graphite_monitor.scan(now=NOW)["series"] == 4
+    assert recorded.interactions == []
+
+
+def test_background_thread(graphite_server, tmpdir):
+    report_file = tmpdir.join("monitor.json")
+    graphite_monitor = monitor.GraphiteMonitor(
+        ["tendrl.clusters.c1.nodes.*.cpu.percent-user"], interval=0.05,
+        report_file=str(report_file))
+    with graphite_monitor:
+        deadline = time.monotonic() + 10
+        while len(graphite_monitor.timeline) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    data = json.loads(report_file.read())
+    assert data["report"]["scans"] == len(data["timeline"]) >= 3
+    assert data["report"]["series"] == 4
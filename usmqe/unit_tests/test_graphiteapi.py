@@ -0,0 +1,233 @@
+# -*- coding: utf8 -*-
+"""
+Tests related to functionality of usmqe.api.graphiteapi module
+"""
+
+import datetime
+import fnmatch
+import re
+
+import pytest
+
+from usmqe.api import cassette
+from usmqe.api.graphiteapi import graphiteapi
+from usmqe.api.mockserver import MockServer
+
+SUMMARIZE_RE = re.compile(
+    r'alias\(summarize\((isNonNull\()?([\w.]+)\)?, "\d+s", "(\w+)", true\), '
+    r'"(\w+\.\d+)"\)')
+ALIAS_RE = re.compile(r'alias\((.*), "([^"]+)"\)$')
+
+SERIES = {
+    "tendrl.a": [[1, 60], [None, 120], [3, 180]],
+    "tendrl.b": [[10, 60], [20, 120], [30, 180]],
+    }
+
+
+@pytest.fixture
+def graphite_server(monkeypatch):
+    """
+    Minimal Graphite render endpoint with static series.
+    """
+    server = MockServer()
+    requests = []
+
+    def render(request):
+        requests.append(request.query)
+        result = []
+        for target in request.query["target"]:
+            match = SUMMARIZE_RE.match(target)
+            if match and "summarize" in request.query.get("fail", []):
+                return 400, "unknown function"
+            if match:
+                non_null, metric, function, alias = match.groups()
+                values = [
+                    value for value, ts in SERIES.get(metric, [])
+                    if int(request.query["from"][0]) < ts <= int(
+                        request.query["until"][0]) and value is not None]
+                if non_null:
+                    value = len(values)
+                else:
+                    value = sum(values) / len(values) if values else None
+                if metric in SERIES:
+                    result.append(
+                        {"target": alias, "datapoints": [[value, 60]]})
+                continue
+            # the outermost alias names the series
+            alias = None
+            alias_match = ALIAS_RE.match(target)
+            while alias_match:
+                target, name = alias_match.groups()
+                alias = alias or name
+                alias_match = ALIAS_RE.match(target)
+            if target.startswith("sumSeries("):
+                result.append({
+                    "target": alias or target.replace("tendrl.", "t."),
+                    "datapoints": [[11, 60], [20, 120], [33, 180]]})
+            else:
+                for name in sorted(fnmatch.filter(SERIES, target)):
+                    result.append(
+                        {"target": alias or name, "datapoints": SERIES[name]})
+        if request.query["format"] == ["raw"]:
+            return 200, "".join(
+                "{},{},{},60|{}\n".format(
+                    item["target"], item["datapoints"][0][1],
+                    item["datapoints"][-1][1] + 60,
+                    ",".join(str(value) for value, _ in item["datapoints"]))
+                for item in result)
+        return 200, result
+
+    server.route("GET", "/render/", render)
+    # static data are ready, see test_wait_for_data
+    monkeypatch.setitem(
+        graphiteapi.CONF.config["usmqe"], "graphite_ready", {"timeout": 0})
+    with server:
+        monkeypatch.setitem(
+            graphiteapi.CONF.config["usmqe"], "graphite_api_url", server.url)
+        yield requests
+
+
+def test_get_datapoints_many(graphite_server):
+    graphite = graphiteapi.GraphiteApi()
+    targets = ["tendrl.a", "tendrl.missing", "tendrl.b"]
+    result = graphite.get_datapoints_many(targets, from_date=60, until_date=180)
+    assert result == {
+        "tendrl.a": SERIES["tendrl.a"],
+        "tendrl.missing": [],
+        "tendrl.b": SERIES["tendrl.b"]}
+    assert len(graphite_server) == 1
+    assert graphite_server[0]["target"] == targets
+    assert graphite_server[0]["from"] == ["60"]
+
+
+def test_get_datapoints_many_renamed(graphite_server):
+    graphite = graphiteapi.GraphiteApi()
+    targets = ["tendrl.a", "sumSeries(tendrl.a,tendrl.b)"]
+    result = graphite.get_datapoints_many(targets)
+    assert result == {
+        "tendrl.a": SERIES["tendrl.a"],
+        "sumSeries(tendrl.a,tendrl.b)": [[11, 60], [20, 120], [33, 180]]}
+
+
+@pytest.mark.parametrize("render_format", ["json", "raw"])
+def test_get_series_many(graphite_server, render_format):
+    graphite = graphiteapi.GraphiteApi(cache=False)
+    targets = ["tendrl.a", "tendrl.missing", "sumSeries(tendrl.a,tendrl.b)"]
+    result = graphite.get_series_many(targets, render_format=render_format)
+    assert result["tendrl.a"].datapoints() == [[1.0, 60], [None, 120], [3.0, 180]]
+    assert len(result["tendrl.missing"]) == 0
+    assert result["sumSeries(tendrl.a,tendrl.b)"].mean() == pytest.approx(64 / 3)
+    assert set(result) == set(targets)
+    assert graphite_server[0]["format"] == [render_format]
+    assert graphite_server[0]["target"][2] == \
+        'alias(sumSeries(tendrl.a,tendrl.b), "usmqe.target.2")'
+
+
+def test_get_series_many_wildcard_and_alias(graphite_server, checks):
+    graphite = graphiteapi.GraphiteApi(cache=False)
+    targets = ["tendrl.a*", 'alias(tendrl.b, "b")', "tendrl.*"]
+    result = graphite.get_series_many(targets)
+    # wildcard which matches one series gets its data
+    assert result["tendrl.a*"].datapoints() == [[1.0, 60], [None, 120], [3.0, 180]]
+    assert result['alias(tendrl.b, "b")'].mean() == 20
+    # series of wildcard which matches more series are under their own names
+    assert len(result["tendrl.*"]) == 0
+    assert result["tendrl.b"].mean() == 20
+    graphite.compare_data_mean(
+        22, ["tendrl.a*", 'alias(tendrl.b, "b")'], divergence=0.1)
+    assert [
+        check.result for check in checks
+        if check.msg.startswith("Data mean")] == [True]
+
+
+def test_compare_data_mean(graphite_server, checks):
+    graphite = graphiteapi.GraphiteApi()
+    graphite.compare_data_mean(
+        22, ["tendrl.a", "tendrl.b"], divergence=0.1)
+    graphite.compare_data_mean(
+        -18, ["tendrl.a", "tendrl.b"], divergence=0.1, operation="diff")
+    assert [result for result, msg, _ in checks if "Data mean" in msg] == [
+        True, True]
+    assert len(graphite_server) == 2
+
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_compare_data_mean_push_down(graphite_server, checks, monkeypatch, fail):
+    graphite = graphiteapi.GraphiteApi(cache=False)
+    if fail:
+        monkeypatch.setattr(
+            graphite, "request",
+            lambda method, url, params: graphiteapi.GraphiteApi.request(
+                graphite, method, url,
+                params=dict(params, fail="summarize")
+                if "summarize" in str(params["target"]) else params))
+    graphite.compare_data_mean(
+        22, ["tendrl.a", "tendrl.b"], from_date=1, until_date=180,
+        divergence=0.1, push_down=True)
+    assert [result for result, msg, _ in checks if "Data mean" in msg] == [True]
+    assert [result for result, msg, _ in checks if "be ready" in msg] == [True]
+    assert [
+        msg for result, msg, _ in checks if "Number of samples" in msg] == [
+        "Number of samples of used data should be 3, is 2.",
+        "Number of samples of used data should be 3, is 3."]
+    assert len(graphite_server) == (2 if fail else 1)
+
+
+def test_get_ready_series(graphite_server, checks):
+    start = datetime.datetime.fromtimestamp(60)
+    end = datetime.datetime.fromtimestamp(198)
+    from_ts, until_ts, samples = graphiteapi.workload_range(start, end)
+    assert (from_ts, until_ts, samples) == (60, 180, 2)
+    graphite = graphiteapi.GraphiteApi(cache=False)
+    series = graphite.get_ready_series(["tendrl.a"], from_ts, until_ts)
+    assert series["tendrl.a"].count() == 2
+    assert (graphite_server[0]["from"], graphite_server[0]["until"]) == (
+        ["60"], ["180"])
+    assert [check.result for check in checks if "be ready" in check.msg] == [True]
+
+
+@pytest.mark.parametrize("ready_after,timeout,expected", [
+    (3, 5, True), (100, 0.2, False)])
+def test_wait_for_data(monkeypatch, ready_after, timeout, expected):
+    server = MockServer()
+    calls = []
+
+    def render(request):
+        calls.append(request.query)
+        last = 1.0 if len(calls) >= ready_after else None
+        return 200, [{"target": "tendrl.late",
+                      "datapoints": [[1.0, 60], [1.0, 120], [last, 180]]}]
+
+    server.route("GET", "/render/", render)
+    monkeypatch.setitem(
+        graphiteapi.CONF.config["usmqe"], "graphite_ready",
+        {"backoff": {"initial": 0.01, "maximum": 0.05}})
+    with server:
+        monkeypatch.setitem(
+            graphiteapi.CONF.config["usmqe"], "graphite_api_url", server.url)
+        graphite = graphiteapi.GraphiteApi()
+        assert graphite.wait_for_data(
+            ["tendrl.late"], 200, timeout=timeout) is expected
+    if expected:
+        assert len(calls) == ready_after
+    assert calls[0]["from"] == ["-400"]
+
+
+def test_replay(monkeypatch):
+    library = cassette.CassetteLibrary(mode="replay")
+    library.current = cassette.Cassette("unused.json.gz", "record")
+    library.current.mode = "replay"
+    monkeypatch.setattr(cassette, "LIBRARY", library)
+    rendered = []
+
+    class FailingCache(object):
+        def get_many(self, *args):
+            raise AssertionError("cache used in replay mode")
+
+    graphite = graphiteapi.GraphiteApi(cache=FailingCache())
+    monkeypatch.setattr(
+        graphite, "render", lambda *args: rendered.append(args) or [])
+    assert graphite.wait_for_data(["tendrl.a"], 200, timeout=10)
+    assert rendered == []
+    graphite.get_series_many(["tendrl.a"], 0, 200)
+    assert len(rendered) == 1
@@ -0,0 +1,95 @@
+# -*- coding: utf8 -*-
+"""
+Tests of iterative decoding of json responses (usmqe.api.jsonstream).
+"""
+
+import json
+
+import pytest
+
+from usmqe.api import jsonstream
+from usmqe.api.tendrlapi import common
+from usmqe.api.tendrlapi.mockserver import TendrlMockServer
+
+DOCUMENT = {
+    "count": 12345,
+    "meta": {"items": [1, 2, {"x": "]}"}]},
+    "nodes": [
+        {"node_id": "n{}".format(i), "fqdn": "gl{}.ěšč".format(i),
+         "localstorage": {"blockdevices": {"free": {"/dev/vdb": i}}}}
+        for i in range(5)],
+    "total": 5}
+
+
+def chunked(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 100000])
+def test_iter_json_items(size):
+    data = json.dumps(DOCUMENT, ensure_ascii=False).encode("utf-8")
+    items = list(jsonstream.iter_json_items(chunked(data, size), key="nodes"))
+    assert items == DOCUMENT["nodes"]
+
+
+def test_top_level_list():
+    data = b'[1, 22, 333 ]'
+    assert list(jsonstream.iter_json_items(chunked(data, 1))) == [1, 22, 333]
+    assert list(jsonstream.iter_json_items([b" [ ] "])) == []
+
+
+class CountingDecoder(json.JSONDecoder):
+
+    def __init__(self):
+        super(CountingDecoder, self).__init__()
+        self.calls = 0
+
+    def raw_decode(self, *args):
+        self.calls += 1
+        return super(CountingDecoder, self).raw_decode(*args)
+
+
+@pytest.mark.parametrize("size", [1, 2, 5])
+def test_value_decoded_once(size):
+    values = [
+        {"a": 'x\\"]}[{', "b": [1.5, [True, None]], "c": "\u011b"},
+        "\\", 12345, False]
+    data = json.dumps(values).encode("utf-8")
+    buf = jsonstream._Buffer(chunked(data, size))
+    decoder = CountingDecoder()
+    buf.expect("[")
+    decoded = []
+    for _ in values:
+        decoded.append(buf.decode(decoder))
+        buf.expect(",]")
+    assert decoded == values
+    assert decoder.calls == len(values)
+
+
+def test_projection():
+    data = json.dumps(DOCUMENT).encode("utf-8")
+    items = jsonstream.iter_json_items(
+        [data], key="nodes",
+        fields=["node_id", "localstorage.blockdevices.free", "missing.key"])
+    assert next(items) == {
+        "node_id": "n0",
+        "localstorage": {"blockdevices": {"free": {"/dev/vdb": 0}}}}
+
+
+@pytest.mark.parametrize("data", [
+    b'{"count": 1}', b'{"nodes": [{"a": 1}', b'{"nodes": [1 2]}', b'[1,'])
+def test_invalid(data):
+    with pytest.raises(ValueError):
+        list(jsonstream.iter_json_items(chunked(data, 2), key="nodes"))
+
+
+def test_iter_nodes(monkeypatch):
+    with TendrlMockServer(nodes=50, compress=True) as server:
+        monkeypatch.setitem(
+            common.CONF.config["usmqe"], "api_url", server.api_url)
+        api = common.TendrlApi(
+            auth=common.login("admin", "adminuser"), cache=False)
+        nodes = list(api.iter_nodes(fields=["node_id", "fqdn"]))
+    assert nodes == [
+        {"node_id": node["node_id"], "fqdn": node["fqdn"]}
+        for node in server.node_list]
@@ -0,0 +1,52 @@
+# -*- coding: utf8 -*-
+"""
+Tests of latency budgets of API endpoints (usmqe.api.latency).
+"""
+
+import datetime
+
+import pytest
+
+from usmqe.api import latency
+
+
+class FakeResponse(object):
+    def __init__(self, method, url, elapsed):
+        self.request = type("Request", (), {"method": method})
+        self.url = url
+        self.elapsed = datetime.timedelta(seconds=elapsed)
+
+
+@pytest.mark.parametrize("url,expected", [
+    ("http://t/api/1.0/clusters", "GET /api/1.0/clusters"),
+    ("http://t/api/1.0/clusters/85f6bf4e-04f1-4a11-9a43-1a8b26b45aca/nodes",
+     "GET /api/1.0/clusters/:id/nodes"),
+    ("http://t/api/1.0/jobs/12?fields=status", "GET /api/1.0/jobs/:id"),
+    ])
+def test_endpoint(url, expected):
+    assert latency.endpoint("GET", url) == expected
+
+
+def test_budgets(checks):
+    budgets = latency.LatencyBudgets(
+        default=1,
+        budgets={"GET */volumes": {"max": 0.1, "issue": "BZ1"}},
+        report=2)
+    base = "http://t/api/1.0/clusters/1/"
+    budgets.check(FakeResponse("GET", base + "volumes", 0.2))
+    budgets.check(FakeResponse("GET", base + "nodes", 0.2))
+    budgets.check(FakeResponse("GET", base + "nodes", 0.5), max_latency=0.3)
+    assert [(check.result, check.issue) for check in checks] == [
+        (False, "BZ1"), (True, None), (False, None)]
+    summary = budgets.summary()
+    assert [item["endpoint"] for item in summary] == [
+        "GET /api/1.0/clusters/:id/nodes", "GET /api/1.0/clusters/:id/volumes"]
+    assert summary[0]["count"] == 2
+    assert summary[0]["mean"] == pytest.approx(0.35)
+
+
+def test_no_budget(checks):
+    budgets = latency.LatencyBudgets()
+    budgets.check(FakeResponse("GET", "http://t/api/1.0/ping", 10))
+    assert checks == []
+    assert budgets.summary()[0]["max"] == 10
@@ -0,0 +1,42 @@
+# -*- coding: utf8 -*-
+"""
+Tests related to functionality of usmqe.api.schema module
+"""
+
+import pytest
+from usmqe.api.schema import compile_schema
+
+
+SCHEMA = {"brick_path": str, "size": int, "devices": list}
+
+
+def test_valid_records():
+    validator = compile_schema(SCHEMA)
+    records = [
+        {"brick_path": "/b{}".format(i), "size": i, "devices": []}
+        for i in range(1000)]
+    assert validator(records) == []
+
+
+@pytest.mark.parametrize("record,expected", [
+    ({"brick_path": "/b", "size": 1},
+        ["brick_path=/b: missing keys ['devices']"]),
+    ({"brick_path": "/b", "size": 1, "devices": [], "extra": 0},
+        ["brick_path=/b: unknown keys ['extra']"]),
+    ({"brick_path": "/b", "size": "1", "devices": []},
+        ["brick_path=/b: 'size' value '1' should be instance of "
+         "<class 'int'>"]),
+    ])
+def test_invalid_record(record, expected):
+    validator = compile_schema(SCHEMA, id_key="brick_path")
+    assert validator([record]) == expected
+
+
+def test_record_index_in_violation():
+    validator = compile_schema(SCHEMA)
+    records = [
+        {"brick_path": "/b1", "size": 1, "devices": []},
+        {"brick_path": "/b2", "size": 2, "devices": None}]
+    violations = validator(records)
+    assert len(violations) == 1
+    assert violations[0].startswith("#1: 'devices'")
@@ -0,0 +1,57 @@
+# -*- coding: utf8 -*-
+"""
+Tests of Graphite series stored in NumPy arrays (usmqe.api.graphiteapi.series).
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from usmqe.api.graphiteapi.series import Series, combine
+
+DATAPOINTS = [[1, 60], [None, 120], [None, 180], [5, 240], [6, 300], [None, 360]]
+
+
+def test_from_datapoints():
+    series = Series.from_datapoints("t", DATAPOINTS)
+    assert series.timestamps.dtype == np.int64
+    assert len(series) == 6
+    assert series.count() == 3
+    assert series.mean() == pytest.approx(4)
+    assert series.step() == 60
+    assert series.datapoints() == [
+        [None if value is None else float(value), ts] for value, ts in DATAPOINTS]
+
+
+def test_empty():
+    series = Series.from_datapoints("t", [])
+    assert len(series) == 0
+    assert series.count() == 0
+    assert math.isnan(series.mean())
+    assert series.gaps() == []
+    assert series.step() is None
+
+
+def test_gaps_and_slice():
+    series = Series.from_datapoints("t", DATAPOINTS)
+    assert series.gaps() == [(120, 180), (360, 360)]
+    assert series.slice(180, 300).datapoints() == [
+        [None, 180], [5.0, 240], [6.0, 300]]
+
+
+@pytest.mark.parametrize("operation,expected", [
+    ("sum", [[11.0, 60], [None, 120], [25.0, 240]]),
+    ("diff", [[-9.0, 60], [None, 120], [-15.0, 240]])])
+def test_combine(operation, expected):
+    first = Series.from_datapoints("a", DATAPOINTS)
+    second = Series.from_datapoints(
+        "b", [[10, 60], [20, 120], [30, 200], [20, 240]])
+    combined = combine([first, second], operation)
+    assert combined.target == "{}(a,b)".format(operation)
+    assert combined.datapoints() == expected
+
+
+def test_combine_unsupported():
+    with pytest.raises(ValueError):
+        combine([], "mul")
@@ -0,0 +1,60 @@
+# -*- coding: utf8 -*-
+"""
+Tests related to functionality of usmqe.api.tendrlapi.snapshot module
+"""
+
+import copy
+
+from usmqe.api.tendrlapi.snapshot import ClusterSnapshot
+
+
+NODES = [
+    {"node_id": "n1", "fqdn": "gl1.example.com", "status": "UP"},
+    {"node_id": "n2", "fqdn": "gl2.example.com", "status": "UP"}]
+VOLUMES = [{"vol_id": "v1", "name": "volume_beta"}]
+BRICKS = {"v1": [
+    {"brick_path": "gl1.example.com:/b1", "node_id": "n1"},
+    {"brick_path": "gl2.example.com:/b1", "hostname": "gl2.example.com"}]}
+STORAGE_NODES = [
+    {"node_id": "n1", "localstorage": {"blockdevices": {"free": {
+        "/dev/vdc": {"device_kernel_name": "/dev/vdc"},
+        "/dev/vdb": {"device_kernel_name": "/dev/vdb"}}}}},
+    {"node_id": "other", "localstorage": {"blockdevices": {"free": {}}}}]
+
+
+def test_snapshot_indexes():
+    snapshot = ClusterSnapshot("c1", NODES, VOLUMES, BRICKS, STORAGE_NODES)
+    assert snapshot.nodes_by_fqdn["gl2.example.com"].node_id == "n2"
+    assert snapshot.volumes_by_name["volume_beta"].vol_id == "v1"
+    assert [b.brick_path for b in snapshot.bricks_by_node["n2"]] == [
+        "gl2.example.com:/b1"]
+    assert len(snapshot.bricks_by_volume["v1"]) == 2
+    assert snapshot.free_devices == {"n1": ["/dev/vdb", "/dev/vdc"]}
+
+
+def test_snapshot_diff():
+    old = ClusterSnapshot("c1", NODES, VOLUMES, BRICKS)
+    nodes = copy.deepcopy(NODES)
+    nodes[1]["status"] = "DOWN"
+    volumes = VOLUMES + [{"vol_id": "v2", "name": "volume_gamma"}]
+    new = ClusterSnapshot("c1", nodes, volumes, {"v1": BRICKS["v1"][:1]})
+    diff = old.diff(new)
+    assert diff["nodes"] == {"added": [], "removed": [], "changed": ["n2"]}
+    assert diff["volumes"]["added"] == ["v2"]
+    assert diff["bricks"]["removed"] == [("v1", "gl2.example.com:/b1")]
+
+
+def test_snapshot_from_cluster():
+    cluster = {
+        "cluster_id": "c1",
+        "nodes": {node["node_id"]: node for node in NODES},
+        "bricks": {"all": {
+            brick["brick_path"]: dict(brick, node_id="n1")
+            for brick in BRICKS["v1"]}}}
+    snapshot = ClusterSnapshot.from_cluster(cluster)
+    assert sorted(snapshot.nodes_by_fqdn) == ["gl1.example.com", "gl2.example.com"]
+    assert len(snapshot.bricks_by_node["n1"]) == 2
+    cluster["nodes"] = NODES
+    del cluster["bricks"]
+    assert ClusterSnapshot.from_cluster(cluster).nodes_by_id["n2"].fqdn == \
+        "gl2.example.com"
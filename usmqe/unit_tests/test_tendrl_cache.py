@@ -0,0 +1,173 @@
+# -*- coding: utf8 -*-
+"""
+Tests related to functionality of usmqe.api.tendrlapi.cache module
+"""
+
+import pytest
+import requests
+
+from usmqe.api import base
+from usmqe.api.tendrlapi import cache, common
+from usmqe.api.tendrlapi.mockserver import TendrlMockServer
+
+
+class Response(object):
+
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class Server(object):
+    """
+    Sends given responses and records headers of requests.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, headers):
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_ttl(clock):
+    response_cache = cache.ResponseCache(ttl=60)
+    first, second = Response(), Response()
+    send = Server(first, second)
+    assert response_cache.get("key", send) is first
+    clock[0] += 59
+    assert response_cache.get("key", send) is first
+    clock[0] += 2
+    assert response_cache.get("key", send) is second
+    assert send.requests == [{}, {}]
+    stats = response_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_revalidation(clock):
+    response_cache = cache.ResponseCache(ttl=60)
+    first = Response(headers={"ETag": '"v1"', "Last-Modified": "yesterday"})
+    changed = Response(headers={"ETag": '"v2"'})
+    send = Server(first, Response(304), changed)
+    response_cache.get("key", send)
+    clock[0] += 61
+    assert response_cache.get("key", send) is first
+    # revalidated response is used for another ttl
+    clock[0] += 59
+    assert response_cache.get("key", send) is first
+    clock[0] += 2
+    assert response_cache.get("key", send) is changed
+    assert send.requests == [
+        {},
+        {"If-None-Match": '"v1"', "If-Modified-Since": "yesterday"},
+        {"If-None-Match": '"v1"', "If-Modified-Since": "yesterday"}]
+    assert response_cache.stats()["revalidations"] == 1
+
+
+def test_json_not_shared(clock):
+    response_cache = cache.ResponseCache(ttl=60)
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'{"clusters": [1]}'
+    response.headers["ETag"] = '"v1"'
+    send = Server(base.ApiResponse(response), Response(304))
+    response_cache.get("key", send).json()["clusters"].append(2)
+    assert response_cache.get("key", send).json() == {"clusters": [1]}
+    clock[0] += 61
+    revalidated = response_cache.get("key", send)
+    assert revalidated.response is response
+    assert revalidated.json() == {"clusters": [1]}
+
+
+def test_errors_and_fresh(clock):
+    response_cache = cache.ResponseCache(ttl=60)
+    ok, refreshed = Response(), Response()
+    send = Server(Response(500), ok, refreshed)
+    assert response_cache.get("key", send).status_code == 500
+    assert response_cache.get("key", send) is ok
+    assert response_cache.get("key", send, fresh=True) is refreshed
+    assert response_cache.get("key", send) is refreshed
+
+
+@pytest.mark.parametrize("url,expected", [
+    ("http://tendrl/api/1.0/clusters", True),
+    ("http://tendrl/api/1.0/clusters/c1/notifications", True),
+    ("http://tendrl/api/1.0/jobs", False),
+    ("http://tendrl/api/1.0/jobs/j1/messages?from=1", False),
+    ("http://tendrl/api/1.0/ping", False),
+    ])
+def test_cacheable(url, expected):
+    response_cache = cache.ResponseCache(exclude=["*/jobs*", "*/ping"])
+    assert response_cache.cacheable(url) == expected
+
+
+@pytest.fixture
+def tendrl_server(monkeypatch):
+    with TendrlMockServer(nodes=2, volumes=1, job_duration=0.1) as server:
+        monkeypatch.setitem(
+            common.CONF.config["usmqe"], "api_url", server.api_url)
+        yield server
+
+
+def test_tendrl_api_cache(tendrl_server):
+    response_cache = cache.ResponseCache(ttl=60, exclude=["*/jobs*"])
+    api = common.TendrlApi(
+        auth=common.login("admin", "adminuser"), cache=response_cache)
+    other_api = common.TendrlApi(
+        auth=common.login("admin", "adminuser"), cache=response_cache)
+    api.get_cluster_list()
+    count = tendrl_server.requests_count
+    api.get_cluster_list()
+    # responses are shared by all tokens of the user
+    other_api.get_cluster_list()
+    assert tendrl_server.requests_count == count
+    api.get_cluster_list(fresh=True)
+    assert tendrl_server.requests_count == count + 1
+    # invalid token doesn't get cached response
+    invalid = common.TendrlApi(
+        auth=common.TendrlAuth("invalid", username="admin"),
+        cache=response_cache)
+    assert invalid.request(
+        "GET", tendrl_server.api_url + "clusters", auth=invalid._auth,
+        ).status_code == 401
+    # any other request than GET drops cached responses
+    api.import_cluster(tendrl_server.cluster_id)
+    assert response_cache.stats()["entries"] == 0
+    api.get_cluster_list()
+    assert tendrl_server.requests_count == count + 4
+
+
+def test_token_cache(tendrl_server, clock, checks, monkeypatch):
+    monkeypatch.setattr(common.time, "monotonic", lambda: clock[0])
+    token_cache = common.TokenCache(validate_interval=300)
+    auth = token_cache.login("admin", "adminuser")
+    count = tendrl_server.requests_count
+    # token is reused without any request
+    clock[0] += 299
+    assert token_cache.login("admin", "adminuser") is auth
+    assert tendrl_server.requests_count == count
+    # unused token is validated by current_user request
+    clock[0] += 301
+    assert token_cache.login("admin", "adminuser") is auth
+    assert tendrl_server.requests_count == count + 1
+    assert len(tendrl_server.tokens) == 1
+    # rejected token is replaced by new login of the same auth object
+    tendrl_server.tokens.clear()
+    clock[0] += 301
+    assert token_cache.login("admin", "adminuser") is auth
+    assert tendrl_server.requests_count == count + 4
+    assert len(tendrl_server.tokens) == 1
+    api = common.TendrlApi(auth=auth, cache=False)
+    assert [c["cluster_id"] for c in api.get_cluster_list()] == \
+        [tendrl_server.cluster_id]
+    token_cache.logout_all()
+    assert tendrl_server.tokens == {}
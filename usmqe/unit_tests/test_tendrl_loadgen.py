@@ -0,0 +1,55 @@
+# -*- coding: utf8 -*-
+"""
+Tests of usmqe.api.tendrlapi.loadgen module against Tendrl API stand-in.
+"""
+
+import pytest
+
+from usmqe.api import transport
+from usmqe.api.mockserver import MockServer
+from usmqe.api.tendrlapi import common, loadgen
+from usmqe.api.tendrlapi.mockserver import TendrlMockServer
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert loadgen.percentile(values, 50) == 50
+    assert loadgen.percentile(values, 99) == 99
+    assert loadgen.percentile([], 50) is None
+
+
+def test_load(monkeypatch):
+    with TendrlMockServer(nodes=2, volumes=1) as server:
+        for module in (common, loadgen):
+            monkeypatch.setitem(
+                module.CONF.config["usmqe"], "api_url", server.api_url)
+        auth = common.login("admin", "adminuser")
+        generator = loadgen.LoadGenerator(
+            auth, mix={"clusters": 2, "cluster_volumes": 1, "ping": 1},
+            concurrency=4, duration=0.3, cluster_id=server.cluster_id, seed=1)
+        report = generator.run()
+    assert report["total"]["requests"] == sum(
+        report[name]["requests"] for name in ("clusters", "cluster_volumes", "ping"))
+    assert report["total"]["requests"] > 0
+    assert report["total"]["errors"] == 0
+    assert report["total"]["p50"] <= report["total"]["p99"] <= report["total"]["max"]
+    assert "cluster_volumes" in loadgen.format_report(report)
+    with pytest.raises(ValueError):
+        loadgen.LoadGenerator(auth, mix={"unknown": 1})
+
+
+def test_failures_not_retried(monkeypatch):
+    server = MockServer()
+    server.route("GET", "/ping", lambda request: (503, "unavailable"))
+    breaker = transport.CircuitBreaker(threshold=1)
+    monkeypatch.setattr(transport.TRANSPORT, "breaker", breaker)
+    with server:
+        monkeypatch.setitem(
+            loadgen.CONF.config["usmqe"], "api_url", server.url)
+        generator = loadgen.LoadGenerator(
+            None, mix={"ping": 1}, concurrency=2, duration=0.2)
+        report = generator.run()
+        assert report["ping"]["errors"] == report["ping"]["requests"] == \
+            server.requests_count
+    # load doesn't open circuit of functional tests
+    breaker.allow("{}:{}".format(server.host, server.port))
@@ -0,0 +1,79 @@
+# -*- coding: utf8 -*-
+"""
+Tests of Tendrl API client against usmqe.api.tendrlapi.mockserver stand-in.
+"""
+
+import pytest
+
+from usmqe.api.tendrlapi import common, glusterapi, user
+from usmqe.api.tendrlapi.mockserver import TendrlMockServer
+from usmqe.api.tendrlapi.snapshot import ClusterSnapshot
+
+
+@pytest.fixture
+def tendrl_server(monkeypatch):
+    """
+    Run Tendrl API stand-in and point api_url config option to it.
+    """
+    with TendrlMockServer(
+            nodes=4, volumes=3, bricks_per_volume=4, job_duration=0.2) as server:
+        for module in (common, glusterapi, user):
+            monkeypatch.setitem(
+                module.CONF.config["usmqe"], "api_url", server.api_url)
+        yield server
+
+
+def test_login_and_cluster_list(tendrl_server):
+    auth = common.login("admin", "adminuser")
+    api = common.TendrlApi(auth=auth, cache=False)
+    clusters = api.get_cluster_list()
+    assert [c["cluster_id"] for c in clusters] == [tendrl_server.cluster_id]
+    common.logout(auth)
+    assert tendrl_server.tokens == {}
+
+
+def test_token_masked(tendrl_server, monkeypatch):
+    messages = []
+    monkeypatch.setattr(common.LOGGER, "info", messages.append)
+    auth = common.login("admin", "adminuser")
+    token = next(iter(tendrl_server.tokens))
+    assert messages == ["access_token: ***{}".format(token[-4:])]
+    assert repr(auth) == "TendrlAuth(token=***{})".format(token[-4:])
+    assert repr(common.TendrlAuth("short")) == "TendrlAuth(token=***)"
+
+
+def test_cluster_snapshot(tendrl_server):
+    auth = common.login("admin", "adminuser")
+    snapshot = ClusterSnapshot.fetch(auth, tendrl_server.cluster_id)
+    assert len(snapshot.nodes_by_id) == 4
+    assert len(snapshot.volumes_by_name) == 3
+    assert len(snapshot.bricks) == 12
+    assert all(len(bricks) == 3 for bricks in snapshot.bricks_by_node.values())
+
+
+def test_wait_for_jobs(tendrl_server):
+    auth = common.login("admin", "adminuser")
+    api = common.TendrlApi(auth=auth, cache=False)
+    job_ids = [
+        api.import_cluster(tendrl_server.cluster_id)["job_id"]
+        for _ in range(3)]
+    result = api.wait_for_jobs(job_ids, sleep_time=0.1, initial_sleep_time=0.05)
+    for job_id in job_ids:
+        assert result[job_id]["status"] == "finished"
+        assert len(result[job_id]["messages"]) == tendrl_server.job_messages
+
+
+def test_get_volume_attribute(tendrl_server):
+    auth = common.login("admin", "adminuser")
+    api = glusterapi.TendrlApiGluster(auth=auth, cache=False)
+    volume = tendrl_server.volume_list[1]
+    assert api.get_volume_attribute(
+        tendrl_server.cluster_id, volume["vol_id"], "name") == volume["name"]
+
+
+def test_edit_user(tendrl_server, checks):
+    api = user.ApiUser(auth=common.login("admin", "adminuser"), cache=False)
+    edited = api.edit_user("admin", {"name": "Edited Admin"})
+    assert edited["name"] == "Edited Admin"
+    assert api.get_user("admin")["name"] == "Edited Admin"
+    assert all(check.result for check in checks)
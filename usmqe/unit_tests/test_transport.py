@@ -0,0 +1,74 @@
+# -*- coding: utf8 -*-
+"""
+Tests of transport policy of API requests (usmqe.api.transport).
+"""
+
+import pytest
+import requests
+
+from usmqe.api.mockserver import MockServer
+from usmqe.api.transport import CircuitOpenError, TransportPolicy
+
+NO_DELAY = {"initial": 0, "maximum": 0}
+
+
+@pytest.fixture
+def flaky_server():
+    """
+    Server which responds 503 to first two requests of ``/flaky``.
+    """
+    server = MockServer()
+    calls = []
+
+    def flaky(request):
+        calls.append(request.method)
+        if len(calls) <= 2:
+            return 503, "unavailable"
+        return 200, {"status": "Ok"}
+
+    server.route("GET", "/flaky", flaky)
+    server.route("POST", "/flaky", flaky)
+    server.route("PUT", "/flaky", flaky)
+    server.route("DELETE", "/flaky", flaky)
+    with server:
+        yield server, calls
+
+
+def test_retry_safe(flaky_server):
+    server, calls = flaky_server
+    policy = TransportPolicy(retries=2, backoff=NO_DELAY)
+    response = policy.send("GET", server.url + "flaky")
+    assert response.status_code == 200
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize("method", ["POST", "PUT", "DELETE"])
+def test_no_retry_unsafe(flaky_server, method):
+    server, calls = flaky_server
+    policy = TransportPolicy(retries=2, backoff=NO_DELAY)
+    response = policy.send(method, server.url + "flaky")
+    assert response.status_code == 503
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("method,retry,expected", [
+    ("PUT", True, 200), ("GET", False, 503)])
+def test_retry_per_call(flaky_server, method, retry, expected):
+    server, calls = flaky_server
+    policy = TransportPolicy(retries=2, backoff=NO_DELAY)
+    response = policy.send(method, server.url + "flaky", retry=retry)
+    assert response.status_code == expected
+    assert len(calls) == (3 if retry else 1)
+
+
+def test_circuit_breaker():
+    with MockServer() as server:
+        url = server.url + "ping"
+    policy = TransportPolicy(
+        connect_timeout=1, retries=1, backoff=NO_DELAY, breaker_threshold=2,
+        breaker_reset=60)
+    with pytest.raises(requests.exceptions.ConnectionError) as excinfo:
+        policy.send("GET", url)
+    assert not isinstance(excinfo.value, CircuitOpenError)
+    with pytest.raises(CircuitOpenError):
+        policy.send("GET", url)
@@ -46,7 +46,7 @@ def workload_stop_volumes(request, alerting_setup):
             request,
             ["test_setup.gluster_volume_stop.yml"],
             ["test_teardown.gluster_volume_stop.yml"]):
-        yield measure_operation(wait)
+        yield measure_operation(wait, settle_time=10)
     msg = "Wait 5 seconds to make sure that all volumes are correctly loaded"
     LOGGER.info(msg)
     time.sleep(5)
@@ -71,7 +71,7 @@ def workload_stop_hosts(request, alerting_setup):
             request,
             ["test_setup.tendrl_services_stopped_on_nodes.yml"],
             ["test_teardown.tendrl_services_stopped_on_nodes.yml"]):
-        yield measure_operation(wait)
+        yield measure_operation(wait, settle_time=10)
     msg = "Wait 10 seconds to make sure that all services are correctly loaded"
     LOGGER.info(msg)
     time.sleep(10)
@@ -111,7 +111,8 @@ def workload_cpu_utilization_alerts(request, stress_tools, alerting_setup):
         fill_pct = 85
         fill_cpu()
     fill_pct = request.param
-    return measure_operation(fill_cpu)
+    return measure_operation(
+        fill_cpu, settle_time=10, name=request.param)
 
 
 @pytest.fixture(params=[89, 30], scope="module")
@@ -147,7 +148,8 @@ def workload_memory_utilization_alerts(request, stress_tools, alerting_setup):
         fill_pct = 89
         fill_memory()
     fill_pct = request.param
-    return measure_operation(fill_memory)
+    return measure_operation(
+        fill_memory, settle_time=10, name=request.param)
 
 
 @pytest.fixture(scope="session")
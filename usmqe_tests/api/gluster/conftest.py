@@ -1,6 +1,7 @@
 import pytest
 import os.path
 from usmqe.api.tendrlapi import glusterapi
+from usmqe.api.tendrlapi.snapshot import ClusterSnapshot
 from usmqe.usmqeconfig import UsmConfig
 
 LOGGER = pytest.get_logger('gluster_conftest', module=True)
@@ -13,8 +14,7 @@ def valid_nodes(valid_session_credentials):
     Generate valid host info from GetNodeList api call related to tendrl/nodes
     """
     api = glusterapi.TendrlApiGluster(auth=valid_session_credentials)
-    cluster_list = api.get_nodes()
-    return [x for x in cluster_list["nodes"]
+    return [x for x in api.iter_nodes()
             if "tendrl/node" in x["tags"]
             and x["status"] == "UP"]
 
@@ -68,8 +68,10 @@ def valid_devices(valid_session_credentials, count=1):
     """
 
     api = glusterapi.TendrlApiGluster(auth=valid_session_credentials)
+    nodes = api.iter_nodes(
+        fields=["node_id", "localstorage.blockdevices.free"])
     nodes_free_devs = {x["node_id"]: list(x["localstorage"]["blockdevices"]["free"].values())
-                       for x in api.get_nodes()["nodes"]
+                       for x in nodes
                        if len(x["localstorage"]["blockdevices"]["free"]) > 0}
     nodes_free_kern_name = {}
     for node_id in nodes_free_devs:
@@ -78,19 +80,15 @@ def valid_devices(valid_session_credentials, count=1):
                 nodes_free_kern_name[node_id] = []
             nodes_free_kern_name[node_id].append(device["device_kernel_name"])
 
-    try:
-        return {node_id: sorted(nodes_free_kern_name[node_id])[0:count]
-                for node_id in nodes_free_kern_name}
-    except IndexError as err:
+    if not nodes_free_kern_name or any(
+            len(devices) < count for devices in nodes_free_kern_name.values()):
         raise Exception(
-            "TypeError({0}): There are not enough devices. There are: {1}. {2}"
-            .format(
-                err.errno,
-                nodes_free_kern_name,
-                err.strerror))
+            "There are not enough devices ({0} per node needed). There are: {1}."
+            .format(count, nodes_free_kern_name))
+    return {node_id: sorted(nodes_free_kern_name[node_id])[0:count]
+            for node_id in nodes_free_kern_name}
 
 
-# TODO change to use bricks mapping
 @pytest.fixture
 def volume_conf_2rep(managed_cluster):
     """
@@ -102,20 +100,16 @@ def volume_conf_2rep(managed_cluster):
     *Volume name should be defined for each test!*
     *Configuration is made for replica count == 2.*
     """
-    hosts = managed_cluster["nodes"]
-    LOGGER.debug("nodes: {}".format(hosts))
+    snapshot = ClusterSnapshot.from_cluster(managed_cluster)
+    LOGGER.debug("nodes: {}".format(snapshot.nodes_by_id))
 
-    avail_bricks = {}
+    keys = sorted(snapshot.nodes_by_id)
+    avail_bricks = {
+        node: sorted(snapshot.bricks_by_node[node], key=lambda brick: brick.brick_path)
+        for node in keys}
 
-    keys = sorted(list(hosts.keys()))
-    for node in keys:
-        avail_bricks[node] = sorted(
-                                [brick for brick in managed_cluster["bricks"]["all"].values()
-                                    if brick["node_id"] == node],
-                                key=lambda brick1: brick1['brick_path'])
-
-    bricks = [[{"{}".format(avail_bricks[keys[i]][0]["brick_path"])},
-               {"{}".format(avail_bricks[keys[i+1]][0]["brick_path"])}]
+    bricks = [[{"{}".format(avail_bricks[keys[i]][0].brick_path)},
+               {"{}".format(avail_bricks[keys[i+1]][0].brick_path)}]
               for i in range(0, len(keys), 2)]
 
     # suggestion for common code
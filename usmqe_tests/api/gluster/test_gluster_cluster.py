@@ -42,7 +42,7 @@ def test_cluster_import_valid(valid_session_credentials, unmanaged_cluster):
         CONF.config["usmqe"]["cluster_member"])
 
     for _ in range(12):
-        cluster = api.get_cluster(cluster_id)
+        cluster = api.get_cluster(cluster_id, fresh=True)
         nodes = [node for node in cluster["nodes"] if node["fqdn"]]
         if len(nodes) == len(gl_nodes):
             break
@@ -199,7 +199,8 @@ def test_cluster_import_fail_with_one_nodeagent_down(
 
     retry_num = 12
     for i in range(retry_num):
-        cluster = tendrl.get_cluster(unmanaged_cluster["cluster_id"])
+        cluster = tendrl.get_cluster(
+            unmanaged_cluster["cluster_id"], fresh=True)
         if len(cluster["nodes"]) == len(gl_nodes):
             LOGGER.debug("cluster (via tendrl API) has expected number of nodes")
             break
@@ -322,7 +323,7 @@ def test_cluster_unmanage_valid(
     """
     # TODO(fbalak) remove this workaround when BZ 1589321 is resolved
     for i in range(15):
-        cluster_list = tendrl_api.get_cluster_list()
+        cluster_list = tendrl_api.get_cluster_list(fresh=True)
         if len(cluster_list) > 0:
             break
         else:
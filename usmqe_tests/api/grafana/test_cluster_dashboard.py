@@ -2,10 +2,11 @@
 REST API test suite - Grafana dashboard cluster-dashboard
 """
 
-import pytest
 import time
+
+import pytest
 from usmqe.api.grafanaapi import grafanaapi
-from usmqe.api.graphiteapi import graphiteapi
+from usmqe.api.graphiteapi import assertions, graphiteapi
 from usmqe.gluster.gluster import GlusterCommon
 from usmqe.usmqeconfig import UsmConfig
 
@@ -75,6 +76,7 @@ def test_hosts_panel_status(ansible_playbook, managed_cluster):
     gluster = GlusterCommon()
     states = gluster.get_cluster_hosts_connection_states(
         CONF.config["usmqe"]["cluster_member"])
+    states_time = int(time.time())
     grafana = grafanaapi.GrafanaApi()
     graphite = graphiteapi.GraphiteApi()
     """
@@ -155,6 +157,9 @@ def test_hosts_panel_status(ansible_playbook, managed_cluster):
     target = panel[0]["targets"][0]["target"]
     target = target.replace("$cluster_id", cluster_identifier)
     LOGGER.debug("Total hosts target: {}".format(target))
+    pytest.check(
+        graphite.wait_for_data([target], states_time),
+        "Graphite data of target {} should be ready".format(target))
     g_total = graphite.get_datapoints(target)[-1][0]
     pytest.check(
         g_total == len(states),
@@ -177,6 +182,9 @@ def test_hosts_panel_status(ansible_playbook, managed_cluster):
     target = panel[0]["targets"][1]["target"]
     target = target.replace("$cluster_id", cluster_identifier)
     LOGGER.debug("Up hosts target: {}".format(target))
+    pytest.check(
+        graphite.wait_for_data([target], states_time),
+        "Graphite data of target {} should be ready".format(target))
     g_up = graphite.get_datapoints(target)[-1][0]
     real_up = []
     for host in states.keys():
@@ -203,6 +211,9 @@ def test_hosts_panel_status(ansible_playbook, managed_cluster):
     target = panel[0]["targets"][2]["target"]
     target = target.replace("$cluster_id", cluster_identifier)
     LOGGER.debug("Down hosts target: {}".format(target))
+    pytest.check(
+        graphite.wait_for_data([target], states_time),
+        "Graphite data of target {} should be ready".format(target))
     g_down = graphite.get_datapoints(target)[-1][0]
     real_down = []
     for host in states.keys():
@@ -256,29 +267,21 @@ def test_hosts(ansible_playbook, workload_stop_nodes, managed_cluster):
             target.endswith(targets_expected[idx]),
             "There is used target that ends with `{}`".format(
                 targets_expected[idx]))
-    # make sure that all data in graphite are saved
-    time.sleep(3)
+    issue = "https://bugzilla.redhat.com/show_bug.cgi?id=1687333"
+    from_ts, until_ts, samples = graphiteapi.workload_range(
+        workload_stop_nodes["start"], workload_stop_nodes["end"])
+    series = graphite.get_ready_series(
+        targets_used, from_ts, until_ts, issue=issue)
+    assertions.check_samples(series, expected=samples, issue=issue)
     # check value *Total* of hosts
-    graphite.compare_data_mean(
-        workload_stop_nodes["result"],
-        (targets_used[0],),
-        workload_stop_nodes["start"],
-        workload_stop_nodes["end"],
-        divergence=1,
-        issue="https://bugzilla.redhat.com/show_bug.cgi?id=1687333")
+    assertions.check_mean(
+        {targets_used[0]: series[targets_used[0]]},
+        workload_stop_nodes["result"], divergence=1, issue=issue)
     # check value *Up* of hosts
-    graphite.compare_data_mean(
-        0.0,
-        (targets_used[1],),
-        workload_stop_nodes["start"],
-        workload_stop_nodes["end"],
-        divergence=1,
-        issue="https://bugzilla.redhat.com/show_bug.cgi?id=1687333")
+    assertions.check_mean(
+        {targets_used[1]: series[targets_used[1]]},
+        0.0, divergence=1, issue=issue)
     # check value *Down* of hosts
-    graphite.compare_data_mean(
-        workload_stop_nodes["result"],
-        (targets_used[2],),
-        workload_stop_nodes["start"],
-        workload_stop_nodes["end"],
-        divergence=1,
-        issue="https://bugzilla.redhat.com/show_bug.cgi?id=1687333")
+    assertions.check_mean(
+        {targets_used[2]: series[targets_used[2]]},
+        workload_stop_nodes["result"], divergence=1, issue=issue)
@@ -3,9 +3,8 @@ REST API test suite - Grafana dashboard host-dashboard
 """
 
 import pytest
-import time
 from usmqe.api.grafanaapi import grafanaapi
-from usmqe.api.graphiteapi import graphiteapi
+from usmqe.api.graphiteapi import assertions, graphiteapi, metrics
 from usmqe.usmqeconfig import UsmConfig
 
 
@@ -59,6 +58,52 @@ def test_host_dashboard_layout():
     grafana.compare_structure(structure_defined, "host-dashboard")
 
 
+@pytest.mark.testready
+@pytest.mark.ansible_playbook_setup('test_setup.graphite_access.yml')
+@pytest.mark.ansible_playbook_teardown('test_teardown.graphite_access.yml')
+def test_host_dashboard_targets_exist(ansible_playbook, managed_cluster):
+    """
+    Check that Graphite contains metrics of all targets of host-dashboard
+    panels for every host of the cluster.
+    """
+    if managed_cluster["short_name"]:
+        cluster_identifier = managed_cluster["short_name"]
+    else:
+        cluster_identifier = managed_cluster["integration_id"]
+
+    grafana = grafanaapi.GrafanaApi()
+
+    """
+    :step:
+      Send **GET** request to ``GRAFANA/dashboards/db/host-dashboard`` and
+      get targets of all panels with placeholder of host name.
+    :result:
+      Targets of panels are obtained.
+    """
+    layout = grafana.get_dashboard("host-dashboard")
+    templates = []
+    for row in layout["dashboard"]["rows"]:
+        for panel in row["panels"]:
+            if panel.get("targets"):
+                for targets in grafana.get_panel_chart_targets(
+                        panel, cluster_identifier, host_name="$host_name"):
+                    templates.extend(targets)
+
+    """
+    :step:
+      Send **GET** request to ``GRAPHITE/metrics/index.json`` and check that
+      targets with names of all hosts of the cluster match some metrics.
+    :result:
+      Metrics of all targets of all hosts exist in Graphite.
+    """
+    targets = metrics.expand_placeholders(
+        templates,
+        host_name=[
+            metrics.graphite_name(node["fqdn"])
+            for node in managed_cluster["nodes"] if node["fqdn"]])
+    metrics.INDEX.check_targets(targets)
+
+
 @pytest.mark.testready
 @pytest.mark.author("fbalak@redhat.com")
 @pytest.mark.ansible_playbook_setup('test_setup.graphite_access.yml')
@@ -100,13 +145,12 @@ def test_cpu_utilization(
         [t.split(".")[-1] for t in targets[-1]] == ["percent-user", "percent-system"],
         "The panel CPU Utilization is composed of user and system parts")
     targets_used = (targets[-1][0],)
-    # make sure that all data in graphite are saved
-    time.sleep(2)
-    graphite.compare_data_mean(
-        workload_cpu_utilization["result"],
-        targets_used,
-        workload_cpu_utilization["start"],
-        workload_cpu_utilization["end"])
+    from_ts, until_ts, samples = graphiteapi.workload_range(
+        workload_cpu_utilization["start"], workload_cpu_utilization["end"])
+    series = graphite.get_ready_series(targets_used, from_ts, until_ts)
+    assertions.check_samples(series, expected=samples)
+    assertions.check_mean(
+        series, workload_cpu_utilization["result"], divergence=10)
 
 
 @pytest.mark.testready
@@ -155,8 +199,6 @@ def test_memory_utilization(
         pytest.check(
             targets_used[key].endswith(target_expected),
             "There is used target that ends with `{}`".format(target_expected))
-    # make sure that all data in graphite are saved
-    time.sleep(2)
     graphite.compare_data_mean(
         workload_memory_utilization["result"],
         targets_used,
@@ -204,14 +246,12 @@ def test_swap_free(
     pytest.check(
         target_used.endswith(target_expected),
         "There is used target that ends with `{}`".format(target_expected))
-    # make sure that all data in graphite are saved
-    time.sleep(2)
-    graphite.compare_data_mean(
-        100 - int(workload_swap_utilization["result"]),
-        (target_used,),
-        workload_swap_utilization["start"],
-        workload_swap_utilization["end"],
-        divergence=15)
+    from_ts, until_ts, samples = graphiteapi.workload_range(
+        workload_swap_utilization["start"], workload_swap_utilization["end"])
+    series = graphite.get_ready_series((target_used,), from_ts, until_ts)
+    assertions.check_samples(series, expected=samples)
+    assertions.check_mean(
+        series, 100 - int(workload_swap_utilization["result"]), divergence=15)
 
 
 @pytest.mark.author("fbalak@redhat.com")
@@ -253,14 +293,12 @@ def test_swap_utilization(
     pytest.check(
         target_used.endswith(target_expected),
         "There is used target that ends with `{}`".format(target_expected))
-    # make sure that all data in graphite are saved
-    time.sleep(2)
-    graphite.compare_data_mean(
-        workload_swap_utilization["result"],
-        (target_used,),
-        workload_swap_utilization["start"],
-        workload_swap_utilization["end"],
-        divergence=15)
+    from_ts, until_ts, samples = graphiteapi.workload_range(
+        workload_swap_utilization["start"], workload_swap_utilization["end"])
+    series = graphite.get_ready_series((target_used,), from_ts, until_ts)
+    assertions.check_samples(series, expected=samples)
+    assertions.check_mean(
+        series, workload_swap_utilization["result"], divergence=15)
 
 
 @pytest.mark.author("fbalak@redhat.com")
@@ -309,8 +347,6 @@ def test_memory_available(
         pytest.check(
             targets_used[key].endswith(target_expected),
             "There is used target that ends with `{}`".format(target_expected))
-    # make sure that all data in graphite are saved
-    time.sleep(2)
     expected_available_mem = (
         1 - workload_memory_utilization["result"]/100) * int(
             workload_memory_utilization['metadata']['total_memory'])
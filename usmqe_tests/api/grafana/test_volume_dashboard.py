@@ -3,9 +3,8 @@ REST API test suite - Grafana dashboard volume-dashboard
 """
 
 import pytest
-import time
 from usmqe.api.grafanaapi import grafanaapi
-from usmqe.api.graphiteapi import graphiteapi
+from usmqe.api.graphiteapi import assertions, graphiteapi
 
 
 LOGGER = pytest.get_logger('volume_dashboard', module=True)
@@ -103,14 +102,13 @@ def test_capacity_utilization_gauge(
         pytest.check(
             targets_used[key].endswith(target_expected),
             "There is used target that ends with `{}`".format(target_expected))
-    # make sure that all data in graphite are saved
-    time.sleep(2)
-    graphite.compare_data_mean(
-        workload_capacity_utilization["result"],
-        targets_used,
+    from_ts, until_ts, samples = graphiteapi.workload_range(
         workload_capacity_utilization["start"],
-        workload_capacity_utilization["end"],
-        divergence=5)
+        workload_capacity_utilization["end"])
+    series = graphite.get_ready_series(targets_used, from_ts, until_ts)
+    assertions.check_samples(series, expected=samples)
+    assertions.check_mean(
+        series, workload_capacity_utilization["result"], divergence=5)
 
 
 @pytest.mark.author("fbalak@redhat.com")
@@ -158,14 +156,13 @@ def test_capacity_utilization_graph(
         pytest.check(
             targets_used[key].endswith(target_expected),
             "There is used target that ends with `{}`".format(target_expected))
-    # make sure that all data in graphite are saved
-    time.sleep(2)
-    graphite.compare_data_mean(
-        workload_capacity_utilization["result"],
-        targets_used,
+    from_ts, until_ts, samples = graphiteapi.workload_range(
         workload_capacity_utilization["start"],
-        workload_capacity_utilization["end"],
-        divergence=5)
+        workload_capacity_utilization["end"])
+    series = graphite.get_ready_series(targets_used, from_ts, until_ts)
+    assertions.check_samples(series, expected=samples)
+    assertions.check_mean(
+        series, workload_capacity_utilization["result"], divergence=5)
 
 
 @pytest.mark.author("fbalak@redhat.com")
@@ -212,8 +209,6 @@ def test_capacity_available(
         pytest.check(
             targets_used[key].endswith(target_expected),
             "There is used target that ends with `{}`".format(target_expected))
-    # make sure that all data in graphite are saved
-    time.sleep(2)
 
     expected_available = workload_capacity_utilization["metadata"][
         "total_capacity"] * (1 - workload_capacity_utilization[
@@ -0,0 +1,40 @@
+"""
+REST API test suite - load of Tendrl API
+"""
+import pytest
+
+from usmqe.api.tendrlapi.loadgen import LoadGenerator, format_report
+from usmqe.usmqeconfig import UsmConfig
+
+
+LOGGER = pytest.get_logger('api_load', module=True)
+CONF = UsmConfig()
+
+
+@pytest.mark.performance
+def test_api_load(valid_session_credentials, managed_cluster):
+    """
+    Measure throughput, error rate and latency of Tendrl API under load.
+
+    :step:
+      Send **GET** requests to Tendrl API endpoints from ``api_load.mix``
+      config option by ``api_load.concurrency`` threads for
+      ``api_load.duration`` seconds.
+    :result:
+      Error rate of all requests is not higher than
+      ``api_load.max_error_rate``. Throughput and latency percentiles per
+      endpoint are logged.
+    """
+    load_conf = CONF.config["usmqe"]["api_load"]
+    generator = LoadGenerator(
+        valid_session_credentials,
+        mix=load_conf["mix"],
+        concurrency=load_conf["concurrency"],
+        duration=load_conf["duration"],
+        cluster_id=managed_cluster["cluster_id"])
+    report = generator.run()
+    LOGGER.info("Tendrl API load report:\n{}".format(format_report(report)))
+    pytest.check(
+        report["total"]["error_rate"] <= load_conf["max_error_rate"],
+        "Error rate {:.3f} should not be higher than {}".format(
+            report["total"]["error_rate"], load_conf["max_error_rate"]))
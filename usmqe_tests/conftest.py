@@ -6,7 +6,11 @@ import pytest
 
 import usmqe.usmssh as usmssh
 from pytest_ansible_playbook import runner
-from usmqe.api.tendrlapi.common import login, logout, TendrlApi
+from usmqe.api import cassette
+from usmqe.api.graphiteapi.graphiteapi import DATAPOINT_CACHE
+from usmqe.api.graphiteapi.monitor import MONITOR
+from usmqe.api.latency import LATENCY
+from usmqe.api.tendrlapi.common import TendrlApi, RESPONSE_CACHE, TOKEN_CACHE
 from usmqe.web.application import Application
 from usmqe.usmqeconfig import UsmConfig
 from usmqe.gluster.gluster import GlusterVolume
@@ -42,7 +46,8 @@ def get_name(fname):
 
 
 def measure_operation(
-        operation, minimal_time=None, metadata=None, measure_after=False):
+        operation, minimal_time=None, metadata=None, measure_after=False,
+        settle_time=0, name=None):
     """
     Get dictionary with keys 'start', 'end' and 'result' that contain
     information about start and stop time of given function and its result.
@@ -55,11 +60,26 @@ def measure_operation(
             relevant to test (e.g. volume name, operating host, ...)
         measure_after (bool): determine if time measurement is done before or
             after the operation returns its state
+        settle_time (int): number of seconds to wait after the measurement
+            for the monitoring to process it, consumers which read Graphite
+            data by ``GraphiteApi.compare_data_mean`` or wait for them by
+            ``GraphiteApi.wait_for_data`` don't need it
+        name: identification of the measurement of the operation in cassette,
+            e.g. parameter of fixture, values of `result` and `metadata` have
+            to be json serializable when the cassette is recorded
 
     Returns:
         dict: contains information about `start` and `stop` time of given
             function and its `result`
     """
+    active = cassette.LIBRARY.active()
+    cassette_key = "measure_operation:{}".format(operation.__qualname__)
+    if name is not None:
+        cassette_key += "[{}]".format(name)
+    if active is not None and active.mode == "replay":
+        LOGGER.info("Operation {} replayed from cassette".format(
+            operation.__qualname__))
+        return active.value(cassette_key)
     if not measure_after:
         start_time = datetime.datetime.now()
     result = operation()
@@ -71,13 +91,18 @@ def measure_operation(
         if additional_time > 0:
             time.sleep(additional_time)
     end_time = datetime.datetime.now()
-    LOGGER.info("Wait 10 seconds for graphite to load dataframes")
-    time.sleep(10)
-    return {
+    measurement = {
         "start": start_time,
         "end": end_time,
         "result": result,
         "metadata": metadata}
+    if active is not None and active.mode == "record":
+        active.record_value(cassette_key, measurement)
+    if settle_time:
+        LOGGER.info("Wait {} seconds for monitoring to process the data".format(
+            settle_time))
+        time.sleep(settle_time)
+    return measurement
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -88,9 +113,31 @@ def logger_session():
     log_level = CONF.config["usmqe"]["log_level"]
     LOGGER.setLevel(log_level)
     yield
+    if RESPONSE_CACHE is not None:
+        LOGGER.info("Tendrl API response cache: {}".format(
+            RESPONSE_CACHE.stats()))
+    if DATAPOINT_CACHE is not None:
+        LOGGER.info("Graphite datapoint cache: {}".format(
+            DATAPOINT_CACHE.stats()))
+    LOGGER.info("The slowest API endpoints:\n{}".format(
+        LATENCY.format_summary()))
     LOGGER.close()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def graphite_monitor():
+    """
+    Monitor gaps and staleness of Graphite data during the whole test run,
+    see ``graphite_monitor`` config option.
+    """
+    if MONITOR is None:
+        yield None
+        return
+    with MONITOR:
+        yield MONITOR
+    LOGGER.info("Graphite data monitor:\n{}".format(MONITOR.format_report()))
+
+
 @pytest.fixture(scope="function", autouse=True)
 def logger_testcase(request):
     """
@@ -102,6 +149,26 @@ def logger_testcase(request):
     LOGGER.testEnd()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def api_session_cassette():
+    """
+    Record or replay API requests sent outside of test cases, see
+    ``api_cassette`` config option.
+    """
+    with cassette.LIBRARY.use("session", session=True) as session_cassette:
+        yield session_cassette
+
+
+@pytest.fixture(scope="function", autouse=True)
+def api_cassette(request):
+    """
+    Record or replay API requests of the test case, see ``api_cassette``
+    config option.
+    """
+    with cassette.LIBRARY.use(request.node.nodeid) as test_cassette:
+        yield test_cassette
+
+
 @pytest.fixture(
     params=[{
         "name": "Tom Admin",
@@ -128,7 +195,7 @@ def create_new_user(user_data):
     """
     Create user from given user_data.
     """
-    auth = login(
+    auth = TOKEN_CACHE.login(
         CONF.config["usmqe"]["username"],
         CONF.config["usmqe"]["password"])
     admin = tendrlapi_user.ApiUser(auth=auth)
@@ -152,7 +219,7 @@ def delete_new_user(user_data):
     """
     Delete user with given user_data.
     """
-    auth = login(
+    auth = TOKEN_CACHE.login(
         CONF.config["usmqe"]["username"],
         CONF.config["usmqe"]["password"])
     admin = tendrlapi_user.ApiUser(auth=auth)
@@ -165,7 +232,6 @@ def delete_new_user(user_data):
         # userdel command returned 0 return code
         assert userdel_response[0] == 0
     admin.del_user(user_data["username"])
-    logout(auth=auth)
 
 
 @pytest.fixture
@@ -341,7 +407,7 @@ def workload_cpu_utilization(request, stress_tools):
         if retcode != 0:
             raise OSError(stderr)
         return request.param
-    return measure_operation(fill_cpu)
+    return measure_operation(fill_cpu, name=request.param)
 
 
 @pytest.fixture(scope="session")
@@ -357,18 +423,25 @@ def application():
     app.web_ui.browser_manager.quit()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def tendrl_sessions():
+    """
+    Logout all Tendrl sessions cached during the test run.
+    """
+    yield TOKEN_CACHE
+    TOKEN_CACHE.logout_all()
+
+
 @pytest.fixture(scope="session")
-def valid_session_credentials(request):
+def valid_session_credentials(request, tendrl_sessions):
     """
-    During setup phase, login default usmqe user account (username and password
-    comes from usm.ini config file) and return requests auth object.
-    Then during teardown logout the user to close the session.
+    Return requests auth object of default usmqe user account (username and
+    password comes from usm.ini config file). The session is shared with other
+    fixtures and it's closed at the end of the test run.
     """
-    auth = login(
+    return tendrl_sessions.login(
         CONF.config["usmqe"]["username"],
         CONF.config["usmqe"]["password"])
-    yield auth
-    logout(auth=auth)
 
 
 def cluster2node_fqdn_list(cluster):
@@ -395,7 +468,7 @@ def get_cluster_reuse(session_credentials):
     retry_num = 12
     for i in range(retry_num):
         clusters = []
-        for cluster in api.get_cluster_list():
+        for cluster in api.get_cluster_list(fresh=True):
             node_fqdn_list = cluster2node_fqdn_list(cluster)
             if id_hostname in node_fqdn_list:
                 clusters.append(cluster)
@@ -483,7 +556,7 @@ def workload_memory_utilization(request, stress_tools):
     if retcode != 0:
         raise OSError(stderr)
     mem_total = stdout.decode("utf-8")
-    return measure_operation(fill_memory, metadata={
+    return measure_operation(fill_memory, name=request.param, metadata={
         'total_memory': mem_total})
 
 
@@ -566,6 +639,7 @@ def workload_capacity_utilization(request, volume_mount_points):
     time_to_measure = 180
     yield measure_operation(
         fill_volume,
+        name=request.param,
         minimal_time=time_to_measure,
         metadata={
             "volume_name": volume_name,
@@ -618,7 +692,7 @@ def workload_swap_utilization(request, stress_tools):
         teardown_cmd = "sleep 3; swapoff -a && swapon -a; sleep 5"
         SSH[host].run(teardown_cmd)
         return request.param
-    return measure_operation(fill_memory)
+    return measure_operation(fill_memory, name=request.param)
 
 
 @pytest.fixture
@@ -1,5 +1,6 @@
 import pytest
 
+from usmqe.api.graphiteapi.metrics import graphite_name
 from usmqe.web import tools
 
 LOGGER = pytest.get_logger('hosts', module=True)
@@ -177,7 +178,7 @@ def test_host_dashboard(application, managed_cluster):
                      "Should be equal to {}".format(host.cluster_name))
         LOGGER.debug("Cluster name in grafana: {}".format(dashboard_values["cluster_name"]))
         LOGGER.debug("Cluster name in main UI: {}".format(host.cluster_name))
-        hostname_grafanized = host.hostname.replace(".", "_")
+        hostname_grafanized = graphite_name(host.hostname)
         pytest.check(dashboard_values["host_name"] == hostname_grafanized,
                      "Hostname in Grafana: {} ".format(dashboard_values["host_name"]) +
                      "Should be equal to {}".format(hostname_grafanized))
@@ -241,7 +242,7 @@ def test_brick_dashboard(application, managed_cluster, gluster_volume):
                          " Should be equal to {}".format(brick.cluster_name))
             LOGGER.debug("Cluster name in grafana: {}".format(dashboard_values["cluster_name"]))
             LOGGER.debug("Cluster name in main UI: {}".format(brick.cluster_name))
-            hostname_grafanized = brick.hostname.replace(".", "_")
+            hostname_grafanized = graphite_name(brick.hostname)
             pytest.check(dashboard_values["host_name"] == hostname_grafanized,
                          "Hostname in Grafana: {} ".format(dashboard_values["host_name"]) +
                          "Should be equal to {}".format(hostname_grafanized))
@@ -1,5 +1,6 @@
 import pytest
 
+from usmqe.api.graphiteapi.metrics import graphite_name
 from usmqe.gluster import gluster
 from usmqe.web import tools
 
@@ -388,11 +389,11 @@ def test_volume_brick_dashboards(application, managed_cluster, gluster_volume):
                              " Should be equal to {}".format(brick.cluster_name))
                 LOGGER.debug("Cluster name in grafana: {}".format(dashboard_values["cluster_name"]))
                 LOGGER.debug("Cluster name in main UI: {}".format(brick.cluster_name))
-                pytest.check(dashboard_values["host_name"] == brick.hostname.replace(".", "_"),
+                pytest.check(dashboard_values["host_name"] == graphite_name(brick.hostname),
                              "Check that hostname in Grafana is as expected")
                 LOGGER.debug("Hostname in grafana: {}".format(dashboard_values["host_name"]))
                 LOGGER.debug("Hostname in main UI "
-                             "after dot replacement: '{}'".format(brick.hostname.replace(".", "_")))
+                             "after dot replacement: '{}'".format(graphite_name(brick.hostname)))
                 pytest.check(dashboard_values["brick_path"] == brick.brick_path.replace("/", ":"),
                              "Check that brick path in Grafana is as expected")
                 LOGGER.debug("Brick path in grafana: {}".format(dashboard_values["brick_path"]))